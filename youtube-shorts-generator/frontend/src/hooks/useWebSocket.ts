@@ -5,23 +5,39 @@ export interface ProgressEvent {
   step: string
   percent: number
   log: string
+  seq?: number
 }
 
 export function useWebSocket(executionId: number | null, enabled: boolean) {
   const [events, setEvents] = useState<ProgressEvent[]>([])
   const [connected, setConnected] = useState(false)
   const wsRef = useRef<WebSocket | null>(null)
+  // Last seq received; reconnects replay from here so no event is missed or repeated
+  const lastSeqRef = useRef(0)
+  const retryRef = useRef<ReturnType<typeof setTimeout> | null>(null)
 
   const connect = useCallback(() => {
     if (!executionId || !enabled) return
     const protocol = location.protocol === 'https:' ? 'wss:' : 'ws:'
-    const ws = new WebSocket(`${protocol}//${location.host}/ws/progress/${executionId}`)
+    const ws = new WebSocket(
+      `${protocol}//${location.host}/ws/progress/${executionId}?since=${lastSeqRef.current}`
+    )
     wsRef.current = ws
     ws.onopen = () => setConnected(true)
-    ws.onclose = () => setConnected(false)
+    ws.onclose = (e) => {
+      setConnected(false)
+      // Normal closure (1000) means the run finished; otherwise resume after a short pause
+      if (wsRef.current === ws && e.code !== 1000) {
+        retryRef.current = setTimeout(connect, 1000)
+      }
+    }
     ws.onmessage = (e) => {
       try {
         const data = JSON.parse(e.data) as ProgressEvent
+        if (data.seq !== undefined) {
+          if (data.seq <= lastSeqRef.current) return
+          lastSeqRef.current = data.seq
+        }
         setEvents((prev) => [...prev, data])
       } catch {
         // ignore
@@ -33,10 +49,13 @@ export function useWebSocket(executionId: number | null, enabled: boolean) {
   useEffect(() => {
     if (!executionId || !enabled) return
     setEvents([])
+    lastSeqRef.current = 0
     connect()
     return () => {
-      wsRef.current?.close()
+      if (retryRef.current) clearTimeout(retryRef.current)
+      const ws = wsRef.current
       wsRef.current = null
+      ws?.close()
       setConnected(false)
     }
   }, [executionId, enabled, connect])
@@ -7,9 +7,16 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/com
 import { Badge } from '@/components/ui/badge'
 import { Skeleton } from '@/components/ui/skeleton'
 
+// Fields the status endpoint adds for live executions
+type LiveStatus = ExecutionStatus & {
+  seq?: number
+  queue_position?: number
+  eta_seconds?: number | null
+}
+
 export function ExecutionDetail() {
   const { id } = useParams<{ id: string }>()
-  const [status, setStatus] = useState<ExecutionStatus | null>(null)
+  const [status, setStatus] = useState<LiveStatus | null>(null)
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
@@ -24,11 +31,32 @@ export function ExecutionDetail() {
 
   useEffect(() => {
     if (!id || !status) return
-    if (status.status === 'in_progress' || status.status === 'pending') {
-      const t = setInterval(() => {
-        api.status(parseInt(id, 10)).then(setStatus)
-      }, 2000)
-      return () => clearInterval(t)
+    if (status.status !== 'in_progress' && status.status !== 'pending') return
+    // Long-poll: the server answers when progress changes (or after 25s), so there is no fixed-rate polling
+    let cancelled = false
+    const controller = new AbortController()
+    const poll = async (since: number) => {
+      while (!cancelled) {
+        try {
+          const res = await fetch(`/api/status/${id}?wait_for_change=25&since=${since}`, {
+            signal: controller.signal,
+          })
+          if (!res.ok) throw new Error(res.statusText)
+          const next = (await res.json()) as LiveStatus
+          if (cancelled) return
+          setStatus(next)
+          if (next.status !== 'in_progress' && next.status !== 'pending') return
+          since = next.seq ?? since
+        } catch {
+          if (cancelled) return
+          await new Promise((r) => setTimeout(r, 2000))
+        }
+      }
+    }
+    poll(status.seq ?? 0)
+    return () => {
+      cancelled = true
+      controller.abort()
     }
   }, [id, status?.status])
 
@@ -128,17 +156,37 @@ export function ExecutionDetail() {
             </CardHeader>
             <CardContent>
               <video
-                src={api.videoUrl(status.execution_id)}
+                src={`${api.videoUrl(status.execution_id)}?rendition=preview`}
+                poster={`${api.videoUrl(status.execution_id)}?rendition=poster`}
+                preload="metadata"
                 controls
                 className="w-full rounded-lg border border-zinc-800 bg-black"
               >
                 Your browser does not support video playback.
               </video>
+              <a
+                href={api.videoUrl(status.execution_id)}
+                className="mt-2 inline-block text-xs text-zinc-500 hover:text-zinc-300"
+              >
+                Full-quality master (1080x1920)
+              </a>
             </CardContent>
           </Card>
         )}
       </div>
 
+      {status.status === 'pending' && !!status.queue_position && (
+        <Card className="border-zinc-700 bg-zinc-900/50">
+          <CardHeader>
+            <CardTitle className="text-zinc-200">Queued</CardTitle>
+            <CardDescription>
+              Position {status.queue_position} in the queue
+              {status.eta_seconds != null && ` · estimated finish in ~${Math.ceil(status.eta_seconds / 60)} min`}
+            </CardDescription>
+          </CardHeader>
+        </Card>
+      )}
+
       {status.status === 'in_progress' && (
         <Card className="border-amber-500/30 bg-amber-500/5">
           <CardHeader>
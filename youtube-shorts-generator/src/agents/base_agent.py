@@ -3,6 +3,7 @@ Base agent interface for pipeline agents. All agents inherit from BaseAgent.
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any, Optional
 
 # Lazy imports to avoid circular deps
@@ -14,6 +15,10 @@ def _repository():
     from src.database import repository
     return repository
 
+def _async_repository():
+    from src.database import async_repository
+    return async_repository
+
 
 @dataclass
 class ExecutionContext:
@@ -21,6 +26,15 @@ class ExecutionContext:
     execution_id: int
     current_stage: str
     data: dict = field(default_factory=dict)
+    # Scratch directory for this execution's intermediate files; set by the pipeline
+    work_dir: Optional[Path] = None
+
+    def work_path(self, name: str) -> Path:
+        """Path for an intermediate file of this execution (under work_dir, else tmp/<execution_id>).
+        Concurrent executions never share one, so a run cannot overwrite another's audio or video."""
+        base = self.work_dir or Path("tmp") / str(self.execution_id)
+        base.mkdir(parents=True, exist_ok=True)
+        return base / name
 
 
 @dataclass
@@ -69,3 +83,11 @@ class BaseAgent(ABC):
     def log_cost(self, execution_id: int, component: str, cost: float) -> None:
         """Log API cost to database."""
         _cost_tracker().log_cost(execution_id=execution_id, component=component, cost=cost)
+
+    async def save_progress_async(self, stage: str, data: dict, context: Optional[ExecutionContext] = None) -> None:
+        """save_progress on the DB writer thread (use from execute())."""
+        await _async_repository().run_write(self.save_progress, stage, data, context)
+
+    async def log_cost_async(self, execution_id: int, component: str, cost: float) -> None:
+        """log_cost on the DB writer thread (use from execute())."""
+        await _async_repository().run_write(self.log_cost, execution_id, component, cost)
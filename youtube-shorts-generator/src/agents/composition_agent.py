@@ -1,12 +1,13 @@
 """
 CompositionAgent (US-2.2): Combine audio + video. Uses MoviePy 2.x; audio + static frame when video missing/empty.
+Preview and poster renditions are rendered by the pipeline from the stored copy (output_dir/<id>.mp4), not here.
 """
+import asyncio
 from pathlib import Path
 from typing import Optional
 
-from moviepy import AudioFileClip, ColorClip, VideoFileClip
-
 from src.agents.base_agent import BaseAgent, ExecutionContext, AgentResult
+from src.utils import tracing
 
 
 def _compose_audio_video(audio_path: Path, video_path: Optional[Path], output_path: Path) -> None:
@@ -14,6 +15,8 @@ def _compose_audio_video(audio_path: Path, video_path: Optional[Path], output_pa
     When both exist, output duration = min(audio.duration, video.duration); both tracks trimmed to that
     so composition never fails on duration mismatch.
     """
+    # MoviePy takes about a second to import: only pay for it when composing
+    from moviepy import AudioFileClip, ColorClip, VideoFileClip
     audio = AudioFileClip(str(audio_path))
     # Shorts: vertical 9:16 (1080x1920)
     w, h = 1080, 1920
@@ -45,12 +48,12 @@ class CompositionAgent(BaseAgent):
     async def execute(self, context: ExecutionContext) -> AgentResult:
         audio = (context.data.get("tts") or {}).get("audio_path")
         video = (context.data.get("video") or {}).get("video_path")
-        out = Path("tmp") / "final.mp4"
-        out.parent.mkdir(parents=True, exist_ok=True)
+        out = context.work_path("final.mp4")
         try:
             if audio and Path(audio).exists():
                 vp = Path(video) if video else None
-                _compose_audio_video(Path(audio), vp, out)
+                with tracing.span("compose", "subprocess", with_video=bool(vp)):
+                    await asyncio.to_thread(_compose_audio_video, Path(audio), vp, out)
             else:
                 out.write_bytes(b"")
             return AgentResult(success=True, data={"output_path": str(out)})
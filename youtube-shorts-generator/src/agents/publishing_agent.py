@@ -1,6 +1,7 @@
 """
 PublishingAgent (US-3.1): YouTube upload with metadata. Stub returns fake ID.
 """
+import asyncio
 from pathlib import Path
 from src.agents.base_agent import BaseAgent, ExecutionContext, AgentResult
 
@@ -15,7 +16,7 @@ class PublishingAgent(BaseAgent):
         try:
             if path and Path(path).exists():
                 from src.services.youtube_service import upload_video
-                vid = upload_video(Path(path), title=title, description="")
+                vid = await asyncio.to_thread(upload_video, Path(path), title=title, description="")
                 return AgentResult(success=True, data={"youtube_id": vid})
             return AgentResult(success=True, data={"youtube_id": "stub_no_upload"})
         except Exception as e:
@@ -0,0 +1,62 @@
+"""
+Agent registry: pipeline stages by name, imported on first execution.
+
+Agent modules pull in heavy SDKs (MoviePy, Runway, OpenAI, Chroma). Building a pipeline from
+``default_agents()`` imports none of them: each ``AgentRef`` has the stage ``name`` the pipeline
+needs up front and imports its module the first time the stage runs.
+"""
+import importlib
+import threading
+from typing import Dict, List, Optional, Type
+
+from src.agents.base_agent import BaseAgent
+
+# Stage name -> "module:Class", in pipeline order
+AGENTS: Dict[str, str] = {
+    "research": "src.agents.research_agent:ResearchAgent",
+    "script": "src.agents.script_agent:ScriptAgent",
+    "uniqueness": "src.agents.uniqueness_agent:UniquenessAgent",
+    "tts": "src.agents.tts_agent:TTSAgent",
+    "video": "src.agents.video_agent:VideoAgent",
+    "composition": "src.agents.composition_agent:CompositionAgent",
+    "quality": "src.agents.quality_agent:QualityAgent",
+    "publishing": "src.agents.publishing_agent:PublishingAgent",
+}
+
+_lock = threading.Lock()
+
+
+class AgentRef:
+    """Stand-in for an agent class: has its ``name``; calling it imports the class and instantiates it."""
+
+    def __init__(self, name: str, target: str):
+        self.name = name
+        self.target = target
+        self._cls: Optional[Type[BaseAgent]] = None
+
+    def resolve(self) -> Type[BaseAgent]:
+        if self._cls is None:
+            with _lock:
+                if self._cls is None:
+                    module, _, attr = self.target.partition(":")
+                    self._cls = getattr(importlib.import_module(module), attr)
+        return self._cls
+
+    def __call__(self) -> BaseAgent:
+        return self.resolve()()
+
+    def __repr__(self) -> str:
+        return f"AgentRef({self.name!r}, {self.target!r})"
+
+
+_refs: Dict[str, AgentRef] = {name: AgentRef(name, target) for name, target in AGENTS.items()}
+
+
+def get_agent(name: str) -> AgentRef:
+    """Lazy reference to a registered stage. Raises KeyError for unknown names."""
+    return _refs[name]
+
+
+def default_agents() -> List[AgentRef]:
+    """All stages in pipeline order, unimported."""
+    return list(_refs.values())
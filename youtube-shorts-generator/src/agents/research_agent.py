@@ -1,9 +1,16 @@
 """
 ResearchAgent (US-1.1): RAG query for trending topics, 3-5 ideas with relevance scores.
 """
+import asyncio
+
 from src.agents.base_agent import BaseAgent, ExecutionContext, AgentResult
-from src.services.openai_service import get_embeddings, chat_completion
-from src.services.rag_service import get_or_create_collection, similarity_search, add_embeddings
+from src.services.openai_service import chat_completion
+
+# The research prompt is identical on every run: reuse responses for an hour, sampling
+# among the last few so consecutive executions don't all get the same topic list.
+RESEARCH_CACHE_TTL_SEC = 3600
+RESEARCH_CACHE_SAMPLE_K = 3
+
 
 class ResearchAgent(BaseAgent):
     name = "research"
@@ -11,10 +18,14 @@ class ResearchAgent(BaseAgent):
     async def execute(self, context: ExecutionContext) -> AgentResult:
         try:
             # Query for topic ideas (simplified: use GPT to suggest topics, then embed and store)
-            content, cost = chat_completion(
+            # Provider calls block: run them in a worker thread so the API event loop keeps serving
+            content, cost = await asyncio.to_thread(
+                chat_completion,
                 messages=[{"role": "user", "content": "List 5 short trending topic ideas for a 60-second YouTube Short. One line each, diverse."}],
+                cache_ttl=RESEARCH_CACHE_TTL_SEC,
+                cache_sample_k=RESEARCH_CACHE_SAMPLE_K,
             )
-            self.log_cost(context.execution_id, "research", cost)
+            await self.log_cost_async(context.execution_id, "research", cost)
             lines = [l.strip() for l in content.split("\n") if l.strip()][:5]
             topics = [{"title": l, "relevance": 0.85} for l in lines]
             return AgentResult(success=True, data={"topics": topics, "raw": content})
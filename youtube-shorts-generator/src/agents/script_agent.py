@@ -1,6 +1,8 @@
 """
 ScriptAgent (US-1.2): Generate 10-second script from research data. GPT-4.
 """
+import asyncio
+
 from src.agents.base_agent import BaseAgent, ExecutionContext, AgentResult
 from src.services.openai_service import chat_completion
 
@@ -12,7 +14,8 @@ class ScriptAgent(BaseAgent):
         topics = research.get("topics", [])
         topic_line = topics[0]["title"] if topics else "trending topic"
         try:
-            content, cost = chat_completion(
+            content, cost = await asyncio.to_thread(
+                chat_completion,
                 messages=[
                     {"role": "user", "content": (
                         f"Write a script for a 10-second YouTube Short on: {topic_line}. "
@@ -23,7 +26,7 @@ class ScriptAgent(BaseAgent):
                     )}
                 ],
             )
-            self.log_cost(context.execution_id, "script", cost)
+            await self.log_cost_async(context.execution_id, "script", cost)
             return AgentResult(success=True, data={"script": content, "topic": topic_line})
         except Exception as e:
             return AgentResult(success=False, message=str(e))
@@ -2,8 +2,8 @@
 TTSAgent (US-1.3): Convert script to voiceover. ElevenLabs.
 Strips bracketed content (e.g. [opening shot]) before TTS so only spoken text is synthesized.
 """
+import asyncio
 import re
-from pathlib import Path
 
 from src.agents.base_agent import BaseAgent, ExecutionContext, AgentResult
 from src.services.elevenlabs_service import text_to_speech
@@ -28,9 +28,10 @@ class TTSAgent(BaseAgent):
         if not script_for_voice:
             return AgentResult(success=False, message="No spoken content after removing directions")
         try:
-            out = Path("tmp") / "tts_output.mp3"
-            path, cost = text_to_speech(script_for_voice, output_path=out)
-            self.log_cost(context.execution_id, "tts", cost)
+            path, cost = await asyncio.to_thread(
+                text_to_speech, script_for_voice, output_path=context.work_path("tts_output.mp3")
+            )
+            await self.log_cost_async(context.execution_id, "tts", cost)
             return AgentResult(success=True, data={"audio_path": str(path)})
         except Exception as e:
             return AgentResult(success=False, message=str(e))
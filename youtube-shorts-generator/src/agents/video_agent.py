@@ -1,7 +1,8 @@
 """
 VideoAgent (US-2.1): Video assets (RunwayML + fallbacks). Stub returns placeholder path.
 """
-from pathlib import Path
+import asyncio
+
 from src.agents.base_agent import BaseAgent, ExecutionContext, AgentResult
 from src.services.runwayml_service import generate_video
 
@@ -12,8 +13,11 @@ class VideoAgent(BaseAgent):
         script_data = context.data.get("script", {})
         script = script_data.get("script", "")[:200] if isinstance(script_data, dict) else "scene"
         try:
-            path, cost = generate_video(script, duration_sec=10.0)
-            self.log_cost(context.execution_id, "video", cost)
+            # Polls Runway for up to 10 minutes: never on the event loop
+            path, cost = await asyncio.to_thread(
+                generate_video, script, output_path=context.work_path("runway_output.mp4"), duration_sec=10.0
+            )
+            await self.log_cost_async(context.execution_id, "video", cost)
             return AgentResult(success=True, data={"video_path": str(path)})
         except Exception as e:
             return AgentResult(success=False, message=str(e))
@@ -2,22 +2,47 @@
 FastAPI application for YouTube Shorts Generator web UI.
 """
 import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
+from fastapi import FastAPI, HTTPException, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.websockets import WebSocket
-from pydantic import BaseModel
-
-from src.utils.config import load_config, load_env
-from src.utils.health import run_all_checks
-from src.database import repository
-from src.database.migrations import _project_root, run_migrations, DEFAULT_DB
-
-# Progress broadcast: execution_id -> set of WebSocket connections
-_progress_subscribers: dict[int, set[WebSocket]] = {}
+from pydantic import BaseModel, Field
+
+from src.utils.config import get_settings, invalidate_settings, load_env
+from src.utils.health import cached_checks
+from src.utils.logging import configure_logging, shutdown_logging
+from src.utils import media
+from src.utils import metrics
+from src.utils import tracing
+from src.utils.singleflight import SingleFlight
+from src.database import async_repository
+from src.database import models
+from src.api.job_runner import JobRunner, QueueFull
+from src.api.progress_bus import LocalBus, create_bus
+from src.api.progress_hub import ProgressHub, Subscriber, send_events
+
+# Progress broadcast: the pipeline publishes into per-socket bounded queues (never awaits a client)
+# and a per-execution replay log (seq-numbered events)
+progress_hub = ProgressHub()
+# Publishers go through the bus so other API workers see the events too (PROGRESS_TRANSPORT)
+progress_bus: LocalBus = LocalBus(progress_hub)
+_FINISHED = (models.STATUS_COMPLETED, models.STATUS_FAILED)
+SSE_KEEPALIVE_SEC = 15.0
+_persist_tasks: set = set()
+# Admission control for pipeline runs (bounded concurrency and waiting queue)
+job_runner = JobRunner()
+BATCH_MAX_ITEMS = 50
+_STARTED = time.monotonic()
+# Batch feeder task -> its execution ids
+_batch_tasks: Dict[asyncio.Task, List[int]] = {}
 
 
 def _project_root_api() -> Path:
@@ -28,14 +53,62 @@ def _project_root_api() -> Path:
 
 
 def _db_path() -> Optional[Path]:
-    root = _project_root_api()
-    cfg = load_config()
-    db_name = (cfg.get("paths") or {}).get("database", DEFAULT_DB)
-    p = Path(db_name)
-    return root / p if not p.is_absolute() else p
-
-
-app = FastAPI(title="YouTube Shorts Generator API", version="0.1.0")
+    """Database path from the cached settings (no file I/O per request)."""
+    return get_settings().database_path
+
+
+def _persist_enabled() -> bool:
+    return (os.getenv("PROGRESS_EVENTS_PERSIST") or "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _persist_event(execution_id: int, event: dict) -> None:
+    """Hub persist hook: queue the event on the DB writer thread (publish never waits for it)."""
+    task = asyncio.get_running_loop().create_task(
+        async_repository.insert_progress_events([(execution_id, event)], db_path=_db_path())
+    )
+    _persist_tasks.add(task)
+    task.add_done_callback(_persist_tasks.discard)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup: load .env, start the queued log writer, migrate the database once and start background
+    DB maintenance (retention, archival, vacuum). Shutdown: drain the job runner (running executions
+    finish, queued ones are marked failed), cancel batch feeders (their unsubmitted items are marked
+    failed), stop maintenance and flush logs."""
+    global progress_bus
+    from src.database.maintenance import start_maintenance_thread
+    load_env(_project_root_api() / ".env")
+    configure_logging()
+    await async_repository.ensure_schema(_db_path())
+    progress_hub.persist = _persist_event if _persist_enabled() else None
+    progress_bus = create_bus(progress_hub, db_path=_db_path())
+    progress_bus.start()
+    job_runner.reopen()
+    maintenance = start_maintenance_thread(db_path=_db_path())
+    try:
+        yield
+    finally:
+        dropped, cancelled = await job_runner.drain()
+        for execution_id in dropped + cancelled:
+            await _fail_execution(execution_id, "Server shut down before the execution finished")
+        # A feeder waiting for a slot held by a dropped item would never wake up: cancel the feeders
+        # and fail whatever they had not handed to the runner yet
+        feeders = dict(_batch_tasks)
+        for task in feeders:
+            task.cancel()
+        await asyncio.gather(*feeders, return_exceptions=True)
+        for execution_id in [eid for ids in feeders.values() for eid in ids]:
+            row = await async_repository.get_execution(execution_id, db_path=_db_path())
+            if row and row.get("status") not in _FINISHED:
+                await _fail_execution(execution_id, "Server shut down before the execution started")
+        await asyncio.to_thread(progress_bus.stop)
+        if maintenance is not None:
+            await asyncio.to_thread(maintenance.stop)
+        await asyncio.to_thread(shutdown_logging)
+
+
+app = FastAPI(title="YouTube Shorts Generator API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +119,39 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def _observe_request(request: Request, call_next):
+    """HTTP latency by route template (not raw path, to keep label cardinality bounded)."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+
+def _live_metrics() -> list:
+    """Scrape-time gauges from this worker's runner and progress hub."""
+    stats = job_runner.stats()
+    return [
+        ("shorts_executions_running", "gauge", "Pipeline runs executing in this worker.", [({}, stats["running"])]),
+        ("shorts_executions_queued", "gauge", "Pipeline runs waiting for a run slot.", [({}, stats["queued"])]),
+        ("shorts_progress_subscribers", "gauge", "Open progress streams (WebSocket/SSE).",
+         [({}, progress_hub.total_subscribers())]),
+    ]
+
+
+metrics.register_collector(_live_metrics)
+
+
 # --- Schemas ---
 
 
@@ -56,6 +162,28 @@ class GenerateRequest(BaseModel):
 
 class GenerateResponse(BaseModel):
     execution_id: int
+    queue_position: int = 0  # 0 = started immediately
+    eta_seconds: Optional[float] = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+class BatchRequest(BaseModel):
+    topics: Optional[List[str]] = None  # one item per topic (cycled if count is larger)
+    count: Optional[int] = Field(None, ge=1, le=BATCH_MAX_ITEMS)  # items; required without topics
+    # Batch items in the job runner at once; clamped to JOB_MAX_CONCURRENT
+    concurrency: Optional[int] = Field(None, ge=1, le=BATCH_MAX_ITEMS)
+    config_overrides: Optional[dict] = None
+
+
+class BatchResponse(BaseModel):
+    batch_id: int
+    execution_ids: List[int]
 
 
 class ConfigUpdateRequest(BaseModel):
@@ -65,32 +193,25 @@ class ConfigUpdateRequest(BaseModel):
 # --- Pipeline runner ---
 
 
+async def _fail_execution(execution_id: int, message: str) -> None:
+    await async_repository.update_execution(
+        execution_id, status=models.STATUS_FAILED, error_message=message, db_path=_db_path()
+    )
+    progress_bus.publish(execution_id, {"agent": "pipeline", "step": "error", "percent": 0, "log": message})
+    progress_bus.close(execution_id)
+
+
 async def _run_pipeline(execution_id: int, topic: Optional[str], config_overrides: Optional[dict]) -> None:
     """Run pipeline in background; broadcast progress to WebSocket subscribers."""
-    from src.agents.research_agent import ResearchAgent
-    from src.agents.script_agent import ScriptAgent
-    from src.agents.uniqueness_agent import UniquenessAgent
-    from src.agents.tts_agent import TTSAgent
-    from src.agents.video_agent import VideoAgent
-    from src.agents.composition_agent import CompositionAgent
-    from src.agents.quality_agent import QualityAgent
-    from src.agents.publishing_agent import PublishingAgent
+    from src.agents.registry import default_agents
     from src.orchestration.pipeline import Pipeline
 
-    agents = [
-        ResearchAgent, ScriptAgent, UniquenessAgent, TTSAgent,
-        VideoAgent, CompositionAgent, QualityAgent, PublishingAgent,
-    ]
-    pipeline = Pipeline(agents=agents, db_path=_db_path())
+    pipeline = Pipeline(agents=default_agents(), db_path=_db_path())
 
     async def progress_cb(agent_name: str, step: str, percent: float, log_message: str) -> None:
-        subs = _progress_subscribers.get(execution_id, set()).copy()
-        msg = {"agent": agent_name, "step": step, "percent": percent, "log": log_message}
-        for ws in subs:
-            try:
-                await ws.send_json(msg)
-            except Exception:
-                pass
+        progress_bus.publish(
+            execution_id, {"agent": agent_name, "step": step, "percent": percent, "log": log_message}
+        )
 
     try:
         await pipeline.run(
@@ -100,39 +221,187 @@ async def _run_pipeline(execution_id: int, topic: Optional[str], config_override
             execution_id=execution_id,
         )
     except Exception as e:
-        subs = _progress_subscribers.get(execution_id, set()).copy()
-        for ws in subs:
-            try:
-                await ws.send_json({"agent": "pipeline", "step": "error", "percent": 0, "log": str(e)})
-            except Exception:
-                pass
+        progress_bus.publish(execution_id, {"agent": "pipeline", "step": "error", "percent": 0, "log": str(e)})
     finally:
-        _progress_subscribers.pop(execution_id, None)
+        progress_bus.close(execution_id)
+
+
+async def _shared_research(execution_id: int) -> List[str]:
+    """Run research once for a batch (cost logged on execution_id); returns topic titles."""
+    from src.agents.base_agent import ExecutionContext
+    from src.agents.registry import get_agent
+    context = ExecutionContext(execution_id=execution_id, current_stage="research", data={})
+    research = await asyncio.to_thread(get_agent("research").resolve)
+    result = await research().execute(context)
+    if not result.success:
+        raise RuntimeError(result.message or "research failed")
+    return [t["title"] for t in (result.data or {}).get("topics", []) if t.get("title")]
+
+
+async def _run_batch(
+    batch_id: int,
+    execution_ids: List[int],
+    topics: Optional[List[str]],
+    concurrency: int,
+    config_overrides: Optional[dict],
+) -> None:
+    """Feed a batch's executions to the job runner, at most concurrency at a time. Without topics,
+    research runs once and its topic list is shared round-robin (pipelines then skip research)."""
+    if not topics:
+        try:
+            topics = await _shared_research(execution_ids[0])
+            if not topics:
+                raise RuntimeError("research returned no topics")
+        except Exception as e:
+            for execution_id in execution_ids:
+                await _fail_execution(execution_id, f"Batch research failed: {e}")
+            return
+        await async_repository.set_batch_topics(batch_id, topics, db_path=_db_path())
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run_item(execution_id: int, topic: str) -> None:
+        try:
+            await _run_pipeline(execution_id, topic, config_overrides)
+        finally:
+            slots.release()
+
+    for i, execution_id in enumerate(execution_ids):
+        await slots.acquire()
+        topic = topics[i % len(topics)]
+        handed_off = False
+        try:
+            while job_runner.accepting:
+                try:
+                    job_runner.submit(execution_id, lambda eid=execution_id, t=topic: run_item(eid, t))
+                    handed_off = True
+                    break
+                except QueueFull as e:
+                    await asyncio.sleep(min(e.retry_after, 5))
+        finally:
+            # run_item releases the slot of a submitted item; anything else gives it back here
+            if not handed_off:
+                slots.release()
+        if not handed_off:
+            for remaining in execution_ids[i:]:
+                await _fail_execution(remaining, "Server shut down before the execution started")
+            return
+
+
+def _batch_status(counts: dict, total: int) -> str:
+    finished = counts[models.STATUS_COMPLETED] + counts[models.STATUS_FAILED]
+    if finished == total:
+        if not counts[models.STATUS_FAILED]:
+            return models.STATUS_COMPLETED
+        return models.STATUS_FAILED if not counts[models.STATUS_COMPLETED] else "partial"
+    if finished or counts[models.STATUS_IN_PROGRESS]:
+        return models.STATUS_IN_PROGRESS
+    return models.STATUS_PENDING
 
 
 # --- Routes ---
 
 
+def _queue_fields(execution_id: int) -> dict:
+    eta = job_runner.eta(execution_id)
+    return {
+        "queue_position": job_runner.position(execution_id) or 0,
+        "eta_seconds": round(eta, 1) if eta is not None else None,
+    }
+
+
 @app.post("/api/generate", response_model=GenerateResponse)
-async def generate(req: GenerateRequest, background_tasks: BackgroundTasks) -> GenerateResponse:
-    """Start generation; returns execution_id. Pipeline runs async."""
-    root = _project_root_api()
-    load_env(root / ".env")
-    run_migrations(_db_path())
+async def generate(req: GenerateRequest) -> GenerateResponse:
+    """Queue generation; returns execution_id and queue position. 429 with Retry-After when the
+    runner's slots and queue are full (or it is draining)."""
     from src.orchestration.state_manager import create_execution
-    execution_id = create_execution(db_path=_db_path())
-    background_tasks.add_task(_run_pipeline, execution_id, req.topic, req.config_overrides)
-    return GenerateResponse(execution_id=execution_id)
+    if not job_runner.accepting or job_runner.saturated():
+        retry = job_runner.retry_after()
+        raise HTTPException(status_code=429, detail="Too many executions queued", headers={"Retry-After": str(retry)})
+    execution_id = await async_repository.run_write(create_execution, db_path=_db_path())
+    try:
+        job_runner.submit(execution_id, lambda: _run_pipeline(execution_id, req.topic, req.config_overrides))
+    except QueueFull as e:
+        # Filled up while the row was being created
+        await _fail_execution(execution_id, "Rejected: job queue full")
+        raise HTTPException(status_code=429, detail="Too many executions queued", headers={"Retry-After": str(e.retry_after)})
+    return GenerateResponse(execution_id=execution_id, **_queue_fields(execution_id))
+
+
+@app.post("/api/generate/batch", response_model=BatchResponse)
+async def generate_batch(req: BatchRequest) -> BatchResponse:
+    """Queue a batch: one execution per topic (or count executions sharing one research run).
+    Items go through the job runner, at most concurrency (default BATCH_CONCURRENCY, 1; never more than
+    the runner's max_concurrent) at a time."""
+    topics = [t.strip() for t in (req.topics or []) if t.strip()]
+    size = req.count or len(topics)
+    if not size:
+        raise HTTPException(status_code=422, detail="Provide topics or count")
+    if size > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"A batch has at most {BATCH_MAX_ITEMS} items")
+    if not job_runner.accepting or job_runner.saturated():
+        retry = job_runner.retry_after()
+        raise HTTPException(status_code=429, detail="Too many executions queued", headers={"Retry-After": str(retry)})
+    concurrency = req.concurrency or _env_int("BATCH_CONCURRENCY", 1)
+    # More would only park items in run slots other requests could use
+    concurrency = max(1, min(concurrency, job_runner.max_concurrent))
+    batch_id, execution_ids = await async_repository.create_batch(
+        size, concurrency, topics or None, db_path=_db_path()
+    )
+    task = asyncio.create_task(_run_batch(batch_id, execution_ids, topics, concurrency, req.config_overrides))
+    _batch_tasks[task] = execution_ids
+    task.add_done_callback(lambda t: _batch_tasks.pop(t, None))
+    return BatchResponse(batch_id=batch_id, execution_ids=execution_ids)
+
+
+@app.get("/api/batch/{batch_id}")
+async def get_batch(batch_id: int) -> dict:
+    """Aggregate batch progress: status, per-status counts, percent finished, total cost, and
+    per-item status (with queue position)."""
+    batch = await async_repository.get_batch(batch_id, db_path=_db_path())
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    items = batch["executions"]
+    counts = {s: 0 for s in (models.STATUS_PENDING, models.STATUS_IN_PROGRESS, models.STATUS_COMPLETED, models.STATUS_FAILED)}
+    for item in items:
+        counts[item["status"]] = counts.get(item["status"], 0) + 1
+        item["queue_position"] = job_runner.position(item["id"]) or 0
+    total = batch["total"]
+    finished = counts[models.STATUS_COMPLETED] + counts[models.STATUS_FAILED]
+    return {
+        "batch_id": batch_id,
+        "created_at": batch["created_at"],
+        "status": _batch_status(counts, total),
+        "total": total,
+        "concurrency": batch["concurrency"],
+        "topics": batch["topics"],
+        "counts": counts,
+        "percent": round(100.0 * finished / total, 1) if total else 100.0,
+        "cost_total": round(sum(item.get("cost_total") or 0.0 for item in items), 6),
+        "executions": items,
+    }
 
 
 @app.get("/api/status/{execution_id}")
-async def get_status(execution_id: int) -> dict:
-    """Execution status, current_stage, progress %, cost."""
-    run_migrations(_db_path())
-    row = repository.get_execution(execution_id, db_path=_db_path())
+async def get_status(
+    execution_id: int,
+    wait_for_change: float = Query(0, ge=0, le=60),
+    since: Optional[int] = Query(None, ge=0),
+) -> dict:
+    """Execution status, current_stage, progress %, cost, the latest progress seq, and for queued or
+    running executions queue_position (1 = next; 0 = not waiting) and eta_seconds (estimated finish).
+
+    Long-poll: with wait_for_change=<seconds>, a running execution answers once a progress event
+    after since (default: the latest seq) is published, it finishes, or the wait times out.
+    """
+    db = _db_path()
+    row = await async_repository.get_execution(execution_id, db_path=db)
     if not row:
         raise HTTPException(status_code=404, detail="Execution not found")
-    cost = repository.get_execution_cost_total(execution_id, db_path=_db_path())
+    if wait_for_change and row.get("status") not in _FINISHED:
+        after = since if since is not None else progress_hub.latest_seq(execution_id)
+        await progress_hub.wait_for_change(execution_id, after, wait_for_change)
+        row = await async_repository.get_execution(execution_id, db_path=db) or row
+    cost = await async_repository.get_execution_cost_total(execution_id, db_path=db)
     return {
         "execution_id": execution_id,
         "status": row.get("status"),
@@ -141,34 +410,115 @@ async def get_status(execution_id: int) -> dict:
         "error_message": row.get("error_message"),
         "output_path": row.get("output_path"),
         "topic": row.get("topic"),
+        "seq": progress_hub.latest_seq(execution_id),
+        **_queue_fields(execution_id),
     }
 
 
+@app.get("/api/executions/{execution_id}/trace")
+async def get_trace(execution_id: int, response: Response) -> dict:
+    """Chrome trace-event JSON of a traced execution (snapshot while running); 404 if it was not sampled."""
+    trace = await asyncio.to_thread(tracing.load_trace, execution_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="No trace for this execution (see TRACE_SAMPLE_RATE)")
+    response.headers["Content-Disposition"] = f'inline; filename="execution-{execution_id}.trace.json"'
+    return trace
+
+
+# (db, filters) -> (monotonic time, total): history pages reuse one COUNT(*) per filter set for
+# HISTORY_TOTAL_TTL_SEC instead of counting on every page
+_history_totals: "OrderedDict[tuple, Tuple[float, int]]" = OrderedDict()
+_HISTORY_TOTALS_MAX = 128
+_history_total_flight = SingleFlight()
+
+
+async def _history_total(db: Optional[Path], filters: dict) -> int:
+    key = (str(db), tuple(sorted(filters.items())))
+    hit = _history_totals.get(key)
+    if hit is not None and time.monotonic() - hit[0] < float(os.getenv("HISTORY_TOTAL_TTL_SEC") or 30):
+        return hit[1]
+    total = await _history_total_flight.do_async(key, async_repository.get_executions_count, db_path=db, **filters)
+    _history_totals[key] = (time.monotonic(), total)
+    _history_totals.move_to_end(key)
+    while len(_history_totals) > _HISTORY_TOTALS_MAX:
+        _history_totals.popitem(last=False)
+    return total
+
+
 @app.get("/api/history")
 async def get_history(
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[int] = Query(None, ge=1, description="next_cursor from the previous page"),
+    status: Optional[str] = None,
+    topic_prefix: Optional[str] = None,
+    since: Optional[str] = Query(None, description="ISO start_time lower bound (inclusive)"),
+    until: Optional[str] = Query(None, description="ISO start_time upper bound (exclusive)"),
+    min_cost: Optional[float] = None,
+    max_cost: Optional[float] = None,
+    fields: str = Query("all", pattern="^(all|summary)$"),
+    include_total: bool = True,
+) -> dict:
+    """List past executions, newest first. Use next_cursor as cursor for the next page
+    (offset still works but costs grow with depth). total is a COUNT cached per filter set for
+    HISTORY_TOTAL_TTL_SEC (default 30); include_total=false omits it."""
+    db = _db_path()
+    filters = dict(
+        status=status, topic_prefix=topic_prefix, since=since, until=until,
+        min_cost=min_cost, max_cost=max_cost,
+    )
+    columns = models.EXECUTION_SUMMARY_COLUMNS if fields == "summary" else None
+    page, next_cursor = await async_repository.list_executions(
+        limit, db_path=db, before_id=cursor, columns=columns, offset=offset, **filters
+    )
+    result = {"executions": page, "next_cursor": next_cursor}
+    if include_total:
+        result["total"] = await _history_total(db, filters)
+    return result
+
+
+@app.get("/api/stats")
+async def get_stats(
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    metric: Optional[str] = Query(None, pattern="^(cost|executions|failed_stage)$"),
+    since: Optional[str] = Query(None, description="ISO time lower bound (inclusive)"),
+    until: Optional[str] = Query(None, description="ISO time upper bound (exclusive)"),
 ) -> dict:
-    """List past executions (paginated)."""
-    run_migrations(_db_path())
-    total = repository.get_executions_count(db_path=_db_path())
-    rows = repository.get_last_executions(n=limit + offset, db_path=_db_path())
-    page = rows[offset : offset + limit]
-    return {"executions": page, "total": total}
+    """Hourly/daily aggregates (cost per component, executions per status, failures per stage)
+    plus the current month's spend against cost.monthly_alert."""
+    from src.utils.cost_tracker import monthly_budget_status
+    db = _db_path()
+    rows = await async_repository.get_rollups(granularity, db_path=db, metric=metric, since=since, until=until)
+    budget = await async_repository.run_read(monthly_budget_status, db_path=db)
+    return {"granularity": granularity, "rows": rows, "budget": budget}
 
 
 @app.get("/api/health")
-async def health() -> dict:
-    """Same as CLI health (run_all_checks). Return JSON."""
-    root = _project_root_api()
-    load_env(root / ".env")
-    return run_all_checks(root)
+async def health(fresh: bool = Query(False)) -> dict:
+    """Readiness: the CLI health checks (run concurrently, time-boxed), cached for HEALTH_CACHE_TTL_SEC.
+    ?fresh=1 re-runs them. Load balancer probes should use /api/health/live."""
+    return await asyncio.to_thread(cached_checks, _project_root_api(), fresh)
+
+
+@app.get("/api/health/live")
+async def liveness() -> dict:
+    """Liveness: the process serves requests. No I/O, so it never waits on the DB or providers."""
+    return {"ok": True, "uptime_sec": round(time.monotonic() - _STARTED, 1)}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """Prometheus scrape endpoint (text exposition format) for this worker process."""
+    counts = await async_repository.count_messages_by_status(db_path=_db_path())
+    depth = [({"status": status}, n) for status, n in sorted(counts.items())]
+    extra = [("shorts_message_queue_depth", "gauge", "Agent messages by status.", depth)]
+    return PlainTextResponse(metrics.render(extra), media_type=metrics.CONTENT_TYPE)
 
 
 @app.get("/api/config")
 async def get_config_route() -> dict:
     """Current config (non-secret)."""
-    cfg = load_config()
+    cfg = get_settings().data
     return {k: v for k, v in cfg.items() if k not in ("secrets", "api_keys")}
 
 
@@ -188,39 +538,151 @@ async def put_config(req: ConfigUpdateRequest) -> dict:
     import copy
     import yaml
     root = _project_root_api()
-    current = load_config()
+    current = get_settings().data
     merged = _deep_merge(copy.deepcopy(current), req.config)
     with open(root / "config.yaml", "w") as f:
         yaml.safe_dump(merged, f, default_flow_style=False, sort_keys=False)
+    invalidate_settings()
     return {"ok": True}
 
 
-@app.get("/api/video/{execution_id}")
-async def get_video(execution_id: int) -> FileResponse:
-    """Serve generated video file for preview."""
-    run_migrations(_db_path())
-    row = repository.get_execution(execution_id, db_path=_db_path())
+# execution_id -> output_path of completed executions (the row no longer changes)
+_video_paths: "OrderedDict[int, str]" = OrderedDict()
+_VIDEO_PATHS_MAX = 256
+
+
+async def _video_path(execution_id: int) -> str:
+    cached = _video_paths.get(execution_id)
+    if cached is not None:
+        _video_paths.move_to_end(execution_id)
+        return cached
+    row = await async_repository.get_execution(execution_id, db_path=_db_path())
     if not row:
         raise HTTPException(status_code=404, detail="Execution not found")
     output_path = row.get("output_path")
-    if not output_path or not Path(output_path).exists():
+    if not output_path:
+        raise HTTPException(status_code=404, detail="Video not found")
+    if row.get("status") == models.STATUS_COMPLETED:
+        _video_paths[execution_id] = output_path
+        while len(_video_paths) > _VIDEO_PATHS_MAX:
+            _video_paths.popitem(last=False)
+    return output_path
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+def _media_response(request: Request, path: Path, media_type: str) -> Response:
+    """File response with a size+mtime ETag: 304 for a matching If-None-Match, otherwise a
+    FileResponse (which serves Range / If-Range requests as 206 partial content)."""
+    try:
+        st = path.stat()
+    except OSError:
         raise HTTPException(status_code=404, detail="Video not found")
-    return FileResponse(output_path, media_type="video/mp4")
+    headers = {"etag": f'"{media.file_tag(st)}"', "cache-control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, headers["etag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, stat_result=st, headers=headers)
+
+
+@app.get("/api/video/{execution_id}")
+async def get_video(
+    execution_id: int,
+    request: Request,
+    rendition: str = Query(media.RENDITION_MASTER, pattern="^(master|preview|poster)$"),
+) -> Response:
+    """Serve the generated video (master), a low-bitrate preview MP4 or a poster JPEG.
+
+    Renditions are rendered on first request and cached; a preview that cannot be rendered falls
+    back to the master. Supports Range requests and conditional GET (ETag / If-None-Match).
+    """
+    master = Path(await _video_path(execution_id))
+    path = await asyncio.to_thread(media.ensure_rendition, master, rendition)
+    if path is None and rendition == media.RENDITION_PREVIEW:
+        rendition = media.RENDITION_MASTER
+        path = await asyncio.to_thread(media.ensure_rendition, master, rendition)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Video not found")
+    return _media_response(request, path, media.MEDIA_TYPES[rendition])
+
+
+async def _subscribe(execution_id: int, since: Optional[int]) -> Subscriber:
+    """Hub subscription with replay after since. Without an in-memory log (e.g. after a restart)
+    persisted events are replayed, and the stream ends at once if the execution already finished."""
+    preload: list = []
+    # Without since the stream starts at connect time: events published while the DB lookups
+    # below are awaited are replayed from the log rather than missed
+    start = since if since is not None else progress_hub.latest_seq(execution_id)
+    if not progress_hub.has_log(execution_id):
+        db = _db_path()
+        if since is not None and _persist_enabled():
+            preload = await async_repository.get_progress_events(execution_id, since, db_path=db)
+        row = await async_repository.get_execution(execution_id, db_path=db)
+        if row and row.get("status") in _FINISHED and not progress_hub.has_log(execution_id):
+            sub = Subscriber(progress_hub.queue_size, progress_hub.policy)
+            for event in preload:
+                sub.offer(event)
+            sub.close()
+            return sub
+    return progress_hub.subscribe(execution_id, since=start, preload=preload)
 
 
 @app.websocket("/ws/progress/{execution_id}")
-async def websocket_progress(websocket: WebSocket, execution_id: int) -> None:
-    """Real-time pipeline progress (agent name, step, %, logs)."""
+async def websocket_progress(websocket: WebSocket, execution_id: int, since: Optional[int] = None) -> None:
+    """Real-time pipeline progress (agent name, step, %, logs, seq). One sender task per socket.
+    ?since=<seq> first replays logged events after seq (since=0: everything logged)."""
     await websocket.accept()
-    if execution_id not in _progress_subscribers:
-        _progress_subscribers[execution_id] = set()
-    _progress_subscribers[execution_id].add(websocket)
+    sub = await _subscribe(execution_id, since)
+    sender = asyncio.create_task(_send_until_done(websocket, sub))
     try:
         while True:
             _ = await websocket.receive_text()
     except Exception:
         pass
     finally:
-        _progress_subscribers.get(execution_id, set()).discard(websocket)
-        if not _progress_subscribers.get(execution_id):
-            _progress_subscribers.pop(execution_id, None)
+        progress_hub.unsubscribe(execution_id, sub)
+        sender.cancel()
+
+
+async def _send_until_done(websocket: WebSocket, sub) -> None:
+    """Deliver queued events; close the socket once the pipeline's stream ends."""
+    try:
+        await send_events(websocket, sub)
+        await websocket.close()
+    except Exception:
+        pass  # client went away; the receive loop cleans up
+
+
+@app.get("/api/progress/{execution_id}/events")
+async def progress_events(
+    execution_id: int,
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None),
+) -> StreamingResponse:
+    """Server-Sent Events stream of progress: replays logged events after since (or the
+    Last-Event-ID an EventSource sends on reconnect; default 0), then follows live until the run ends."""
+    if since is None:
+        since = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    sub = await _subscribe(execution_id, since)
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.get(), SSE_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    yield "event: end\ndata: {}\n\n"
+                    return
+                yield f"id: {event.get('seq', '')}\nevent: progress\ndata: {json.dumps(event)}\n\n"
+        finally:
+            progress_hub.unsubscribe(execution_id, sub)
+
+    return StreamingResponse(
+        stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
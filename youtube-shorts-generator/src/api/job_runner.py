@@ -0,0 +1,162 @@
+"""
+Managed pipeline runner: at most JOB_MAX_CONCURRENT executions run at once, up to JOB_MAX_QUEUED
+wait in FIFO order, and anything beyond that is refused (``QueueFull``, HTTP 429 with Retry-After).
+
+Queue position and ETA come from the running jobs' elapsed time and the mean duration of recent
+jobs (``DEFAULT_ESTIMATE_SEC`` until one has finished). ``drain()`` stops admission, drops waiting
+jobs and lets running ones finish (cancelling them after a timeout); the API calls it on shutdown.
+
+Settings: JOB_MAX_CONCURRENT (default 1), JOB_MAX_QUEUED (default 10), JOB_DRAIN_TIMEOUT_SEC (default 600).
+Call submit/position/eta from the event loop thread.
+"""
+import asyncio
+import heapq
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_CONCURRENT = 1
+DEFAULT_MAX_QUEUED = 10
+DEFAULT_DRAIN_TIMEOUT_SEC = 600.0
+DEFAULT_ESTIMATE_SEC = 300.0
+DURATION_SAMPLES = 20
+
+JobFn = Callable[[], Awaitable[Any]]
+
+
+class QueueFull(Exception):
+    """Every run slot and queue slot is taken; retry_after is a hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobRunner:
+    """Bounded concurrency + bounded FIFO queue of async jobs keyed by id."""
+
+    def __init__(self, max_concurrent: Optional[int] = None, max_queued: Optional[int] = None):
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("JOB_MAX_CONCURRENT") or DEFAULT_MAX_CONCURRENT)
+        if max_queued is None:
+            max_queued = int(os.getenv("JOB_MAX_QUEUED") or DEFAULT_MAX_QUEUED)
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queued = max(0, max_queued)
+        self._waiting: "OrderedDict[int, JobFn]" = OrderedDict()
+        self._running: Dict[int, Tuple[asyncio.Task, float]] = {}
+        self._durations: Deque[float] = deque(maxlen=DURATION_SAMPLES)
+        self._accepting = True
+
+    # --- Admission ---
+
+    @property
+    def accepting(self) -> bool:
+        return self._accepting
+
+    def saturated(self) -> bool:
+        return len(self._running) >= self.max_concurrent and len(self._waiting) >= self.max_queued
+
+    def submit(self, job_id: int, fn: JobFn) -> int:
+        """Start fn() now or queue it; returns the queue position (0 = running). Raises QueueFull."""
+        self._prune_stale()
+        if not self._accepting or self.saturated():
+            raise QueueFull(self.retry_after())
+        self._waiting[job_id] = fn
+        self._start_ready()
+        return self.position(job_id) or 0
+
+    def _prune_stale(self) -> None:
+        # Tasks whose event loop has closed will never finish; free their slots
+        for job_id in [j for j, (t, _) in self._running.items() if t.get_loop().is_closed()]:
+            del self._running[job_id]
+
+    def _start_ready(self) -> None:
+        while self._waiting and len(self._running) < self.max_concurrent:
+            job_id, fn = self._waiting.popitem(last=False)
+            task = asyncio.get_running_loop().create_task(fn())
+            self._running[job_id] = (task, time.monotonic())
+            task.add_done_callback(lambda t, job_id=job_id: self._finished(job_id, t))
+
+    def _finished(self, job_id: int, task: asyncio.Task) -> None:
+        _, started = self._running.pop(job_id, (None, time.monotonic()))
+        if not task.cancelled():
+            self._durations.append(time.monotonic() - started)
+        if self._accepting:
+            self._start_ready()
+
+    # --- Introspection ---
+
+    def is_running(self, job_id: int) -> bool:
+        return job_id in self._running
+
+    def position(self, job_id: int) -> Optional[int]:
+        """1-based place in the waiting queue, or None if not waiting."""
+        for i, jid in enumerate(self._waiting, 1):
+            if jid == job_id:
+                return i
+        return None
+
+    def mean_duration(self) -> float:
+        return sum(self._durations) / len(self._durations) if self._durations else DEFAULT_ESTIMATE_SEC
+
+    def _slot_free_times(self) -> List[float]:
+        """Estimated seconds until each run slot is free (0 for idle slots)."""
+        now, mean = time.monotonic(), self.mean_duration()
+        busy = [max(0.0, mean - (now - started)) for _, started in self._running.values()]
+        return busy + [0.0] * (self.max_concurrent - len(busy))
+
+    def eta(self, job_id: int) -> Optional[float]:
+        """Estimated seconds until job_id finishes, or None if unknown to the runner."""
+        mean = self.mean_duration()
+        if job_id in self._running:
+            _, started = self._running[job_id]
+            return max(0.0, mean - (time.monotonic() - started))
+        pos = self.position(job_id)
+        if pos is None:
+            return None
+        slots = self._slot_free_times()
+        heapq.heapify(slots)
+        # Jobs ahead take the earliest free slot in turn
+        for _ in range(pos - 1):
+            heapq.heappush(slots, heapq.heappop(slots) + mean)
+        return slots[0] + mean
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is expected to free up (at least 1)."""
+        return max(1, math.ceil(min(self._slot_free_times())))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": len(self._running),
+            "queued": len(self._waiting),
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "mean_duration_sec": round(self.mean_duration(), 1),
+            "accepting": self._accepting,
+        }
+
+    # --- Shutdown ---
+
+    async def drain(self, timeout: Optional[float] = None) -> Tuple[List[int], List[int]]:
+        """Stop admission, drop waiting jobs and wait for running ones (cancelled after timeout).
+        Returns (dropped waiting ids, cancelled running ids)."""
+        if timeout is None:
+            timeout = float(os.getenv("JOB_DRAIN_TIMEOUT_SEC") or DEFAULT_DRAIN_TIMEOUT_SEC)
+        self._accepting = False
+        dropped = list(self._waiting)
+        self._waiting.clear()
+        self._prune_stale()
+        running = {task: job_id for job_id, (task, _) in self._running.items()}
+        if not running:
+            return dropped, []
+        _, pending = await asyncio.wait(running, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        return dropped, [running[task] for task in pending]
+
+    def reopen(self) -> None:
+        """Accept jobs again after drain (the next app startup in the same process)."""
+        self._accepting = True
@@ -0,0 +1,167 @@
+"""
+Progress transport between API worker processes.
+
+The worker running a pipeline publishes through a bus; every worker's ``ProgressHub`` serves its own
+WebSocket/SSE/long-poll clients. Transports (PROGRESS_TRANSPORT):
+
+- ``local`` (default): in-process only; publish goes straight to the hub. Right for a single worker.
+- ``sqlite``: events are also appended to the ``progress_bus`` table of the app database. A poller
+  thread in each worker watches ``PRAGMA data_version`` (a no-I/O check that changes when another
+  connection commits), reads new rows from other workers and hands them to its hub with their
+  original seq, so ``uvicorn --workers N`` clients see every run's progress whichever worker runs it.
+
+Rows older than PROGRESS_BUS_RETENTION_SEC (default 600) are deleted by the pollers.
+PROGRESS_BUS_POLL_MS (default 100) is the poll interval.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.api.progress_hub import ProgressHub
+from src.database import async_repository
+from src.database import repository
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT_LOCAL = "local"
+TRANSPORT_SQLITE = "sqlite"
+DEFAULT_POLL_MS = 100
+DEFAULT_RETENTION_SEC = 600
+PRUNE_EVERY_SEC = 60
+READ_BATCH = 1000
+
+CLOSED_KEY = "closed"  # marker event: the run's stream ended
+
+
+class LocalBus:
+    """In-process transport: the hub is the only consumer."""
+
+    def __init__(self, hub: ProgressHub):
+        self.hub = hub
+
+    def publish(self, execution_id: int, event: dict) -> dict:
+        return self.hub.publish(execution_id, event)
+
+    def close(self, execution_id: int) -> None:
+        self.hub.close(execution_id)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+def _insert(rows: List[Tuple[str, int, str, float]], db_path: Optional[Path] = None) -> None:
+    repository.ensure_schema(db_path)
+    with repository._connection(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO progress_bus (origin, execution_id, event, created) VALUES (?, ?, ?, ?)", rows
+        )
+        conn.commit()
+
+
+class SQLiteBus(LocalBus):
+    """Transport through the ``progress_bus`` table; call start()/stop() on the event loop thread."""
+
+    def __init__(
+        self,
+        hub: ProgressHub,
+        db_path: Optional[Path] = None,
+        poll_ms: Optional[int] = None,
+        retention_sec: Optional[float] = None,
+    ):
+        super().__init__(hub)
+        self.db_path = db_path
+        self.poll_sec = (poll_ms or int(os.getenv("PROGRESS_BUS_POLL_MS") or DEFAULT_POLL_MS)) / 1000.0
+        self.retention_sec = retention_sec or float(os.getenv("PROGRESS_BUS_RETENTION_SEC") or DEFAULT_RETENTION_SEC)
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._writes: set = set()
+
+    def _write(self, execution_id: int, event: dict) -> None:
+        # Appended on the DB writer thread, in publish order; publish never waits for it
+        row = (self.origin, execution_id, json.dumps(event), time.time())
+        task = asyncio.get_running_loop().create_task(async_repository.run_write(_insert, [row], self.db_path))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    def publish(self, execution_id: int, event: dict) -> dict:
+        event = self.hub.publish(execution_id, event)
+        self._write(execution_id, event)
+        return event
+
+    def close(self, execution_id: int) -> None:
+        self.hub.close(execution_id)
+        self._write(execution_id, {CLOSED_KEY: True, "seq": self.hub.latest_seq(execution_id)})
+
+    def _ingest(self, rows: List[Tuple[int, str]]) -> None:
+        for execution_id, raw in rows:
+            event = json.loads(raw)
+            if event.get(CLOSED_KEY):
+                self.hub.close(execution_id)
+            else:
+                self.hub.deliver(execution_id, event)
+
+    def _run(self, conn: sqlite3.Connection, last_id: int) -> None:
+        try:
+            version = None
+            next_prune = time.monotonic() + PRUNE_EVERY_SEC
+            while not self._stop_event.wait(self.poll_sec):
+                try:
+                    if time.monotonic() >= next_prune:
+                        next_prune = time.monotonic() + PRUNE_EVERY_SEC
+                        conn.execute("DELETE FROM progress_bus WHERE created < ?", (time.time() - self.retention_sec,))
+                        conn.commit()
+                    current = conn.execute("PRAGMA data_version").fetchone()[0]
+                    if current == version:
+                        continue
+                    rows = conn.execute(
+                        "SELECT id, origin, execution_id, event FROM progress_bus WHERE id > ? ORDER BY id LIMIT ?",
+                        (last_id, READ_BATCH),
+                    ).fetchall()
+                    # A full batch may have more behind it: re-read next tick even if nothing new commits
+                    version = current if len(rows) < READ_BATCH else None
+                    if rows:
+                        last_id = rows[-1][0]
+                        remote = [(r[2], r[3]) for r in rows if r[1] != self.origin]
+                        if remote:
+                            self._loop.call_soon_threadsafe(self._ingest, remote)
+                except Exception:
+                    logger.exception("Progress bus poll failed")
+        finally:
+            conn.close()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop_event.clear()
+        conn = repository._open(repository._resolve_path(self.db_path))
+        # Only events published from now on; earlier runs are served from their own replay
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM progress_bus").fetchone()[0]
+        self._thread = threading.Thread(target=self._run, args=(conn, last_id), name="progress-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def create_bus(hub: ProgressHub, db_path: Optional[Path] = None, transport: Optional[str] = None) -> LocalBus:
+    """Bus for PROGRESS_TRANSPORT (``local`` | ``sqlite``)."""
+    transport = (transport or os.getenv("PROGRESS_TRANSPORT") or TRANSPORT_LOCAL).strip().lower()
+    if transport == TRANSPORT_SQLITE:
+        return SQLiteBus(hub, db_path=db_path)
+    if transport != TRANSPORT_LOCAL:
+        raise ValueError(f"PROGRESS_TRANSPORT must be {TRANSPORT_LOCAL} or {TRANSPORT_SQLITE}")
+    return LocalBus(hub)
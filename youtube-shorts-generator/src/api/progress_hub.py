@@ -0,0 +1,271 @@
+"""
+Progress fan-out: the pipeline publishes events without waiting on any client.
+
+``ProgressHub.publish`` is synchronous and O(1) per subscriber: it only appends to each
+subscriber's bounded queue. Every WebSocket has its own sender task draining its queue, so a
+slow or stalled tab only delays itself. When a queue is full the subscriber's policy applies:
+
+- ``drop_oldest``: discard the oldest queued event.
+- ``coalesce`` (default): replace the queued event from the same agent with the newer one
+  (progress for an agent supersedes earlier progress); drop the oldest if that agent has none queued.
+
+Every event also gets a per-execution ``seq`` (1, 2, ...) and is appended to that execution's
+bounded ring buffer, so late subscribers can replay with ``subscribe(..., since=seq)`` and
+long-poll clients can ``await wait_for_change(...)``. Logs of the last PROGRESS_LOG_EXECUTIONS runs
+are kept in memory; an optional ``persist(execution_id, event)`` hook stores events durably.
+``deliver`` ingests events published by another process (see ``progress_bus``) with their seq.
+
+Settings: PROGRESS_QUEUE_SIZE (default 100), PROGRESS_QUEUE_POLICY (``coalesce`` | ``drop_oldest``),
+PROGRESS_LOG_SIZE (events kept per execution, default 500), PROGRESS_LOG_EXECUTIONS (default 100).
+Call publish/subscribe/close from the event loop thread.
+"""
+import asyncio
+import os
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_COALESCE = "coalesce"
+POLICIES = (POLICY_DROP_OLDEST, POLICY_COALESCE)
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_LOG_SIZE = 500
+DEFAULT_LOG_EXECUTIONS = 100
+
+
+class Subscriber:
+    """Bounded queue of events for one client; iterate with ``async for`` until the stream closes."""
+
+    def __init__(self, maxsize: int = DEFAULT_QUEUE_SIZE, policy: str = POLICY_COALESCE):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(POLICIES)}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.dropped = 0
+        self._items: "OrderedDict[int, dict]" = OrderedDict()
+        self._by_agent: Dict[str, int] = {}
+        self._next = 0
+        self._closed = False
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def offer(self, event: dict) -> None:
+        """Queue event without blocking, applying the overflow policy."""
+        if self._closed:
+            return
+        agent = event.get("agent")
+        if len(self._items) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == POLICY_COALESCE and agent in self._by_agent:
+                self._items[self._by_agent[agent]] = event
+                return
+            key, old = self._items.popitem(last=False)
+            if self._by_agent.get(old.get("agent")) == key:
+                del self._by_agent[old.get("agent")]
+        key = self._next
+        self._next += 1
+        self._items[key] = event
+        if agent is not None:
+            self._by_agent[agent] = key
+        self._ready.set()
+
+    def close(self) -> None:
+        """End the stream once queued events are delivered."""
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[dict]:
+        """Next event, or None when the stream is closed and drained."""
+        while not self._items:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        key, event = self._items.popitem(last=False)
+        agent = event.get("agent")
+        if self._by_agent.get(agent) == key:
+            del self._by_agent[agent]
+        return event
+
+    def __aiter__(self) -> "Subscriber":
+        return self
+
+    async def __anext__(self) -> dict:
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+
+class _ExecutionLog:
+    """Ring buffer of one execution's events plus a change signal for long-pollers."""
+
+    def __init__(self, size: int):
+        self.events: Deque[dict] = deque(maxlen=size)
+        self.seq = 0
+        self.finished = False
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        # Wake current waiters; later waiters get a fresh event
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class ProgressHub:
+    """execution_id -> subscribers and event log; publish fans out into subscriber queues."""
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        policy: Optional[str] = None,
+        log_size: Optional[int] = None,
+        log_executions: Optional[int] = None,
+        persist: Optional[Callable[[int, dict], None]] = None,
+    ):
+        self.queue_size = queue_size or int(os.getenv("PROGRESS_QUEUE_SIZE") or DEFAULT_QUEUE_SIZE)
+        self.policy = policy or (os.getenv("PROGRESS_QUEUE_POLICY") or POLICY_COALESCE).strip()
+        self.log_size = log_size or int(os.getenv("PROGRESS_LOG_SIZE") or DEFAULT_LOG_SIZE)
+        self.log_executions = log_executions or int(os.getenv("PROGRESS_LOG_EXECUTIONS") or DEFAULT_LOG_EXECUTIONS)
+        self.persist = persist
+        self._subs: Dict[int, Set[Subscriber]] = {}
+        self._logs: "OrderedDict[int, _ExecutionLog]" = OrderedDict()
+        # Long-pollers of runs with no log here yet (unknown ids, other workers' runs): woken by the
+        # first event; entries go away with their last waiter so unknown ids never accumulate
+        self._first_event: Dict[int, asyncio.Event] = {}
+        self._first_waiters: Dict[int, int] = {}
+
+    def _log(self, execution_id: int) -> _ExecutionLog:
+        log = self._logs.get(execution_id)
+        if log is None:
+            log = self._logs[execution_id] = _ExecutionLog(self.log_size)
+            waiting = self._first_event.pop(execution_id, None)
+            if waiting is not None:
+                waiting.set()
+            # Forget the oldest finished runs beyond the limit
+            while len(self._logs) > self.log_executions:
+                oldest = next((eid for eid, l in self._logs.items() if l.finished), None)
+                if oldest is None:
+                    break
+                del self._logs[oldest]
+        return log
+
+    def has_log(self, execution_id: int) -> bool:
+        return execution_id in self._logs
+
+    def latest_seq(self, execution_id: int) -> int:
+        log = self._logs.get(execution_id)
+        return log.seq if log else 0
+
+    def is_finished(self, execution_id: int) -> bool:
+        log = self._logs.get(execution_id)
+        return bool(log and log.finished)
+
+    def replay(self, execution_id: int, since: int = 0) -> List[dict]:
+        """Logged events with seq > since (oldest first)."""
+        log = self._logs.get(execution_id)
+        return [e for e in log.events if e["seq"] > since] if log else []
+
+    def subscribe(
+        self,
+        execution_id: int,
+        since: Optional[int] = None,
+        preload: Iterable[dict] = (),
+    ) -> Subscriber:
+        """New subscriber; with since, first receives preload then logged events after since.
+        The stream is already closed (after the replay) if the run has finished."""
+        sub = Subscriber(self.queue_size, self.policy)
+        last = since or 0
+        for event in preload:
+            sub.offer(event)
+            last = max(last, event.get("seq", last))
+        if since is not None:
+            for event in self.replay(execution_id, last):
+                sub.offer(event)
+        if self.is_finished(execution_id):
+            sub.close()
+        else:
+            self._subs.setdefault(execution_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, execution_id: int, sub: Subscriber) -> None:
+        sub.close()
+        subs = self._subs.get(execution_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[execution_id]
+
+    def subscriber_count(self, execution_id: int) -> int:
+        return len(self._subs.get(execution_id, ()))
+
+    def total_subscribers(self) -> int:
+        return sum(len(subs) for subs in self._subs.values())
+
+    def _append(self, execution_id: int, log: _ExecutionLog, event: dict) -> None:
+        log.seq = event["seq"]
+        log.events.append(event)
+        for sub in self._subs.get(execution_id, ()):
+            sub.offer(event)
+        log.notify()
+
+    def publish(self, execution_id: int, event: Dict[str, Any]) -> dict:
+        """Number and log event, queue it for every subscriber; never awaits a client. Returns the logged event."""
+        log = self._log(execution_id)
+        event = {**event, "seq": log.seq + 1}
+        self._append(execution_id, log, event)
+        if self.persist is not None:
+            self.persist(execution_id, event)
+        return event
+
+    def deliver(self, execution_id: int, event: dict) -> bool:
+        """Log and fan out an event numbered by another process's hub (seq kept, not persisted).
+        Events at or below the latest seq are ignored; returns whether it was new."""
+        log = self._log(execution_id)
+        if event.get("seq", 0) <= log.seq:
+            return False
+        self._append(execution_id, log, event)
+        return True
+
+    def close(self, execution_id: int) -> None:
+        """Mark the run finished and end every subscriber stream (after delivering what is queued)."""
+        log = self._log(execution_id)
+        log.finished = True
+        log.notify()
+        for sub in self._subs.pop(execution_id, set()):
+            sub.close()
+
+    async def wait_for_change(self, execution_id: int, since: int, timeout: float) -> int:
+        """Wait until an event with seq > since is logged or the run finishes (or timeout); returns latest seq.
+        Does not create a log: runs this process has seen no events for wait for their first one."""
+        log = self._logs.get(execution_id)
+        if log is None:
+            await self._wait_first_event(execution_id, timeout)
+            return self.latest_seq(execution_id)
+        if log.seq <= since and not log.finished:
+            try:
+                await asyncio.wait_for(log.changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return log.seq
+
+    async def _wait_first_event(self, execution_id: int, timeout: float) -> None:
+        event = self._first_event.setdefault(execution_id, asyncio.Event())
+        self._first_waiters[execution_id] = self._first_waiters.get(execution_id, 0) + 1
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            left = self._first_waiters.pop(execution_id) - 1
+            if left:
+                self._first_waiters[execution_id] = left
+            elif self._first_event.get(execution_id) is event:
+                del self._first_event[execution_id]
+
+
+async def send_events(websocket: Any, sub: Subscriber) -> None:
+    """Sender task for one socket: deliver queued events in order until the stream ends."""
+    async for event in sub:
+        await websocket.send_json(event)
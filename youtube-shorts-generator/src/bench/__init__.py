@@ -0,0 +1,5 @@
+"""Offline performance benchmarks (no network, no API keys)."""
+
+
+class BenchUnavailable(RuntimeError):
+    """A benchmark cannot run here (optional dependency or binary missing); the suite records it as skipped."""
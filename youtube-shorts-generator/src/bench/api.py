@@ -0,0 +1,92 @@
+"""
+API request throughput: requests/sec for the liveness probe, status reads and a history page,
+served in-process (httpx ASGI transport, one event loop) from a seeded scratch database.
+
+The app's lifespan is not run: no maintenance thread, progress bus or log sinks, so the numbers
+are the request path itself (middleware, routing, async DB reads, JSON encoding).
+
+Run from project root: python -m src.bench.api [--requests N] [--json]
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+SEED_EXECUTIONS = 200
+
+
+@contextmanager
+def _app_on(db: Path) -> Iterator[object]:
+    """The FastAPI app with its database pointed at db for the duration of the block."""
+    from src.api import app as app_module
+
+    original = app_module._db_path
+    app_module._db_path = lambda: db
+    try:
+        yield app_module.app
+    finally:
+        app_module._db_path = original
+
+
+def _seed(db: Path) -> int:
+    from src.database import models, repository
+
+    for i in range(SEED_EXECUTIONS):
+        eid = repository.create_execution(db_path=db)
+        repository.insert_cost(eid, "bench", 0.01, db_path=db)
+        repository.update_execution(eid, status=models.STATUS_COMPLETED, topic=f"topic {i}", cost_total=0.01, db_path=db)
+    return eid
+
+
+async def _rates(app: object, requests: int, eid: int) -> dict[str, float]:
+    import httpx
+
+    paths = {
+        "health_live_rps": "/api/health/live",
+        "status_rps": f"/api/status/{eid}",
+        "history_rps": "/api/history?limit=20",
+    }
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, path in paths.items():
+            (await client.get(path)).raise_for_status()  # warm up
+            start = time.perf_counter()
+            for _ in range(requests):
+                await client.get(path)
+            elapsed = time.perf_counter() - start
+            results[name] = requests / elapsed if elapsed > 0 else float("inf")
+    return results
+
+
+def run(requests: int = 500) -> dict[str, float]:
+    """Issue `requests` sequential GETs per endpoint; return {endpoint_rps: requests/sec}."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "bench.db"
+        eid = _seed(db)
+        with _app_on(db) as app:
+            results = asyncio.run(_rates(app, requests, eid))
+        from src.database import repository
+        repository.close_connections()
+    return results
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="python -m src.bench.api")
+    p.add_argument("--requests", type=int, default=500)
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args()
+    results = run(requests=args.requests)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, value in results.items():
+            print(f"{name:20s} {value:12.0f} requests/sec")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
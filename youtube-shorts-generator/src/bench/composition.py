@@ -0,0 +1,79 @@
+"""
+Composition throughput on synthetic media: the CompositionAgent's MoviePy encode and the ffmpeg
+preview rendition, as seconds of output per second of wall time (higher is better).
+
+Inputs are generated with ffmpeg's lavfi sources (a sine tone and a 1080x1920 test pattern), so no
+provider output is needed. Requires MoviePy and an ffmpeg binary (imageio-ffmpeg or PATH).
+
+Run from project root: python -m src.bench.composition [--seconds N] [--json]
+"""
+import argparse
+import json
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from src.bench import BenchUnavailable
+from src.utils import media
+
+
+def _ffmpeg(*args: str) -> None:
+    exe = media.ffmpeg_exe()
+    if exe is None:
+        raise BenchUnavailable("ffmpeg not found")
+    proc = subprocess.run(
+        [exe, "-y", "-loglevel", "error", *args], capture_output=True, text=True, timeout=media.FFMPEG_TIMEOUT_SEC
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {proc.stderr.strip()[-500:]}")
+
+
+def synth_inputs(directory: Path, seconds: float) -> tuple[Path, Path]:
+    """Write a sine-tone WAV and a vertical test-pattern MP4 of the given length."""
+    audio, video = directory / "tts.wav", directory / "clip.mp4"
+    _ffmpeg("-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}", str(audio))
+    _ffmpeg(
+        "-f", "lavfi", "-i", f"testsrc=size=1080x1920:rate=24:duration={seconds}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", str(video),
+    )
+    return audio, video
+
+
+def run(seconds: float = 5.0) -> dict[str, float]:
+    """Compose `seconds` of synthetic audio+video, then render its preview; return realtime factors."""
+    try:
+        from src.agents.composition_agent import _compose_audio_video
+    except ImportError as e:
+        raise BenchUnavailable(f"MoviePy not installed: {e}") from e
+    with tempfile.TemporaryDirectory() as tmp:
+        audio, video = synth_inputs(Path(tmp), seconds)
+        final = Path(tmp) / "final.mp4"
+        start = time.perf_counter()
+        _compose_audio_video(audio, video, final)
+        compose = time.perf_counter() - start
+        start = time.perf_counter()
+        media._render(final, media.RENDITION_PREVIEW, Path(tmp) / "preview.mp4")
+        preview = time.perf_counter() - start
+    return {
+        "compose_realtime_x": seconds / compose,
+        "preview_realtime_x": seconds / preview,
+    }
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="python -m src.bench.composition")
+    p.add_argument("--seconds", type=float, default=5.0)
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args()
+    results = run(seconds=args.seconds)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, value in results.items():
+            print(f"{name:20s} {value:10.2f}x realtime")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+"""
+Embedding similarity search: cosine top-k queries/sec over 10k and 100k random unit vectors.
+
+Vectors have the dimension of text-embedding-3-small (1536) and are stored as float32, the way an
+in-process index would hold them; 100k vectors take about 600 MB. Requires NumPy (installed with MoviePy).
+
+Run from project root: python -m src.bench.embeddings [--sizes 10000,100000] [--queries N] [--json]
+"""
+import argparse
+import json
+import time
+from typing import Sequence
+
+from src.bench import BenchUnavailable
+
+EMBEDDING_DIM = 1536
+TOP_K = 10
+_BLOCK = 10_000
+
+
+def _unit_vectors(np, rng, n: int, dim: int):
+    # Filled block by block so no float64 copy of the whole matrix is ever allocated
+    out = np.empty((n, dim), dtype=np.float32)
+    for i in range(0, n, _BLOCK):
+        block = rng.standard_normal((min(_BLOCK, n - i), dim), dtype=np.float32)
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        out[i:i + len(block)] = block
+    return out
+
+
+def run(sizes: Sequence[int] = (10_000, 100_000), queries: int = 50, dim: int = EMBEDDING_DIM) -> dict[str, float]:
+    """Time `queries` single-vector top-k searches per corpus size; return {top10_<n>_qps: queries/sec}."""
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise BenchUnavailable("NumPy not installed") from e
+    rng = np.random.default_rng(0)
+    probes = _unit_vectors(np, rng, queries, dim)
+    results = {}
+    for n in sizes:
+        corpus = _unit_vectors(np, rng, n, dim)
+        start = time.perf_counter()
+        for q in probes:
+            scores = corpus @ q  # cosine similarity: rows are unit length
+            top = np.argpartition(scores, -TOP_K)[-TOP_K:]
+            top = top[np.argsort(scores[top])[::-1]]
+        elapsed = time.perf_counter() - start
+        results[f"top{TOP_K}_{n}_qps"] = queries / elapsed if elapsed > 0 else float("inf")
+        del corpus
+    return results
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="python -m src.bench.embeddings")
+    p.add_argument("--sizes", default="10000,100000", help="comma-separated corpus sizes")
+    p.add_argument("--queries", type=int, default=50)
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args()
+    results = run(sizes=[int(s) for s in args.sizes.split(",")], queries=args.queries)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, value in results.items():
+            print(f"{name:20s} {value:12.1f} queries/sec")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
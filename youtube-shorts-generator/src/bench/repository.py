@@ -0,0 +1,58 @@
+"""
+Repository microbenchmarks: ops/sec for insert_cost, get_execution (status reads), enqueue and
+dequeue_next (queue claims) on a scratch database.
+
+Run from project root: python -m src.bench.repository [--ops N] [--json]
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.database import repository
+
+
+def _rate(fn: Callable[[int], None], ops: int) -> float:
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    return ops / elapsed if elapsed > 0 else float("inf")
+
+
+def run(ops: int = 2000, db_path: Optional[Path] = None) -> dict[str, float]:
+    """Run each benchmark for `ops` operations; return {name: ops_per_sec}."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = db_path or Path(tmp) / "bench.db"
+        eid = repository.create_execution(db_path=db)
+        results = {
+            "insert_cost": _rate(lambda i: repository.insert_cost(eid, "bench", 0.001, db_path=db), ops),
+            "get_execution": _rate(lambda i: repository.get_execution(eid, db_path=db), ops),
+            "enqueue": _rate(lambda i: repository.enqueue("a", "b", "bench", payload=str(i), db_path=db), ops),
+            # Claims the messages enqueued above, one BEGIN IMMEDIATE transaction each
+            "dequeue_next": _rate(lambda i: repository.dequeue_next("b", db_path=db), ops),
+        }
+        close = getattr(repository, "close_connections", None)
+        if close:
+            close()
+    return results
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="python -m src.bench.repository")
+    p.add_argument("--ops", type=int, default=2000)
+    p.add_argument("--json", action="store_true")
+    args = p.parse_args()
+    results = run(ops=args.ops)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, rate in results.items():
+            print(f"{name:15s} {rate:12.0f} ops/sec")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,176 @@
+"""
+Benchmark suite: runs the offline benchmarks, reports JSON and compares against a stored baseline.
+
+Each benchmark module exposes ``run(**kwargs) -> {metric: value}``. Metrics ending in ``_ms`` are
+lower-is-better; all others (ops/sec, requests/sec, realtime factors) are higher-is-better. A
+metric regresses when it is worse than the baseline by more than the tolerance (a fraction,
+default BENCH_TOLERANCE or 0.25). Benchmarks whose dependencies are missing are reported under
+``skipped`` and never fail the comparison.
+
+Baselines are machine-specific: save one (``youtube-shorts bench --save-baseline``) on the machine
+that gates upgrades, and compare runs from that machine against it. A baseline recorded with a
+different ``--quick`` setting measured other sizes, so it is not compared (``comparison_skipped``).
+Default path: BENCH_BASELINE, else ``bench/baseline.json`` in the project root.
+
+Run from project root: python -m src.bench.suite [names...] [--quick] [--json]
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.bench import BenchUnavailable
+
+DEFAULT_TOLERANCE = 0.25
+
+# name -> (module, full-run kwargs, --quick kwargs); cheapest first
+BENCHMARKS: Dict[str, tuple] = {
+    "repository": ("src.bench.repository", {"ops": 2000}, {"ops": 200}),
+    "pipeline": ("src.bench.pipeline", {"runs": 200}, {"runs": 20}),
+    "api": ("src.bench.api", {"requests": 500}, {"requests": 50}),
+    "embeddings": ("src.bench.embeddings", {"sizes": (10_000, 100_000), "queries": 50}, {"sizes": (1_000, 10_000), "queries": 10}),
+    "composition": ("src.bench.composition", {"seconds": 5.0}, {"seconds": 1.0}),
+}
+
+
+def default_baseline_path() -> Path:
+    value = (os.getenv("BENCH_BASELINE") or "").strip()
+    if value:
+        return Path(value)
+    from src.utils.config import project_root
+    return project_root() / "bench" / "baseline.json"
+
+
+def default_tolerance() -> float:
+    return float(os.getenv("BENCH_TOLERANCE") or DEFAULT_TOLERANCE)
+
+
+def run_suite(names: Optional[Iterable[str]] = None, quick: bool = False) -> Dict[str, Any]:
+    """Run the named benchmarks (default: all) and return the report:
+    {"meta": {...}, "results": {bench: {metric: value}}, "skipped": {bench: reason}}."""
+    names = list(names or BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)}; choose from {', '.join(BENCHMARKS)}")
+    report: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": quick,
+        },
+        "results": {},
+        "skipped": {},
+        "duration_sec": {},
+    }
+    for name in names:
+        module, full, small = BENCHMARKS[name]
+        start = time.perf_counter()
+        try:
+            report["results"][name] = importlib.import_module(module).run(**(small if quick else full))
+        except BenchUnavailable as e:
+            report["skipped"][name] = str(e)
+        report["duration_sec"][name] = round(time.perf_counter() - start, 2)
+    return report
+
+
+def lower_is_better(metric: str) -> bool:
+    return metric.endswith("_ms")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Metrics in both report and baseline that are worse by more than tolerance (fraction).
+    Each entry: benchmark, metric, baseline, current, change (signed fraction; negative = worse)."""
+    tolerance = default_tolerance() if tolerance is None else tolerance
+    regressions = []
+    for bench, metrics in report.get("results", {}).items():
+        base_metrics = baseline.get("results", {}).get(bench) or {}
+        for metric, current in metrics.items():
+            base = base_metrics.get(metric)
+            if not base:
+                continue
+            change = (current - base) / base
+            if lower_is_better(metric):
+                change = -change
+            if change < -tolerance:
+                regressions.append({
+                    "benchmark": bench,
+                    "metric": metric,
+                    "baseline": base,
+                    "current": current,
+                    "change": round(change, 4),
+                })
+    return regressions
+
+
+def load_baseline(path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Saved baseline report, or None if there is none."""
+    try:
+        return json.loads((path or default_baseline_path()).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(report: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    """Write the report as the new baseline."""
+    path = path or default_baseline_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def run_and_compare(
+    names: Optional[Iterable[str]] = None,
+    quick: bool = False,
+    baseline_path: Optional[Path] = None,
+    tolerance: Optional[float] = None,
+    update_baseline: bool = False,
+) -> Dict[str, Any]:
+    """Run the suite and attach the comparison: ``baseline`` (path or None), ``regressions`` and
+    ``ok`` (False only if a regression was found). A baseline with another quick setting is not
+    compared: ``comparison_skipped`` says why. update_baseline saves this run instead of comparing
+    (``baseline_saved``)."""
+    report = run_suite(names, quick=quick)
+    path = baseline_path or default_baseline_path()
+    regressions: List[Dict[str, Any]] = []
+    if update_baseline:
+        report["baseline"] = str(save_baseline(report, path))
+    else:
+        baseline = load_baseline(path)
+        report["baseline"] = str(path) if baseline is not None else None
+        baseline_quick = (baseline or {}).get("meta", {}).get("quick")
+        if baseline is not None and bool(baseline_quick) != quick:
+            report["comparison_skipped"] = (
+                f"baseline was recorded with quick={bool(baseline_quick)}, this run with quick={quick}; "
+                "save a baseline with the same setting to compare"
+            )
+        elif baseline is not None:
+            regressions = compare(report, baseline, tolerance)
+    report["baseline_saved"] = update_baseline
+    report["regressions"] = regressions
+    report["ok"] = not report["regressions"]
+    return report
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(prog="python -m src.bench.suite")
+    p.add_argument("names", nargs="*", help=f"benchmarks to run (default all): {', '.join(BENCHMARKS)}")
+    p.add_argument("--quick", action="store_true")
+    p.add_argument("--baseline", type=Path)
+    p.add_argument("--tolerance", type=float)
+    p.add_argument("--save-baseline", action="store_true")
+    args = p.parse_args()
+    report = run_and_compare(args.names, args.quick, args.baseline, args.tolerance, args.save_baseline)
+    print(json.dumps(report, indent=2))
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
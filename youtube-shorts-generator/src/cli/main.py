@@ -1,11 +1,11 @@
 """
-CLI: generate, status, health.
+CLI: generate, status, health, stats, db maintain, db vacuum, db migrate, trace, bench.
 """
 import argparse
-import asyncio
 import json
 import sys
 from pathlib import Path
+from typing import Optional
 
 def _project_root() -> Path:
     here = Path(__file__).resolve().parent
@@ -14,6 +14,12 @@ def _project_root() -> Path:
     return here.parent if here.name == "src" else Path.cwd()
 
 
+def _db_path() -> Path:
+    """Database path from the settings (config ``database``), resolved the same way as the API."""
+    from src.utils.config import get_settings
+    return get_settings().database_path
+
+
 def cmd_health(json_output: bool = False) -> int:
     """Health check: MVP checks (API keys, disk, resources, DB, API connectivity, YouTube). Return 0 ok, 1 fail."""
     root = _project_root()
@@ -60,6 +66,125 @@ def cmd_status(json_output: bool = False) -> int:
     return 0
 
 
+def cmd_stats(granularity: str = "day", since: Optional[str] = None, json_output: bool = False) -> int:
+    """Cost and throughput aggregates from the rollup tables, plus monthly budget status."""
+    root = _project_root()
+    sys.path.insert(0, str(root))
+    from src.database import repository
+    from src.utils.cost_tracker import monthly_budget_status
+    db_path = _db_path()
+    repository.ensure_schema(db_path)
+    stats = {
+        "granularity": granularity,
+        "rows": repository.get_rollups(granularity, since=since, db_path=db_path),
+        "budget": monthly_budget_status(db_path=db_path),
+    }
+    if json_output:
+        print(json.dumps(stats))
+    else:
+        from src.utils.ui import format_stats_result
+        format_stats_result(stats)
+    return 0
+
+
+def cmd_db(subcommand: Optional[str], json_output: bool = False, dry_run: bool = False) -> int:
+    """Database admin: ``db maintain`` runs retention, archival and incremental vacuum once;
+    ``db vacuum`` runs the one-time full VACUUM that enables incremental vacuum (stop the API first);
+    ``db migrate [--dry-run]`` applies (or lists) pending schema migrations."""
+    root = _project_root()
+    sys.path.insert(0, str(root))
+    if subcommand == "migrate":
+        from src.database.migrations import run_migrations, LATEST_VERSION
+        migrations = run_migrations(_db_path(), dry_run=dry_run)
+        result = {
+            "dry_run": dry_run,
+            "latest_version": LATEST_VERSION,
+            "migrations": [{"version": m.version, "description": m.description} for m in migrations],
+        }
+        if json_output:
+            print(json.dumps(result))
+        else:
+            from src.utils.ui import format_migrate_result
+            format_migrate_result(result)
+        return 0
+    if subcommand == "maintain":
+        from src.database.maintenance import run_maintenance
+        report = run_maintenance(_db_path())
+        if json_output:
+            print(json.dumps(report))
+        else:
+            from src.utils.ui import format_maintenance_result
+            format_maintenance_result(report)
+        return 0
+    if subcommand == "vacuum":
+        from src.database.maintenance import full_vacuum
+        report = full_vacuum(_db_path())
+        if json_output:
+            print(json.dumps(report))
+        else:
+            from src.utils.ui import format_maintenance_result
+            format_maintenance_result(report)
+        return 0
+    print("Usage: youtube-shorts db {maintain,vacuum,migrate [--dry-run]}", file=sys.stderr)
+    return 2
+
+
+def cmd_trace(execution_id: Optional[str], output: Optional[str] = None) -> int:
+    """Write an execution's Chrome trace JSON (open in Perfetto / chrome://tracing) to stdout or output."""
+    root = _project_root()
+    sys.path.insert(0, str(root))
+    if not execution_id or not execution_id.isdigit():
+        print("Usage: youtube-shorts trace <execution_id> [--output FILE]", file=sys.stderr)
+        return 2
+    from src.utils.tracing import load_trace
+    trace = load_trace(int(execution_id))
+    if trace is None:
+        print(json.dumps({"error": f"No trace for execution {execution_id} (set TRACE_SAMPLE_RATE)"}), file=sys.stderr)
+        return 1
+    if output:
+        Path(output).write_text(json.dumps(trace), encoding="utf-8")
+        print(json.dumps({"execution_id": int(execution_id), "output": output, "events": len(trace["traceEvents"])}))
+    else:
+        print(json.dumps(trace))
+    return 0
+
+
+def cmd_bench(
+    names: Optional[str],
+    quick: bool = False,
+    baseline: Optional[str] = None,
+    tolerance: Optional[float] = None,
+    save_baseline: bool = False,
+    output: Optional[str] = None,
+    json_output: bool = False,
+) -> int:
+    """Offline benchmark suite (no network, no API keys). Compares against the stored baseline:
+    returns 1 if any metric regressed beyond the tolerance, 0 otherwise."""
+    root = _project_root()
+    sys.path.insert(0, str(root))
+    from src.bench.suite import run_and_compare
+    selected = [n.strip() for n in names.split(",") if n.strip()] if names else None
+    try:
+        report = run_and_compare(
+            selected,
+            quick=quick,
+            baseline_path=Path(baseline) if baseline else None,
+            tolerance=tolerance,
+            update_baseline=save_baseline,
+        )
+    except ValueError as e:
+        print(json.dumps({"error": str(e)}), file=sys.stderr)
+        return 2
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if json_output:
+        print(json.dumps(report))
+    else:
+        from src.utils.ui import format_bench_result
+        format_bench_result(report)
+    return 0 if report["ok"] else 1
+
+
 def cmd_generate() -> int:
     """Run pipeline once."""
     root = _project_root()
@@ -71,21 +196,12 @@ def cmd_generate() -> int:
         import shutil
         shutil.copy(root / ".env.example", env_file)
     load_env(env_file)
-    from src.agents.research_agent import ResearchAgent
-    from src.agents.script_agent import ScriptAgent
-    from src.agents.uniqueness_agent import UniquenessAgent
-    from src.agents.tts_agent import TTSAgent
-    from src.agents.video_agent import VideoAgent
-    from src.agents.composition_agent import CompositionAgent
-    from src.agents.quality_agent import QualityAgent
-    from src.agents.publishing_agent import PublishingAgent
+    import asyncio
+    from src.agents.registry import default_agents
     from src.orchestration.pipeline import Pipeline
 
-    agents = [
-        ResearchAgent, ScriptAgent, UniquenessAgent, TTSAgent,
-        VideoAgent, CompositionAgent, QualityAgent, PublishingAgent,
-    ]
-    pipeline = Pipeline(agents=agents)
+    # Agent modules (and MoviePy, Runway, OpenAI...) are imported as each stage starts
+    pipeline = Pipeline(agents=default_agents())
     try:
         execution_id = asyncio.run(pipeline.run())
         print(json.dumps({"execution_id": execution_id}))
@@ -110,9 +226,27 @@ def _ensure_config_for_command(command: str) -> tuple[bool, list[str]]:
 
 def main() -> int:
     p = argparse.ArgumentParser(prog="youtube-shorts")
-    p.add_argument("command", choices=["generate", "status", "health"])
+    p.add_argument("command", choices=["generate", "status", "health", "stats", "db", "trace", "bench"])
+    p.add_argument(
+        "subcommand", nargs="?", help="db: maintain | vacuum | migrate; trace: execution id; bench: comma-separated benchmarks"
+    )
+    p.add_argument("--dry-run", action="store_true", help="db migrate: list pending migrations without applying")
     p.add_argument("--json", action="store_true", help="Output raw JSON instead of formatted display")
+    p.add_argument("--granularity", choices=["hour", "day"], default="day", help="stats: bucket size")
+    p.add_argument("--since", help="stats: ISO date/time lower bound")
+    p.add_argument("--output", "-o", help="trace: write the trace JSON to this file; bench: write the report")
+    p.add_argument("--quick", action="store_true", help="bench: small sizes (smoke run)")
+    p.add_argument("--baseline", help="bench: baseline JSON (default BENCH_BASELINE or bench/baseline.json)")
+    p.add_argument("--tolerance", type=float, help="bench: allowed regression as a fraction (default 0.25)")
+    p.add_argument("--save-baseline", action="store_true", help="bench: store this run as the baseline")
     args = p.parse_args()
+    if args.command in ("generate", "db"):
+        # stdout carries the command's JSON result; logs go to stderr and the JSONL file
+        root = _project_root()
+        if str(root) not in sys.path:
+            sys.path.insert(0, str(root))
+        from src.utils.logging import configure_logging
+        configure_logging(stream=sys.stderr)
 
     # Validate config on startup for commands that need API keys and settings
     if args.command in ("health", "generate"):
@@ -128,6 +262,22 @@ def main() -> int:
         return cmd_status(json_output=args.json)
     if args.command == "generate":
         return cmd_generate()
+    if args.command == "db":
+        return cmd_db(args.subcommand, json_output=args.json, dry_run=args.dry_run)
+    if args.command == "stats":
+        return cmd_stats(granularity=args.granularity, since=args.since, json_output=args.json)
+    if args.command == "trace":
+        return cmd_trace(args.subcommand, output=args.output)
+    if args.command == "bench":
+        return cmd_bench(
+            args.subcommand,
+            quick=args.quick,
+            baseline=args.baseline,
+            tolerance=args.tolerance,
+            save_baseline=args.save_baseline,
+            output=args.output,
+            json_output=args.json,
+        )
     return 0
 
 
@@ -0,0 +1,204 @@
+"""
+Async facade over the repository for FastAPI handlers and agents.
+
+Blocking SQLite calls run off the event loop: writes go through one dedicated DB writer thread
+(serialized, in submission order) and reads through a small reader pool, which WAL lets run
+concurrently with the writer. Each executor's internal queue is the request queue.
+
+Reader threads never write: a read first runs the schema check (migrations) and any buffered-write
+flush on the writer thread, then runs inside ``repository.read_only()``.
+"""
+import asyncio
+import atexit
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from . import repository
+from . import models
+from .migrations import run_migrations as _run_migrations
+from src.utils import metrics
+from src.utils import tracing
+
+READER_THREADS = 4
+
+_lock = threading.Lock()
+_writer: Optional[ThreadPoolExecutor] = None
+_readers: Optional[ThreadPoolExecutor] = None
+
+
+def _writer_pool() -> ThreadPoolExecutor:
+    global _writer
+    if _writer is None:
+        with _lock:
+            if _writer is None:
+                _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+    return _writer
+
+
+def _reader_pool() -> ThreadPoolExecutor:
+    global _readers
+    if _readers is None:
+        with _lock:
+            if _readers is None:
+                _readers = ThreadPoolExecutor(max_workers=READER_THREADS, thread_name_prefix="db-reader")
+    return _readers
+
+
+def _timed(kind: str, fn: Callable, *args, **kwargs) -> Any:
+    # Measured on the DB thread: execution time, not time spent waiting in the executor queue
+    name = getattr(fn, "__name__", "call")
+    with metrics.DB_SECONDS.time(operation=name, kind=kind), tracing.span(name, f"db.{kind}"):
+        if kind == "read":
+            with repository.read_only():
+                return fn(*args, **kwargs)
+        return fn(*args, **kwargs)
+
+
+async def run_write(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking write on the DB writer thread and await its result."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()  # like asyncio.to_thread: keep context vars (log/trace bindings)
+    return await loop.run_in_executor(_writer_pool(), ctx.run, partial(_timed, "write", fn, *args, **kwargs))
+
+
+async def run_read(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking read on the reader pool and await its result. Schema setup and pending
+    buffered writes for kwargs["db_path"] are applied on the writer thread first."""
+    if "db_path" in kwargs:
+        db_path = kwargs["db_path"]
+        if not repository.schema_verified(db_path):
+            await run_write(repository.ensure_schema, db_path)
+        if repository._has_buffered():
+            await run_write(repository._flush_buffered, db_path)
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_reader_pool(), ctx.run, partial(_timed, "read", fn, *args, **kwargs))
+
+
+def shutdown(wait: bool = True) -> None:
+    """Finish queued work and stop the DB threads (they are recreated on next use)."""
+    global _writer, _readers
+    with _lock:
+        writer, readers = _writer, _readers
+        _writer = _readers = None
+    if writer is not None:
+        writer.shutdown(wait=wait)
+    if readers is not None:
+        readers.shutdown(wait=wait)
+
+
+atexit.register(shutdown)
+
+
+# --- Reads ---
+
+async def get_execution(execution_id: int, db_path: Optional[Path] = None) -> Optional[dict]:
+    return await run_read(repository.get_execution, execution_id, db_path=db_path)
+
+
+async def get_executions_count(db_path: Optional[Path] = None, **filters: Any) -> int:
+    return await run_read(repository.get_executions_count, db_path=db_path, **filters)
+
+
+async def list_executions(limit: int = 10, db_path: Optional[Path] = None, **kwargs: Any) -> Tuple[List[dict], Optional[int]]:
+    return await run_read(repository.list_executions, limit, db_path=db_path, **kwargs)
+
+
+async def get_last_executions(n: int = 10, db_path: Optional[Path] = None) -> List[dict]:
+    return await run_read(repository.get_last_executions, n=n, db_path=db_path)
+
+
+async def get_execution_cost_total(execution_id: int, db_path: Optional[Path] = None) -> float:
+    return await run_read(repository.get_execution_cost_total, execution_id, db_path=db_path)
+
+
+async def get_rollups(granularity: str = "day", db_path: Optional[Path] = None, **kwargs: Any) -> List[dict]:
+    return await run_read(repository.get_rollups, granularity, db_path=db_path, **kwargs)
+
+
+async def get_batch(batch_id: int, db_path: Optional[Path] = None) -> Optional[dict]:
+    return await run_read(repository.get_batch, batch_id, db_path=db_path)
+
+
+async def get_progress_events(execution_id: int, since: int = 0, db_path: Optional[Path] = None) -> List[dict]:
+    return await run_read(repository.get_progress_events, execution_id, since, db_path=db_path)
+
+
+# --- Writes ---
+
+async def ensure_schema(db_path: Optional[Path] = None) -> None:
+    """Cached schema check; may migrate on first use, so it runs on the writer thread."""
+    await run_write(repository.ensure_schema, db_path)
+
+
+async def run_migrations(db_path: Optional[Path] = None) -> None:
+    await run_write(_run_migrations, db_path)
+
+
+async def create_execution(
+    status: str = models.STATUS_PENDING,
+    db_path: Optional[Path] = None,
+) -> int:
+    return await run_write(repository.create_execution, status=status, db_path=db_path)
+
+
+async def update_execution(execution_id: int, db_path: Optional[Path] = None, **fields: Any) -> None:
+    await run_write(repository.update_execution, execution_id, db_path=db_path, **fields)
+
+
+async def create_batch(
+    size: int,
+    concurrency: int,
+    topics: Optional[List[str]] = None,
+    db_path: Optional[Path] = None,
+) -> Tuple[int, List[int]]:
+    return await run_write(repository.create_batch, size, concurrency, topics, db_path=db_path)
+
+
+async def set_batch_topics(batch_id: int, topics: List[str], db_path: Optional[Path] = None) -> None:
+    await run_write(repository.set_batch_topics, batch_id, topics, db_path=db_path)
+
+
+async def insert_cost(
+    execution_id: int,
+    component: str,
+    cost: float,
+    db_path: Optional[Path] = None,
+) -> int:
+    return await run_write(repository.insert_cost, execution_id, component, cost, db_path=db_path)
+
+
+async def insert_progress_events(rows: List[Tuple[int, dict]], db_path: Optional[Path] = None) -> None:
+    await run_write(repository.insert_progress_events, rows, db_path=db_path)
+
+
+async def enqueue(
+    from_agent: str,
+    to_agent: str,
+    message_type: str,
+    payload: Optional[str] = None,
+    db_path: Optional[Path] = None,
+) -> int:
+    return await run_write(
+        repository.enqueue, from_agent, to_agent, message_type, payload=payload, db_path=db_path
+    )
+
+
+async def dequeue_next(to_agent: Optional[str] = None, db_path: Optional[Path] = None) -> Optional[dict]:
+    return await run_write(repository.dequeue_next, to_agent=to_agent, db_path=db_path)
+
+
+async def count_messages_by_status(db_path: Optional[Path] = None) -> dict:
+    return await run_read(repository.count_messages_by_status, db_path=db_path)
+
+
+async def mark_message_processed(
+    message_id: int,
+    status: str = models.QUEUE_COMPLETED,
+    db_path: Optional[Path] = None,
+) -> None:
+    await run_write(repository.mark_message_processed, message_id, status=status, db_path=db_path)
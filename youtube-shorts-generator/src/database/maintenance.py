@@ -0,0 +1,323 @@
+"""
+Retention, archival and compaction for the SQLite database.
+
+- Completed ``message_queue`` rows older than ``retention.queue_completed_hours`` are deleted in batches.
+- Finished executions older than ``retention.executions_days`` are appended, with their cost and
+  video rows, to gzip JSONL files per month (``<archive_dir>/executions-YYYY-MM.jsonl.gz``) and then
+  deleted together with their videos, embeddings and persisted progress events in one transaction.
+  Each batch is staged next to the archive and appended only after that transaction commits; the
+  next pass settles stages left by a crash, so rows are never lost or archived twice.
+  Age is taken from start_time, else end_time; finished rows with neither go to
+  ``executions-undated.jsonl.gz``. Rollups keep their aggregates, so ``/api/stats`` history is unaffected.
+- Freed pages are returned to the filesystem with incremental vacuum. New databases are created
+  with ``auto_vacuum=INCREMENTAL``; older ones need one full VACUUM to switch, which locks the
+  database for its duration and so only runs offline (:func:`full_vacuum`, CLI ``db vacuum``).
+  Until then passes report ``full_vacuum_needed``.
+
+``run_maintenance()`` does one pass (CLI ``db maintain``); ``start_maintenance_thread()`` repeats it
+every ``retention.maintenance_interval_minutes`` in the background (API lifespan). A value of 0 in
+any retention setting disables that step.
+"""
+import datetime
+import gzip
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import models
+from . import repository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION = {
+    "queue_completed_hours": 24,
+    "executions_days": 90,
+    "archive_dir": "archive",
+    "batch_size": 1000,
+    "vacuum_pages": 0,  # 0 = release every free page
+    "maintenance_interval_minutes": 60,
+}
+
+AUTO_VACUUM_INCREMENTAL = 2
+UNDATED_ARCHIVE = "executions-undated.jsonl.gz"
+_STAGED_SUFFIX = ".staged"
+_FINISHED = (models.STATUS_COMPLETED, models.STATUS_FAILED)
+
+
+def retention_settings(config: Optional[dict] = None) -> Dict[str, Any]:
+    """``retention:`` config section merged over DEFAULT_RETENTION."""
+    if config is None:
+        from src.utils.config import get_settings
+        config = get_settings().data
+    return {**DEFAULT_RETENTION, **(config.get("retention") or {})}
+
+
+def _iso_ago(**delta: float) -> str:
+    return (datetime.datetime.utcnow() - datetime.timedelta(**delta)).isoformat() + "Z"
+
+
+def _db_bytes(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+
+def purge_queue(conn: sqlite3.Connection, older_than_hours: float, batch_size: int = 1000) -> int:
+    """Delete completed queue messages processed more than older_than_hours ago; one commit per batch."""
+    cutoff = _iso_ago(hours=older_than_hours)
+    deleted = 0
+    while True:
+        cur = conn.execute(
+            """DELETE FROM message_queue WHERE id IN (
+                   SELECT id FROM message_queue WHERE status = ? AND processed_at < ? LIMIT ?)""",
+            (models.QUEUE_COMPLETED, cutoff, batch_size),
+        )
+        conn.commit()
+        deleted += cur.rowcount
+        if cur.rowcount < batch_size:
+            return deleted
+
+
+def archive_executions(
+    conn: sqlite3.Connection,
+    older_than_days: float,
+    archive_dir: Path,
+    batch_size: int = 1000,
+) -> Dict[str, int]:
+    """Move finished executions started more than older_than_days ago (and their costs and videos)
+    into monthly gzip JSONL archives. Rows without start_time are aged by end_time; rows with
+    neither cannot be aged and go to UNDATED_ARCHIVE. Returns {archive file name: executions written}."""
+    cutoff = _iso_ago(days=older_than_days)
+    written: Dict[str, int] = {}
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f"""SELECT * FROM executions
+                WHERE (COALESCE(start_time, end_time) < ? OR COALESCE(start_time, end_time) IS NULL)
+                  AND status IN ({','.join('?' * len(_FINISHED))}) AND id > ?
+                ORDER BY id LIMIT ?""",
+            (cutoff, *_FINISHED, last_id, batch_size),
+        ).fetchall()
+        if not rows:
+            return written
+        ids = [r["id"] for r in rows]
+        last_id = ids[-1]
+        marks = ",".join("?" * len(ids))
+        costs: Dict[int, List[dict]] = {}
+        for c in conn.execute(f"SELECT * FROM costs WHERE execution_id IN ({marks}) ORDER BY id", ids):
+            costs.setdefault(c["execution_id"], []).append(dict(c))
+        videos: Dict[int, List[dict]] = {}
+        for v in conn.execute(f"SELECT * FROM videos WHERE execution_id IN ({marks}) ORDER BY id", ids):
+            videos.setdefault(v["execution_id"], []).append(dict(v))
+        by_file: Dict[str, List[str]] = {}
+        for r in rows:
+            record = {"execution": dict(r), "costs": costs.get(r["id"], []), "videos": videos.get(r["id"], [])}
+            dated = r["start_time"] or r["end_time"]
+            name = f"executions-{dated[:7]}.jsonl.gz" if dated else UNDATED_ARCHIVE
+            by_file.setdefault(name, []).append(json.dumps(record, default=str))
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        # Each batch is staged as complete gzip members first and only appended to the archives
+        # after its deletes commit, so a crash at any point neither loses nor re-archives rows
+        staged = []
+        for name, lines in by_file.items():
+            member = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
+            stage = archive_dir / f".{name}.{ids[0]}-{ids[-1]}{_STAGED_SUFFIX}"
+            _write_synced(stage, member)
+            staged.append(stage)
+            written[name] = written.get(name, 0) + len(lines)
+        # Dependents go in the same transaction so no video or embedding is left pointing at a missing execution
+        with conn:
+            conn.execute(
+                f"DELETE FROM embeddings WHERE video_id IN (SELECT id FROM videos WHERE execution_id IN ({marks}))", ids
+            )
+            conn.execute(f"DELETE FROM videos WHERE execution_id IN ({marks})", ids)
+            conn.execute(f"DELETE FROM costs WHERE execution_id IN ({marks})", ids)
+            conn.execute(f"DELETE FROM progress_events WHERE execution_id IN ({marks})", ids)
+            conn.execute(f"DELETE FROM executions WHERE id IN ({marks})", ids)
+        for stage in staged:
+            _finish_staged(stage)
+
+
+def _write_synced(path: Path, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _finish_staged(stage: Path) -> None:
+    """Append a staged gzip member to its archive and remove the stage.
+
+    The archive is rewritten to a temp file and renamed over, so it never holds half a member; a
+    stage whose member is already the archive's tail (crash after the rename) is only removed.
+    """
+    member = stage.read_bytes()
+    archive = stage.with_name(stage.name[1:].rsplit(".", 2)[0])
+    size = archive.stat().st_size if archive.exists() else 0
+    tail = b""
+    if size >= len(member):
+        with open(archive, "rb") as f:
+            f.seek(size - len(member))
+            tail = f.read()
+    if tail != member:
+        tmp = archive.with_name(archive.name + ".tmp")
+        with open(tmp, "wb") as out:
+            if size:
+                with open(archive, "rb") as f:
+                    shutil.copyfileobj(f, out)
+            # Concatenated gzip members read back (gzip.open, zcat) as one continuous stream
+            out.write(member)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, archive)
+    stage.unlink()
+
+
+def recover_staged_archives(conn: sqlite3.Connection, archive_dir: Path) -> int:
+    """Settle batches staged by an interrupted :func:`archive_executions`; returns stages appended.
+
+    A stage whose executions are still in the database never committed its deletes and is dropped
+    (the rows are archived again); otherwise the deletes committed and the stage is appended.
+    """
+    appended = 0
+    for stage in sorted(archive_dir.glob(f".*{_STAGED_SUFFIX}")):
+        first = gzip.decompress(stage.read_bytes()).split(b"\n", 1)[0]
+        execution_id = json.loads(first)["execution"]["id"]
+        if conn.execute("SELECT 1 FROM executions WHERE id = ?", (execution_id,)).fetchone():
+            stage.unlink()
+        else:
+            _finish_staged(stage)
+            appended += 1
+    return appended
+
+
+def full_vacuum_needed(conn: sqlite3.Connection) -> bool:
+    return conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL
+
+
+def incremental_vacuum(conn: sqlite3.Connection, pages: int = 0) -> int:
+    """Release up to pages free pages (0 = all) to the filesystem; returns pages released.
+
+    Does nothing on a database without auto_vacuum=INCREMENTAL (see :func:`full_vacuum`).
+    """
+    if full_vacuum_needed(conn):
+        return 0
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if not free:
+        return 0
+    # The pragma frees one page per step and execute() steps it once; executescript runs it to completion
+    conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});" if pages else "PRAGMA incremental_vacuum;")
+    return free - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+def full_vacuum(db_path: Optional[Path] = None) -> Dict[str, Any]:
+    """Switch the database to auto_vacuum=INCREMENTAL and rebuild it with a full VACUUM.
+
+    Holds an exclusive lock for the whole rebuild (minutes on a large database), so run it with the
+    API and workers stopped; it is never run by the maintenance thread."""
+    path = Path(repository._resolve_path(db_path))
+    repository.ensure_schema(path)
+    repository._flush_buffered(path)
+    conn = repository._open(str(path))
+    try:
+        bytes_before = _db_bytes(conn)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        bytes_after = _db_bytes(conn)
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "db_path": str(path),
+        "auto_vacuum_incremental": auto_vacuum == AUTO_VACUUM_INCREMENTAL,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "reclaimed_bytes": max(0, bytes_before - bytes_after),
+    }
+
+
+def run_maintenance(db_path: Optional[Path] = None, config: Optional[dict] = None) -> Dict[str, Any]:
+    """One retention + archival + compaction pass. Returns a report including reclaimed_bytes."""
+    settings = retention_settings(config)
+    path = Path(repository._resolve_path(db_path))
+    repository.ensure_schema(path)
+    repository._flush_buffered(path)
+    archive_dir = Path(settings["archive_dir"])
+    if not archive_dir.is_absolute():
+        from src.utils.config import project_root
+
+        archive_dir = project_root() / archive_dir
+    batch = int(settings["batch_size"])
+    conn = repository._open(str(path))
+    try:
+        bytes_before = _db_bytes(conn)
+        queue_deleted = 0
+        if settings["queue_completed_hours"]:
+            queue_deleted = purge_queue(conn, float(settings["queue_completed_hours"]), batch)
+        archived: Dict[str, int] = {}
+        if archive_dir.is_dir():
+            recover_staged_archives(conn, archive_dir)
+        if settings["executions_days"]:
+            archived = archive_executions(conn, float(settings["executions_days"]), archive_dir, batch)
+        vacuum_needed = full_vacuum_needed(conn)
+        pages = incremental_vacuum(conn, int(settings["vacuum_pages"] or 0))
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        bytes_after = _db_bytes(conn)
+    finally:
+        conn.close()
+    return {
+        "db_path": str(path),
+        "queue_deleted": queue_deleted,
+        "executions_archived": sum(archived.values()),
+        "archive_files": sorted(str(archive_dir / n) for n in archived),
+        "vacuum_pages": pages,
+        "full_vacuum_needed": vacuum_needed,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "reclaimed_bytes": max(0, bytes_before - bytes_after),
+    }
+
+
+class MaintenanceThread(threading.Thread):
+    """Daemon thread running :func:`run_maintenance` every interval_sec until stop()."""
+
+    def __init__(self, interval_sec: float, db_path: Optional[Path] = None, config: Optional[dict] = None):
+        super().__init__(name="db-maintenance", daemon=True)
+        self.interval_sec = interval_sec
+        self.db_path = db_path
+        self.config = config
+        self._stop_event = threading.Event()
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    def run(self) -> None:
+        warned = False
+        while not self._stop_event.wait(self.interval_sec):
+            try:
+                self.last_report = run_maintenance(self.db_path, self.config)
+                logger.info("DB maintenance: %s", self.last_report)
+                if self.last_report["full_vacuum_needed"] and not warned:
+                    warned = True
+                    logger.warning(
+                        "Database %s has no incremental auto_vacuum; freed pages stay in the file until "
+                        "'youtube-shorts db vacuum' is run once with the API stopped", self.last_report["db_path"]
+                    )
+            except Exception:
+                logger.exception("DB maintenance pass failed")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        self.join(timeout)
+
+
+def start_maintenance_thread(db_path: Optional[Path] = None, config: Optional[dict] = None) -> Optional[MaintenanceThread]:
+    """Start background maintenance, or return None when maintenance_interval_minutes is 0."""
+    minutes = float(retention_settings(config)["maintenance_interval_minutes"] or 0)
+    if minutes <= 0:
+        return None
+    thread = MaintenanceThread(minutes * 60, db_path=db_path, config=config)
+    thread.start()
+    return thread
@@ -1,13 +1,21 @@
 """
-Schema initialization: create SQLite tables per approved architecture.
+Schema migrations: an ordered, numbered list tracked with ``PRAGMA user_version``.
+
+An up-to-date database costs one pragma read. Each pending migration runs in its own
+``BEGIN IMMEDIATE`` transaction together with the user_version bump, so a failure leaves the
+database at the previous version and concurrent migrators cannot apply a step twice.
+Steps are idempotent (IF NOT EXISTS / column checks) so databases created before versioning
+(user_version 0 with tables present) upgrade cleanly. Add new steps at the end; never edit
+or renumber shipped ones.
 """
 import sqlite3
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, NamedTuple, Optional, Tuple, Union
 
 # Default DB path (project root)
 DEFAULT_DB = "youtube_shorts.db"
 
+# Version 1: tables as first shipped (before user_version tracking)
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS executions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -73,24 +81,148 @@ def _project_root() -> Path:
     return here.parent if here.name == "src" else Path.cwd()
 
 
+def _statements(script: str) -> List[str]:
+    return [stmt.strip() for stmt in script.split(";") if stmt.strip()]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
 def _add_column_if_missing(conn: sqlite3.Connection, table: str, column: str, col_type: str = "TEXT") -> None:
     """Add column to table if it does not exist."""
-    try:
+    if column not in _columns(conn, table):
         conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
-        conn.commit()
-    except sqlite3.OperationalError:
-        pass  # Column already exists
 
 
-def run_migrations(db_path: Optional[Path] = None) -> None:
-    """Create or update schema. Idempotent (IF NOT EXISTS)."""
+def _execution_output_columns(conn: sqlite3.Connection) -> None:
+    _add_column_if_missing(conn, "executions", "output_path")
+    _add_column_if_missing(conn, "executions", "topic")
+
+
+def _rollups(conn: sqlite3.Connection) -> None:
+    from . import rollups
+    existed = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollups'"
+    ).fetchone() is not None
+    for stmt in _statements(rollups.SCHEMA):
+        conn.execute(stmt)
+    if not existed:
+        # Existing database: build aggregates from current rows once; later writes keep them current
+        rollups.backfill(conn)
+
+
+def _rollups_current_status(conn: sqlite3.Connection) -> None:
+    from . import rollups
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollups'").fetchone():
+        rollups.rebuild_executions(conn)
+
+
+def _batches(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS batches (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               created_at TEXT NOT NULL,
+               total INTEGER NOT NULL,
+               concurrency INTEGER NOT NULL,
+               topics TEXT
+           )"""
+    )
+    _add_column_if_missing(conn, "executions", "batch_id", "INTEGER REFERENCES batches(id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_executions_batch_id ON executions(batch_id)")
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    step: Union[str, Callable[[sqlite3.Connection], None]]  # SQL script or fn(conn); must not commit
+
+
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(1, "base tables and indexes", SCHEMA),
+    Migration(2, "executions.output_path and executions.topic", _execution_output_columns),
+    Migration(3, "history indexes executions(status, id) and executions(start_time)", """
+        CREATE INDEX IF NOT EXISTS idx_executions_status_id ON executions(status, id);
+        CREATE INDEX IF NOT EXISTS idx_executions_start_time ON executions(start_time);
+    """),
+    Migration(4, "rollups table (backfilled from existing rows)", _rollups),
+    Migration(5, "progress_events table (replayable progress log)", """
+        CREATE TABLE IF NOT EXISTS progress_events (
+            execution_id INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            event TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (execution_id, seq)
+        ) WITHOUT ROWID;
+    """),
+    Migration(6, "progress_bus table (cross-process progress events)", """
+        CREATE TABLE IF NOT EXISTS progress_bus (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            origin TEXT NOT NULL,
+            execution_id INTEGER NOT NULL,
+            event TEXT NOT NULL,
+            created REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_progress_bus_created ON progress_bus(created);
+    """),
+    Migration(7, "batches table and executions.batch_id", _batches),
+    Migration(8, "execution rollups count current status by start_time", _rollups_current_status),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending_migrations(db_path: Optional[Path] = None) -> List[Migration]:
+    """Migrations not yet applied to db_path (nothing is changed)."""
+    path = Path(db_path or _project_root() / DEFAULT_DB)
+    if not path.exists():
+        return list(MIGRATIONS)
+    conn = sqlite3.connect(str(path))
+    try:
+        current = schema_version(conn)
+    finally:
+        conn.close()
+    return [m for m in MIGRATIONS if m.version > current]
+
+
+def run_migrations(db_path: Optional[Path] = None, dry_run: bool = False) -> List[Migration]:
+    """Bring the schema to LATEST_VERSION. Returns the migrations applied (or, with dry_run, pending)."""
+    if dry_run:
+        return pending_migrations(db_path)
     path = db_path or _project_root() / DEFAULT_DB
     path = Path(path)
-    conn = sqlite3.connect(str(path))
+    conn = sqlite3.connect(str(path), isolation_level=None)
+    applied: List[Migration] = []
     try:
-        conn.executescript(SCHEMA)
-        conn.commit()
-        _add_column_if_missing(conn, "executions", "output_path")
-        _add_column_if_missing(conn, "executions", "topic")
+        if schema_version(conn) >= LATEST_VERSION:
+            return applied
+        if conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone() is None:
+            # Empty database: switching now is free (the VACUUM has nothing to copy) and lets
+            # maintenance release pages later without a full VACUUM of a populated file
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        for m in MIGRATIONS:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-check under the write lock: another process may have applied it meanwhile
+                if schema_version(conn) >= m.version:
+                    conn.execute("COMMIT")
+                    continue
+                if callable(m.step):
+                    m.step(conn)
+                else:
+                    for stmt in _statements(m.step):
+                        conn.execute(stmt)
+                conn.execute(f"PRAGMA user_version = {int(m.version)}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            applied.append(m)
     finally:
         conn.close()
+    return applied
@@ -11,6 +11,13 @@ STATUS_IN_PROGRESS = "in_progress"
 STATUS_COMPLETED = "completed"
 STATUS_FAILED = "failed"
 
+# executions columns, and the subset the History page lists (select with columns=...)
+EXECUTION_COLUMNS = (
+    "id", "status", "start_time", "end_time", "current_stage",
+    "error_message", "cost_total", "output_path", "topic", "batch_id",
+)
+EXECUTION_SUMMARY_COLUMNS = ("id", "topic", "status", "current_stage", "cost_total", "start_time")
+
 # Message queue status
 QUEUE_PENDING = "pending"
 QUEUE_PROCESSING = "processing"
@@ -29,6 +36,15 @@ class Execution:
     cost_total: Optional[float]
 
 
+@dataclass
+class Batch:
+    id: Optional[int]
+    created_at: str
+    total: int
+    concurrency: int
+    topics: Optional[str]  # JSON list: requested topics, or the shared research result
+
+
 @dataclass
 class Cost:
     id: Optional[int]
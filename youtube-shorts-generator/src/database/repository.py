@@ -1,23 +1,139 @@
 """
 Data access layer for SQLite. Uses schema from migrations; models define row shapes.
+
+Connections are opened once per (thread, database path) and reused; each is tuned for
+concurrent use (WAL, synchronous=NORMAL, busy_timeout, mmap, statement cache). The schema
+check runs once per database path per process.
+
+Cost rows and stage updates may be held in ``write_buffer``; reads of executions/costs and
+``update_execution`` flush them first so callers see their own writes (threads inside
+``read_only()`` skip the flush; the async facade flushes on its writer before such reads).
 """
 import sqlite3
 import json
+import sys
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, List, Any
+from typing import Iterator, Optional, List, Any, Sequence, Tuple
 
 from .migrations import DEFAULT_DB, run_migrations, _project_root
 from . import models
+from . import rollups
+
+BUSY_TIMEOUT_MS = 5000
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+_lock = threading.Lock()
+_all_conns: List[sqlite3.Connection] = []
+_verified_schema: set[str] = set()
+# Bumped by close_connections(); a thread whose cache is from an older generation drops it
+_generation = 0
+
+
+def _resolve_path(db_path: Optional[Path] = None) -> str:
+    return str(db_path or _project_root() / DEFAULT_DB)
+
+
+def _open(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_MS / 1000.0,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,  # only used by its owning thread; close_connections() may run elsewhere
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE_BYTES}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
 
 
 def _get_conn(db_path: Optional[Path] = None) -> sqlite3.Connection:
-    path = db_path or _project_root() / DEFAULT_DB
-    return sqlite3.connect(str(path))
+    """Thread-local connection for db_path, opened on first use and reused afterwards."""
+    path = _resolve_path(db_path)
+    conns = getattr(_local, "conns", None)
+    if conns is None or _local.generation != _generation:
+        conns = _local.conns = {}
+        _local.generation = _generation
+    conn = conns.get(path)
+    if conn is None:
+        conn = conns[path] = _open(path)
+        with _lock:
+            _all_conns.append(conn)
+    return conn
+
+
+@contextmanager
+def _connection(db_path: Optional[Path] = None) -> Iterator[sqlite3.Connection]:
+    """Yield the reused connection; roll back an open transaction if the block raises."""
+    conn = _get_conn(db_path)
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+
+def close_connections() -> None:
+    """Close every cached connection (all threads) and forget schema checks. For shutdown and tests.
+    Other threads notice the new generation on their next query and open fresh connections."""
+    global _generation
+    with _lock:
+        conns = list(_all_conns)
+        _all_conns.clear()
+        _verified_schema.clear()
+        _generation += 1
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+def schema_verified(db_path: Optional[Path] = None) -> bool:
+    return _resolve_path(db_path) in _verified_schema
+
+
+@contextmanager
+def read_only() -> Iterator[None]:
+    """Mark this thread read-only for the block: buffered writes are not flushed and migrations
+    are refused. The async facade runs reads this way so only its writer thread ever writes."""
+    _local.read_only = True
+    try:
+        yield
+    finally:
+        _local.read_only = False
 
 
 def ensure_schema(db_path: Optional[Path] = None) -> None:
-    """Run migrations if needed."""
-    run_migrations(db_path)
+    """Run migrations once per database path per process."""
+    path = _resolve_path(db_path)
+    if path in _verified_schema:
+        return
+    if getattr(_local, "read_only", False):
+        raise RuntimeError(f"Schema of {path} not set up; run ensure_schema on the writer first")
+    run_migrations(Path(path))
+    with _lock:
+        _verified_schema.add(path)
+
+
+def _flush_buffered(db_path: Optional[Path] = None) -> None:
+    """Apply write-behind writes pending for db_path (no-op unless write_buffer has been loaded,
+    and on read-only threads)."""
+    wb = sys.modules.get(f"{__package__}.write_buffer")
+    if wb is not None and not getattr(_local, "read_only", False):
+        wb.flush(db_path)
+
+
+def _has_buffered() -> bool:
+    wb = sys.modules.get(f"{__package__}.write_buffer")
+    return wb is not None and wb.pending() > 0
 
 
 # --- Executions ---
@@ -26,19 +142,21 @@ def create_execution(
     status: str = models.STATUS_PENDING,
     start_time: Optional[str] = None,
     current_stage: Optional[str] = None,
+    topic: Optional[str] = None,
+    batch_id: Optional[int] = None,
     db_path: Optional[Path] = None,
 ) -> int:
+    import datetime
+    ts = start_time or datetime.datetime.utcnow().isoformat() + "Z"
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
+    with _connection(db_path) as conn:
         cur = conn.execute(
-            "INSERT INTO executions (status, start_time, current_stage) VALUES (?, ?, ?)",
-            (status, start_time or None, current_stage),
+            "INSERT INTO executions (status, start_time, current_stage, topic, batch_id) VALUES (?, ?, ?, ?, ?)",
+            (status, ts, current_stage, topic, batch_id),
         )
+        rollups.record_status(conn, status, ts=ts)
         conn.commit()
         return cur.lastrowid or 0
-    finally:
-        conn.close()
 
 
 def update_execution(
@@ -52,8 +170,9 @@ def update_execution(
     topic: Optional[str] = None,
     db_path: Optional[Path] = None,
 ) -> None:
-    conn = _get_conn(db_path)
-    try:
+    ensure_schema(db_path)
+    _flush_buffered(db_path)  # keep buffered stage updates from landing after this write
+    with _connection(db_path) as conn:
         updates = []
         args = []
         if status is not None:
@@ -79,51 +198,208 @@ def update_execution(
             args.append(topic)
         if not updates:
             return
+        old = None
+        if status is not None or cost_total is not None:
+            old = conn.execute(
+                "SELECT status, current_stage, cost_total, start_time, end_time FROM executions WHERE id = ?",
+                (execution_id,),
+            ).fetchone()
         args.append(execution_id)
         conn.execute(
             f"UPDATE executions SET {', '.join(updates)} WHERE id = ?",
             args,
         )
+        if old is not None and (old["start_time"] or old["end_time"] or end_time):
+            new_status = status if status is not None else old["status"]
+            new_cost = cost_total if cost_total is not None else old["cost_total"]
+            if new_status != old["status"] or (new_cost or 0.0) != (old["cost_total"] or 0.0):
+                # Rollups hold each execution's current status, bucketed by start_time
+                old_failed = new_failed = None
+                if new_status != old["status"]:
+                    if old["status"] == models.STATUS_FAILED:
+                        old_failed = old["current_stage"] or "unknown"
+                    if new_status == models.STATUS_FAILED:
+                        new_failed = current_stage or old["current_stage"] or "unknown"
+                rollups.move_status(
+                    conn,
+                    old["start_time"] or old["end_time"] or end_time,
+                    old["status"],
+                    new_status,
+                    old_cost=old["cost_total"],
+                    new_cost=new_cost,
+                    old_failed_stage=old_failed,
+                    new_failed_stage=new_failed,
+                )
         conn.commit()
-    finally:
-        conn.close()
 
 
 def get_execution(execution_id: int, db_path: Optional[Path] = None) -> Optional[dict]:
     """Get one execution by id."""
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
-        conn.row_factory = sqlite3.Row
+    _flush_buffered(db_path)
+    with _connection(db_path) as conn:
         row = conn.execute("SELECT * FROM executions WHERE id = ?", (execution_id,)).fetchone()
         return dict(row) if row else None
-    finally:
-        conn.close()
 
 
-def get_executions_count(db_path: Optional[Path] = None) -> int:
-    """Total count of executions for pagination."""
+def _execution_filters(
+    status: Optional[str] = None,
+    topic_prefix: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    min_cost: Optional[float] = None,
+    max_cost: Optional[float] = None,
+) -> Tuple[List[str], List[Any]]:
+    """WHERE clauses and args for execution filters (dates are ISO strings compared to start_time)."""
+    where: List[str] = []
+    args: List[Any] = []
+    if status is not None:
+        where.append("status = ?")
+        args.append(status)
+    if topic_prefix:
+        escaped = topic_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where.append("topic LIKE ? ESCAPE '\\'")
+        args.append(escaped + "%")
+    if since is not None:
+        where.append("start_time >= ?")
+        args.append(since)
+    if until is not None:
+        where.append("start_time < ?")
+        args.append(until)
+    if min_cost is not None:
+        where.append("cost_total >= ?")
+        args.append(min_cost)
+    if max_cost is not None:
+        where.append("cost_total <= ?")
+        args.append(max_cost)
+    return where, args
+
+
+def get_executions_count(db_path: Optional[Path] = None, **filters: Any) -> int:
+    """Total count of executions for pagination (optionally filtered like list_executions)."""
+    where, args = _execution_filters(**filters)
+    sql = "SELECT COUNT(*) FROM executions"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
-        row = conn.execute("SELECT COUNT(*) FROM executions").fetchone()
+    with _connection(db_path) as conn:
+        row = conn.execute(sql, args).fetchone()
         return int(row[0]) if row else 0
-    finally:
-        conn.close()
+
+
+def list_executions(
+    limit: int = 10,
+    before_id: Optional[int] = None,
+    status: Optional[str] = None,
+    topic_prefix: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    min_cost: Optional[float] = None,
+    max_cost: Optional[float] = None,
+    columns: Optional[Sequence[str]] = None,
+    offset: int = 0,
+    db_path: Optional[Path] = None,
+) -> Tuple[List[dict], Optional[int]]:
+    """Newest-first page of executions using keyset pagination on id.
+
+    Pass the returned cursor as before_id to get the next page; it is None on the last page.
+    columns restricts the selected fields (see models.EXECUTION_COLUMNS); id is always included.
+    Raises ValueError for unknown columns.
+    """
+    if columns:
+        unknown = [c for c in columns if c not in models.EXECUTION_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown execution columns: {', '.join(unknown)}")
+        cols = ["id"] + [c for c in columns if c != "id"]
+        select = ", ".join(cols)
+    else:
+        select = "*"
+    where, args = _execution_filters(status, topic_prefix, since, until, min_cost, max_cost)
+    if before_id is not None:
+        where.append("id < ?")
+        args.append(before_id)
+    sql = f"SELECT {select} FROM executions"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    # Fetch one extra row to know whether another page exists
+    sql += " ORDER BY id DESC LIMIT ? OFFSET ?"
+    args.extend([limit + 1, offset])
+    ensure_schema(db_path)
+    _flush_buffered(db_path)
+    with _connection(db_path) as conn:
+        rows = [dict(r) for r in conn.execute(sql, args).fetchall()]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]["id"]
+    return rows, None
 
 
 def get_last_executions(n: int = 10, db_path: Optional[Path] = None) -> List[dict]:
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
-        conn.row_factory = sqlite3.Row
+    _flush_buffered(db_path)
+    with _connection(db_path) as conn:
         rows = conn.execute(
             "SELECT * FROM executions ORDER BY id DESC LIMIT ?",
             (n,),
         ).fetchall()
         return [dict(r) for r in rows]
-    finally:
-        conn.close()
+
+
+# --- Batches ---
+
+def create_batch(
+    size: int,
+    concurrency: int,
+    topics: Optional[List[str]] = None,
+    db_path: Optional[Path] = None,
+) -> Tuple[int, List[int]]:
+    """Create a batch and its size pending executions (topics[i % len] each, if given) in one
+    transaction. Returns (batch_id, execution ids)."""
+    import datetime
+    ts = datetime.datetime.utcnow().isoformat() + "Z"
+    ensure_schema(db_path)
+    with _connection(db_path) as conn:
+        batch_id = conn.execute(
+            "INSERT INTO batches (created_at, total, concurrency, topics) VALUES (?, ?, ?, ?)",
+            (ts, size, concurrency, json.dumps(topics) if topics else None),
+        ).lastrowid
+        ids = []
+        for i in range(size):
+            topic = topics[i % len(topics)] if topics else None
+            ids.append(conn.execute(
+                "INSERT INTO executions (status, start_time, topic, batch_id) VALUES (?, ?, ?, ?)",
+                (models.STATUS_PENDING, ts, topic, batch_id),
+            ).lastrowid)
+        for _ in ids:
+            rollups.record_status(conn, models.STATUS_PENDING, ts=ts)
+        conn.commit()
+    return batch_id, ids
+
+
+def set_batch_topics(batch_id: int, topics: List[str], db_path: Optional[Path] = None) -> None:
+    """Record the topic list shared by a batch (from its one research run)."""
+    ensure_schema(db_path)
+    with _connection(db_path) as conn:
+        conn.execute("UPDATE batches SET topics = ? WHERE id = ?", (json.dumps(topics), batch_id))
+        conn.commit()
+
+
+def get_batch(batch_id: int, db_path: Optional[Path] = None) -> Optional[dict]:
+    """Batch row (topics decoded) with its executions (summary columns, oldest first)."""
+    ensure_schema(db_path)
+    _flush_buffered(db_path)
+    with _connection(db_path) as conn:
+        row = conn.execute("SELECT * FROM batches WHERE id = ?", (batch_id,)).fetchone()
+        if row is None:
+            return None
+        executions = conn.execute(
+            f"SELECT {', '.join(models.EXECUTION_SUMMARY_COLUMNS)} FROM executions WHERE batch_id = ? ORDER BY id",
+            (batch_id,),
+        ).fetchall()
+    batch = dict(row)
+    batch["topics"] = json.loads(batch["topics"]) if batch["topics"] else None
+    batch["executions"] = [dict(r) for r in executions]
+    return batch
 
 
 # --- Costs ---
@@ -131,15 +407,13 @@ def get_last_executions(n: int = 10, db_path: Optional[Path] = None) -> List[dic
 def get_execution_cost_total(execution_id: int, db_path: Optional[Path] = None) -> float:
     """Sum costs for an execution."""
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
+    _flush_buffered(db_path)
+    with _connection(db_path) as conn:
         row = conn.execute(
             "SELECT COALESCE(SUM(cost), 0) FROM costs WHERE execution_id = ?",
             (execution_id,),
         ).fetchone()
         return float(row[0]) if row else 0.0
-    finally:
-        conn.close()
 
 
 def insert_cost(
@@ -152,16 +426,87 @@ def insert_cost(
     import datetime
     ts = timestamp or datetime.datetime.utcnow().isoformat() + "Z"
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
+    with _connection(db_path) as conn:
         cur = conn.execute(
             "INSERT INTO costs (execution_id, component, cost, timestamp) VALUES (?, ?, ?, ?)",
             (execution_id, component, cost, ts),
         )
+        rollups.record_costs(conn, [(execution_id, component, cost, ts)])
         conn.commit()
         return cur.lastrowid or 0
-    finally:
-        conn.close()
+
+
+def write_batch(
+    costs: List[tuple],
+    stages: dict,
+    db_path: Optional[Path] = None,
+) -> None:
+    """Insert cost rows (execution_id, component, cost, timestamp) and set current_stage per
+    {execution_id: stage} in a single transaction. Used by write_buffer."""
+    ensure_schema(db_path)
+    with _connection(db_path) as conn:
+        if costs:
+            conn.executemany(
+                "INSERT INTO costs (execution_id, component, cost, timestamp) VALUES (?, ?, ?, ?)",
+                costs,
+            )
+            rollups.record_costs(conn, costs)
+        if stages:
+            conn.executemany(
+                "UPDATE executions SET current_stage = ? WHERE id = ?",
+                [(stage, eid) for eid, stage in stages.items()],
+            )
+        conn.commit()
+
+
+# --- Rollups ---
+
+def get_rollups(
+    granularity: str = "day",
+    metric: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    db_path: Optional[Path] = None,
+) -> List[dict]:
+    """Aggregated rows {bucket, metric, dimension, count, total} (see rollups module)."""
+    ensure_schema(db_path)
+    _flush_buffered(db_path)
+    with _connection(db_path) as conn:
+        return rollups.query(conn, granularity, metric=metric, since=since, until=until)
+
+
+def get_month_cost(month: str, db_path: Optional[Path] = None) -> float:
+    """Total USD logged in month ``YYYY-MM`` (from daily rollups)."""
+    ensure_schema(db_path)
+    _flush_buffered(db_path)
+    with _connection(db_path) as conn:
+        return rollups.month_cost(conn, month)[0]
+
+
+# --- Progress events ---
+
+def insert_progress_events(rows: Sequence[Tuple[int, dict]], db_path: Optional[Path] = None) -> None:
+    """Persist progress events (execution_id, event with seq); already stored seqs are ignored."""
+    import datetime
+    ts = datetime.datetime.utcnow().isoformat() + "Z"
+    ensure_schema(db_path)
+    with _connection(db_path) as conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO progress_events (execution_id, seq, event, created_at) VALUES (?, ?, ?, ?)",
+            [(eid, event["seq"], json.dumps(event), ts) for eid, event in rows],
+        )
+        conn.commit()
+
+
+def get_progress_events(execution_id: int, since: int = 0, db_path: Optional[Path] = None) -> List[dict]:
+    """Persisted progress events of an execution with seq > since, in order."""
+    ensure_schema(db_path)
+    with _connection(db_path) as conn:
+        rows = conn.execute(
+            "SELECT event FROM progress_events WHERE execution_id = ? AND seq > ? ORDER BY seq",
+            (execution_id, since),
+        ).fetchall()
+    return [json.loads(r[0]) for r in rows]
 
 
 # --- Videos ---
@@ -176,8 +521,7 @@ def insert_video(
     db_path: Optional[Path] = None,
 ) -> int:
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
+    with _connection(db_path) as conn:
         cur = conn.execute(
             """INSERT INTO videos (execution_id, title, description, youtube_id, publish_date, script_text)
                VALUES (?, ?, ?, ?, ?, ?)""",
@@ -185,19 +529,13 @@ def insert_video(
         )
         conn.commit()
         return cur.lastrowid or 0
-    finally:
-        conn.close()
 
 
 def get_video_by_youtube_id(youtube_id: str, db_path: Optional[Path] = None) -> Optional[dict]:
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
-        conn.row_factory = sqlite3.Row
+    with _connection(db_path) as conn:
         row = conn.execute("SELECT * FROM videos WHERE youtube_id = ?", (youtube_id,)).fetchone()
         return dict(row) if row else None
-    finally:
-        conn.close()
 
 
 # --- Embeddings ---
@@ -211,33 +549,26 @@ def insert_embedding(
     import datetime
     ts = created_at or datetime.datetime.utcnow().isoformat() + "Z"
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
+    with _connection(db_path) as conn:
         cur = conn.execute(
             "INSERT INTO embeddings (video_id, embedding_vector, created_at) VALUES (?, ?, ?)",
             (video_id, embedding_vector, ts),
         )
         conn.commit()
         return cur.lastrowid or 0
-    finally:
-        conn.close()
 
 
 def get_embeddings_for_videos(video_ids: List[int], db_path: Optional[Path] = None) -> List[dict]:
     if not video_ids:
         return []
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
-        conn.row_factory = sqlite3.Row
+    with _connection(db_path) as conn:
         placeholders = ",".join("?" * len(video_ids))
         rows = conn.execute(
             f"SELECT * FROM embeddings WHERE video_id IN ({placeholders}) ORDER BY created_at DESC",
             video_ids,
         ).fetchall()
         return [dict(r) for r in rows]
-    finally:
-        conn.close()
 
 
 # --- Message queue ---
@@ -253,8 +584,7 @@ def enqueue(
     import datetime
     ts = datetime.datetime.utcnow().isoformat() + "Z"
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
+    with _connection(db_path) as conn:
         cur = conn.execute(
             """INSERT INTO message_queue (from_agent, to_agent, message_type, payload, status, created_at)
                VALUES (?, ?, ?, ?, ?, ?)""",
@@ -262,16 +592,14 @@ def enqueue(
         )
         conn.commit()
         return cur.lastrowid or 0
-    finally:
-        conn.close()
 
 
 def dequeue_next(to_agent: Optional[str] = None, db_path: Optional[Path] = None) -> Optional[dict]:
     """Get next pending message for to_agent (or any if to_agent is None); mark as processing."""
     ensure_schema(db_path)
-    conn = _get_conn(db_path)
-    try:
-        conn.row_factory = sqlite3.Row
+    with _connection(db_path) as conn:
+        # Take the write lock before reading so two workers sharing the DB never claim the same row
+        conn.execute("BEGIN IMMEDIATE")
         if to_agent:
             row = conn.execute(
                 "SELECT * FROM message_queue WHERE status = ? AND to_agent = ? ORDER BY id LIMIT 1",
@@ -283,6 +611,7 @@ def dequeue_next(to_agent: Optional[str] = None, db_path: Optional[Path] = None)
                 (models.QUEUE_PENDING,),
             ).fetchone()
         if not row:
+            conn.rollback()
             return None
         msg_id = row["id"]
         conn.execute(
@@ -291,8 +620,14 @@ def dequeue_next(to_agent: Optional[str] = None, db_path: Optional[Path] = None)
         )
         conn.commit()
         return dict(row)
-    finally:
-        conn.close()
+
+
+def count_messages_by_status(db_path: Optional[Path] = None) -> dict:
+    """Number of queued messages per status (uses the status index)."""
+    ensure_schema(db_path)
+    with _connection(db_path) as conn:
+        rows = conn.execute("SELECT status, COUNT(*) FROM message_queue GROUP BY status").fetchall()
+    return {r[0]: r[1] for r in rows}
 
 
 def mark_message_processed(
@@ -303,12 +638,10 @@ def mark_message_processed(
     """Set message status and processed_at."""
     import datetime
     ts = datetime.datetime.utcnow().isoformat() + "Z"
-    conn = _get_conn(db_path)
-    try:
+    ensure_schema(db_path)
+    with _connection(db_path) as conn:
         conn.execute(
             "UPDATE message_queue SET status = ?, processed_at = ? WHERE id = ?",
             (status, ts, message_id),
         )
         conn.commit()
-    finally:
-        conn.close()
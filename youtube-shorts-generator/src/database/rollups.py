@@ -0,0 +1,199 @@
+"""
+Incrementally maintained hourly/daily aggregates for costs and execution outcomes.
+
+The repository updates the ``rollups`` table in the same transaction as the write it summarizes
+(cost rows, execution status and cost changes), so stats and budget checks read O(buckets) rows instead
+of scanning ``executions`` and ``costs``. Buckets are UTC: ``YYYY-MM-DDTHH`` (hour), ``YYYY-MM-DD`` (day).
+
+Metrics (dimension in parentheses):
+- ``cost`` (component): count = cost rows, total = USD; bucketed by the cost row's timestamp
+- ``executions`` (status): count = executions currently in that status, total = their cost_total
+- ``failed_stage`` (stage): count = failed executions that failed at that stage
+
+Execution metrics describe each execution's current state and are bucketed by its start_time (else
+end_time): a status change moves the execution from its old status to its new one within the same
+bucket. This is exactly what :func:`backfill` computes from the rows, so rollups built by a migration
+and rollups kept live agree.
+"""
+import datetime
+import sqlite3
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+GRANULARITIES = ("hour", "day")
+METRIC_COST = "cost"
+METRIC_EXECUTIONS = "executions"
+METRIC_FAILED_STAGE = "failed_stage"
+
+_BUCKET_LEN = {"hour": 13, "day": 10}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    granularity TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    total REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, metric, bucket, dimension)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO rollups (granularity, bucket, metric, dimension, count, total) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (granularity, metric, bucket, dimension)
+DO UPDATE SET count = count + excluded.count, total = total + excluded.total
+"""
+
+
+def now_iso() -> str:
+    return datetime.datetime.utcnow().isoformat() + "Z"
+
+
+def bucket(ts: str, granularity: str) -> str:
+    """Bucket key for an ISO timestamp."""
+    return ts[:_BUCKET_LEN[granularity]]
+
+
+def _rows(ts: str, metric: str, dimension: str, count: int, total: float) -> List[tuple]:
+    return [(g, bucket(ts, g), metric, dimension, count, total) for g in GRANULARITIES]
+
+
+def record_costs(conn: sqlite3.Connection, costs: Iterable[Sequence]) -> None:
+    """Add cost rows (execution_id, component, cost, timestamp). Caller commits."""
+    rows: List[tuple] = []
+    for _, component, cost, ts in costs:
+        rows.extend(_rows(ts, METRIC_COST, component, 1, float(cost)))
+    if rows:
+        conn.executemany(_UPSERT, rows)
+
+
+def record_status(
+    conn: sqlite3.Connection,
+    status: str,
+    cost_total: Optional[float] = None,
+    failed_stage: Optional[str] = None,
+    ts: Optional[str] = None,
+) -> None:
+    """Count a new execution in status (and the failing stage, if any); ts is its start_time.
+    Caller commits."""
+    ts = ts or now_iso()
+    rows = _rows(ts, METRIC_EXECUTIONS, status, 1, float(cost_total or 0.0))
+    if failed_stage is not None:
+        rows.extend(_rows(ts, METRIC_FAILED_STAGE, failed_stage or "unknown", 1, 0.0))
+    conn.executemany(_UPSERT, rows)
+
+
+def move_status(
+    conn: sqlite3.Connection,
+    ts: str,
+    old_status: str,
+    new_status: str,
+    old_cost: Optional[float] = None,
+    new_cost: Optional[float] = None,
+    old_failed_stage: Optional[str] = None,
+    new_failed_stage: Optional[str] = None,
+) -> None:
+    """Move one execution started at ts from (old_status, old_cost) to (new_status, new_cost), and
+    from/to a failed stage when it leaves/enters failed. Emptied rows are removed. Caller commits."""
+    rows = _rows(ts, METRIC_EXECUTIONS, old_status, -1, -float(old_cost or 0.0))
+    rows.extend(_rows(ts, METRIC_EXECUTIONS, new_status, 1, float(new_cost or 0.0)))
+    emptied = [(METRIC_EXECUTIONS, old_status)]
+    if old_failed_stage is not None:
+        rows.extend(_rows(ts, METRIC_FAILED_STAGE, old_failed_stage, -1, 0.0))
+        emptied.append((METRIC_FAILED_STAGE, old_failed_stage))
+    if new_failed_stage is not None:
+        rows.extend(_rows(ts, METRIC_FAILED_STAGE, new_failed_stage, 1, 0.0))
+    conn.executemany(_UPSERT, rows)
+    conn.executemany(
+        "DELETE FROM rollups WHERE granularity = ? AND metric = ? AND bucket = ? AND dimension = ? AND count <= 0",
+        [(g, metric, bucket(ts, g), dim) for metric, dim in emptied for g in GRANULARITIES],
+    )
+
+
+def _insert_execution_rollups(conn: sqlite3.Connection, granularity: str) -> None:
+    from . import models
+    n = _BUCKET_LEN[granularity]
+    conn.execute(
+        f"""INSERT INTO rollups (granularity, bucket, metric, dimension, count, total)
+            SELECT ?, substr(COALESCE(start_time, end_time), 1, {n}), ?, status, COUNT(*), COALESCE(SUM(cost_total), 0)
+            FROM executions WHERE COALESCE(start_time, end_time) IS NOT NULL GROUP BY 2, 4""",
+        (granularity, METRIC_EXECUTIONS),
+    )
+    conn.execute(
+        f"""INSERT INTO rollups (granularity, bucket, metric, dimension, count, total)
+            SELECT ?, substr(COALESCE(start_time, end_time), 1, {n}), ?, COALESCE(current_stage, 'unknown'), COUNT(*), 0
+            FROM executions WHERE status = ? AND COALESCE(start_time, end_time) IS NOT NULL GROUP BY 2, 4""",
+        (granularity, METRIC_FAILED_STAGE, models.STATUS_FAILED),
+    )
+
+
+def backfill(conn: sqlite3.Connection) -> None:
+    """Build rollups from existing rows (run once, when the table is created). Caller commits.
+
+    Executions contribute their current status and cost_total, bucketed by start_time (else end_time),
+    the same state the live updates maintain.
+    """
+    for g in GRANULARITIES:
+        n = _BUCKET_LEN[g]
+        conn.execute(
+            f"""INSERT INTO rollups (granularity, bucket, metric, dimension, count, total)
+                SELECT ?, substr(timestamp, 1, {n}), ?, component, COUNT(*), SUM(cost)
+                FROM costs GROUP BY 2, 4""",
+            (g, METRIC_COST),
+        )
+        _insert_execution_rollups(conn, g)
+
+
+def rebuild_executions(conn: sqlite3.Connection) -> None:
+    """Recompute the execution metrics of every bucket that still has execution rows (buckets whose
+    executions were all archived keep their rows). Caller commits."""
+    for g in GRANULARITIES:
+        n = _BUCKET_LEN[g]
+        conn.execute(
+            f"""DELETE FROM rollups WHERE granularity = ? AND metric IN (?, ?) AND bucket IN (
+                    SELECT DISTINCT substr(COALESCE(start_time, end_time), 1, {n}) FROM executions)""",
+            (g, METRIC_EXECUTIONS, METRIC_FAILED_STAGE),
+        )
+        _insert_execution_rollups(conn, g)
+
+
+def query(
+    conn: sqlite3.Connection,
+    granularity: str = "day",
+    metric: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> List[dict]:
+    """Rollup rows ordered by bucket; since/until are ISO times (until exclusive)."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    where = ["granularity = ?"]
+    args: list = [granularity]
+    if metric is not None:
+        where.append("metric = ?")
+        args.append(metric)
+    if since is not None:
+        where.append("bucket >= ?")
+        args.append(bucket(since, granularity))
+    if until is not None:
+        where.append("bucket < ?")
+        args.append(bucket(until, granularity))
+    rows = conn.execute(
+        f"""SELECT bucket, metric, dimension, count, total FROM rollups
+            WHERE {' AND '.join(where)} ORDER BY bucket, metric, dimension""",
+        args,
+    ).fetchall()
+    return [
+        {"bucket": r[0], "metric": r[1], "dimension": r[2], "count": r[3], "total": r[4]}
+        for r in rows
+    ]
+
+
+def month_cost(conn: sqlite3.Connection, month: str) -> Tuple[float, int]:
+    """(total USD, cost rows) for month ``YYYY-MM``, summed over its daily buckets."""
+    row = conn.execute(
+        """SELECT COALESCE(SUM(total), 0), COALESCE(SUM(count), 0) FROM rollups
+           WHERE granularity = 'day' AND metric = ? AND bucket >= ? AND bucket < ?""",
+        (METRIC_COST, month, month + "~"),
+    ).fetchone()
+    return float(row[0]), int(row[1])
@@ -0,0 +1,217 @@
+"""
+Write-behind buffer for cost rows and stage updates.
+
+``log_cost`` and ``save_stage`` are small, frequent writes; committing each one costs an fsync.
+The buffer collects them and a background thread applies them in one transaction per database
+every DB_WRITE_BUFFER_INTERVAL_MS (default 200) or as soon as DB_WRITE_BUFFER_MAX_BATCH (default 100)
+writes are pending. Stage updates for the same execution coalesce to the latest stage.
+
+Repository reads of executions/costs and ``update_execution`` flush pending writes for their
+database first, so callers always see their own writes. Pending writes are flushed at exit;
+``flush()`` forces it (tests). Set DB_WRITE_BUFFER=0 to write through immediately.
+"""
+import atexit
+import datetime
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import repository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_MS = 200
+DEFAULT_MAX_BATCH = 100
+
+CostRow = Tuple[int, str, float, str]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+class WriteBuffer:
+    """Pending cost rows and stage updates per database path, flushed in batches."""
+
+    def __init__(self, interval_ms: Optional[int] = None, max_batch: Optional[int] = None):
+        if interval_ms is None:
+            interval_ms = _env_int("DB_WRITE_BUFFER_INTERVAL_MS", DEFAULT_INTERVAL_MS)
+        if max_batch is None:
+            max_batch = _env_int("DB_WRITE_BUFFER_MAX_BATCH", DEFAULT_MAX_BATCH)
+        self.interval = interval_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._costs: Dict[str, List[CostRow]] = {}
+        self._stages: Dict[str, Dict[int, str]] = {}
+        self._pending = 0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+
+    def pending(self) -> int:
+        with self._cond:
+            return self._pending
+
+    def add_cost(
+        self,
+        execution_id: int,
+        component: str,
+        cost: float,
+        timestamp: Optional[str] = None,
+        db_path: Optional[Path] = None,
+    ) -> None:
+        ts = timestamp or datetime.datetime.utcnow().isoformat() + "Z"
+        path = repository._resolve_path(db_path)
+        with self._cond:
+            self._costs.setdefault(path, []).append((execution_id, component, cost, ts))
+            self._added(1)
+
+    def set_stage(self, execution_id: int, stage: str, db_path: Optional[Path] = None) -> None:
+        path = repository._resolve_path(db_path)
+        with self._cond:
+            stages = self._stages.setdefault(path, {})
+            new = execution_id not in stages
+            stages[execution_id] = stage
+            self._added(1 if new else 0)
+
+    def _added(self, n: int) -> None:
+        # Caller holds self._cond
+        self._pending += n
+        if self._closed:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="db-write-buffer", daemon=True)
+            self._thread.start()
+        self._cond.notify()
+
+    def _take(self, path: Optional[str]) -> Dict[str, Tuple[List[CostRow], Dict[int, str]]]:
+        with self._cond:
+            paths = [path] if path is not None else list(set(self._costs) | set(self._stages))
+            batches = {}
+            for p in paths:
+                costs = self._costs.pop(p, [])
+                stages = self._stages.pop(p, {})
+                if costs or stages:
+                    batches[p] = (costs, stages)
+                    self._pending -= len(costs) + len(stages)
+            return batches
+
+    def _requeue(self, path: str, costs: List[CostRow], stages: Dict[int, str]) -> None:
+        with self._cond:
+            self._costs[path] = costs + self._costs.get(path, [])
+            newer = self._stages.setdefault(path, {})
+            for eid, stage in stages.items():
+                if eid not in newer:
+                    newer[eid] = stage
+                    self._pending += 1
+            self._pending += len(costs)
+
+    def flush(self, db_path: Optional[Path] = None) -> int:
+        """Apply pending writes (for db_path, or every database) now; returns rows written."""
+        path = repository._resolve_path(db_path) if db_path is not None else None
+        written = 0
+        # Serialize flushes so a reader never returns while another thread is mid-flush of its writes
+        with self._flush_lock:
+            for p, (costs, stages) in self._take(path).items():
+                try:
+                    repository.write_batch(costs, stages, db_path=Path(p))
+                except Exception:
+                    self._requeue(p, costs, stages)
+                    raise
+                written += len(costs) + len(stages)
+            if written:
+                self.flushes += 1
+        return written
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                deadline = time.monotonic() + self.interval
+                while self._pending < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Write buffer flush failed; will retry")
+                time.sleep(self.interval)
+
+    def close(self) -> None:
+        """Stop the background thread and flush everything still pending."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.flush()
+
+
+_buffer: Optional[WriteBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def buffering_enabled() -> bool:
+    """False when DB_WRITE_BUFFER=0 (write through)."""
+    return (os.getenv("DB_WRITE_BUFFER") or "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_write_buffer() -> WriteBuffer:
+    """Process-wide buffer (created on first use)."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = WriteBuffer()
+    return _buffer
+
+
+def flush(db_path: Optional[Path] = None) -> int:
+    """Flush pending writes if a buffer exists; returns rows written."""
+    return _buffer.flush(db_path) if _buffer is not None else 0
+
+
+def pending() -> int:
+    """Writes waiting in the process-wide buffer (0 if none was created)."""
+    return _buffer.pending() if _buffer is not None else 0
+
+
+def reset_write_buffer() -> None:
+    """Flush and drop the process-wide buffer (tests, shutdown)."""
+    global _buffer
+    with _buffer_lock:
+        buf, _buffer = _buffer, None
+    if buf is not None:
+        buf.close()
+
+
+atexit.register(reset_write_buffer)
+
+
+def log_cost(execution_id: int, component: str, cost: float, db_path: Optional[Path] = None) -> None:
+    """Buffer a cost row (or insert it directly when buffering is off)."""
+    if buffering_enabled():
+        get_write_buffer().add_cost(execution_id, component, cost, db_path=db_path)
+    else:
+        repository.insert_cost(execution_id=execution_id, component=component, cost=cost, db_path=db_path)
+
+
+def save_stage(execution_id: int, stage: str, db_path: Optional[Path] = None) -> None:
+    """Buffer a current_stage update (or apply it directly when buffering is off)."""
+    if buffering_enabled():
+        get_write_buffer().set_stage(execution_id, stage, db_path=db_path)
+    else:
+        repository.update_execution(execution_id, current_stage=stage, db_path=db_path)
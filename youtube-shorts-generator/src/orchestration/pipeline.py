@@ -1,15 +1,29 @@
 """
 Pipeline orchestrator: sequential agent execution (MVP).
+
+Each execution writes its intermediate files under ``<temp_dir>/<execution_id>/``
+(``ExecutionContext.work_path``), so concurrent executions never overwrite each other's assets;
+the directory is removed when the run ends.
 """
+import asyncio
+import logging
 import shutil
+import time
 from pathlib import Path
-from typing import Optional, List, Type, Callable, Awaitable
+from typing import Optional, List, Type, Callable, Awaitable, Union
 
 from src.agents.base_agent import BaseAgent, ExecutionContext, AgentResult
+from src.agents.registry import AgentRef
 from src.orchestration.state_manager import create_execution, load_context, save_stage
 from src.orchestration.message_queue import MessageQueue
 from src.database import repository
 from src.database import models
+from src.database.async_repository import run_read, run_write
+from src.utils import metrics
+from src.utils import tracing
+from src.utils.logging import log_context
+
+logger = logging.getLogger(__name__)
 
 ProgressCallback = Callable[[str, str, float, str], Awaitable[None]]
 
@@ -24,7 +38,11 @@ def _project_root() -> Path:
 class Pipeline:
     """Runs agents in sequence for one execution."""
 
-    def __init__(self, agents: Optional[List[Type[BaseAgent]]] = None, db_path: Optional[Path] = None):
+    def __init__(
+        self,
+        agents: Optional[List[Union[Type[BaseAgent], AgentRef]]] = None,
+        db_path: Optional[Path] = None,
+    ):
         self.agents = agents or []
         self.db_path = db_path
         self.queue = MessageQueue(db_path=db_path)
@@ -37,17 +55,38 @@ class Pipeline:
         execution_id: Optional[int] = None,
     ) -> int:
         """Create execution (or use provided), run agents in order; return execution_id."""
+        # DB work runs on the async repository's DB threads so it never blocks the event loop
         if execution_id is None:
-            execution_id = create_execution(db_path=self.db_path)
-        repository.update_execution(
+            execution_id = await run_write(create_execution, db_path=self.db_path)
+        from src.utils.config import get_settings
+        # Intermediate audio/video of concurrent executions must never share a path
+        work_dir = get_settings().temp_dir / str(execution_id)
+        try:
+            async with tracing.trace_execution(execution_id):
+                with log_context(execution_id=execution_id), tracing.span("pipeline", "pipeline", execution_id=execution_id):
+                    return await self._run_stages(execution_id, topic, progress_callback, work_dir)
+        finally:
+            # The final video has been copied to output_dir; intermediates are not kept
+            await asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+
+    async def _run_stages(
+        self,
+        execution_id: int,
+        topic: Optional[str],
+        progress_callback: Optional[ProgressCallback],
+        work_dir: Optional[Path] = None,
+    ) -> int:
+        await run_write(
+            repository.update_execution,
             execution_id,
             status=models.STATUS_IN_PROGRESS,
             topic=topic,
             db_path=self.db_path,
         )
-        context = load_context(execution_id, db_path=self.db_path) or ExecutionContext(
+        context = await run_read(load_context, execution_id, db_path=self.db_path) or ExecutionContext(
             execution_id=execution_id, current_stage="start", data={}
         )
+        context.work_dir = work_dir
         if topic:
             context.data["research"] = {"topics": [{"title": topic, "relevance": 0.9}]}
         agents_to_run = self.agents
@@ -55,12 +94,30 @@ class Pipeline:
             agents_to_run = [a for a in self.agents if a.name != "research"]
         total = len(agents_to_run)
         for idx, agent_cls in enumerate(agents_to_run):
+            if isinstance(agent_cls, AgentRef):
+                # First use imports the agent module and its SDKs: keep that off the event loop
+                agent_cls = await asyncio.to_thread(agent_cls.resolve)
             agent = agent_cls()
-            save_stage(execution_id, agent.name, db_path=self.db_path)
+            await run_write(save_stage, execution_id, agent.name, db_path=self.db_path)
             pct = (idx / total) * 100.0 if total else 0
             if progress_callback:
                 await progress_callback(agent.name, "start", pct, f"Starting {agent.name}")
-            result = await agent.execute(context)
+            started = time.perf_counter()
+            with log_context(agent=agent.name):
+                try:
+                    with tracing.span(agent.name, "agent"):
+                        result = await agent.execute(context)
+                except Exception:
+                    metrics.STAGE_SECONDS.observe(time.perf_counter() - started, agent=agent.name, outcome="error")
+                    logger.exception("Stage %s raised", agent.name)
+                    raise
+                elapsed = time.perf_counter() - started
+                metrics.STAGE_SECONDS.observe(elapsed, agent=agent.name, outcome="ok" if result.success else "error")
+                if result.success:
+                    logger.info("Stage %s completed in %.2fs", agent.name, elapsed)
+                else:
+                    # Agents report failures as AgentResult.message; keep them in the log too
+                    logger.warning("Stage %s failed after %.2fs: %s", agent.name, elapsed, result.message)
             context.data[agent.name] = (result.data or {})
             pct = ((idx + 1) / total) * 100.0 if total else 100.0
             if progress_callback:
@@ -71,33 +128,38 @@ class Pipeline:
                     result.message or (f"Completed {agent.name}" if result.success else str(result.message)),
                 )
             if not result.success:
-                repository.update_execution(
+                await run_write(
+                    repository.update_execution,
                     execution_id,
                     status=models.STATUS_FAILED,
                     error_message=result.message,
                     db_path=self.db_path,
                 )
+                metrics.EXECUTIONS_FINISHED.inc(status=models.STATUS_FAILED)
                 return execution_id
         output_path = (context.data.get("composition") or {}).get("output_path")
         final_output_path: Optional[str] = None
         if output_path and Path(output_path).exists():
-            root = _project_root()
-            from src.utils.config import load_config
-            cfg = load_config()
-            out_dir = Path(cfg.get("paths", {}).get("output_dir", "output_videos"))
-            if not out_dir.is_absolute():
-                out_dir = root / out_dir
+            from src.utils.config import get_settings
+            out_dir = get_settings().output_dir
             out_dir.mkdir(parents=True, exist_ok=True)
             dest = out_dir / f"{execution_id}.mp4"
             shutil.copy2(output_path, dest)
             final_output_path = str(dest)
         from src.utils.cost_tracker import get_execution_cost_total
-        cost_total = get_execution_cost_total(execution_id, db_path=self.db_path)
-        repository.update_execution(
+        cost_total = await run_read(get_execution_cost_total, execution_id, db_path=self.db_path)
+        await run_write(
+            repository.update_execution,
             execution_id,
             status=models.STATUS_COMPLETED,
             output_path=final_output_path,
             cost_total=cost_total,
             db_path=self.db_path,
         )
+        metrics.EXECUTIONS_FINISHED.inc(status=models.STATUS_COMPLETED)
+        if final_output_path:
+            # Render preview/poster from the copy the API serves (renditions are keyed by that file).
+            # Best effort: GET /api/video renders missing ones on first request anyway
+            from src.utils import media
+            await asyncio.to_thread(media.ensure_renditions, Path(final_output_path))
         return execution_id
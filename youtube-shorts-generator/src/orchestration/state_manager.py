@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Optional, Dict, Any
 
 from src.database import repository
+from src.database import write_buffer
 from src.agents.base_agent import ExecutionContext
 
 
@@ -29,5 +30,5 @@ def load_context(execution_id: int, db_path: Optional[Path] = None) -> Optional[
 
 
 def save_stage(execution_id: int, stage: str, db_path: Optional[Path] = None) -> None:
-    """Update execution current_stage."""
-    repository.update_execution(execution_id, current_stage=stage, db_path=db_path)
+    """Update execution current_stage (batched through the write buffer)."""
+    write_buffer.save_stage(execution_id, stage, db_path=db_path)
@@ -5,13 +5,16 @@ import os
 from pathlib import Path
 from typing import Optional
 
+from src.utils import metrics
 from src.utils.retry import retry_decorator
+from src.utils.singleflight import single_flight, zero_cost
 
 def _client():
     from elevenlabs.client import ElevenLabs
     return ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
 
 
+@single_flight(shared_result=zero_cost)
 @retry_decorator(max_retries=3, base_delay=1.0, max_delay=60.0)
 def text_to_speech(
     text: str,
@@ -23,8 +26,10 @@ def text_to_speech(
     import tempfile
     path = output_path or Path(tempfile.mkdtemp()) / "tts_output.mp3"
     path.parent.mkdir(parents=True, exist_ok=True)
-    audio = client.text_to_speech.convert(voice_id=voice_id, text=text, output_format="mp3_44100_128")
-    data = b"".join(audio) if hasattr(audio, "__iter__") else audio
+    with metrics.provider_call("elevenlabs", "mp3_44100_128"):
+        audio = client.text_to_speech.convert(voice_id=voice_id, text=text, output_format="mp3_44100_128")
+        # The SDK streams the body: reading it is part of the request
+        data = b"".join(audio) if hasattr(audio, "__iter__") else audio
     with open(path, "wb") as f:
         f.write(data)
     # ~$0.18-0.30/min
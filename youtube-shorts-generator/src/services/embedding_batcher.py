@@ -0,0 +1,189 @@
+"""
+Async micro-batching for embeddings: coalesce concurrent single-text requests into one API call.
+
+Callers await :meth:`EmbeddingBatcher.embed`; requests for the same model are collected for a short
+window (or until the batch size / token limit is hit), sent as one ``get_embeddings([...])`` call
+(one ``client.embeddings.create(input=[...])`` for the cache misses), and the vectors are fanned back.
+
+Async callers reach it through ``openai_service.get_embeddings_async`` (used by the async RAG
+queries). Batch sizes, queueing delay and failed batches are exported on ``/metrics``
+(``shorts_embedding_batch_*``); ``BatcherStats`` has the same numbers per batcher.
+
+Env overrides: EMBEDDING_BATCH_WINDOW_MS, EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_MAX_TOKENS.
+"""
+import asyncio
+import os
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from src.utils import metrics
+
+DEFAULT_WINDOW_MS = 5.0
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_BATCH_TOKENS = 100_000
+
+EmbedFn = Callable[[List[str], Optional[str]], tuple[List[List[float]], float]]
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = (os.getenv(name) or "").strip()
+    try:
+        return float(raw) if raw else default
+    except ValueError:
+        return default
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token) used for batch limits."""
+    return len(text) // 4 + 1
+
+
+@dataclass
+class _Pending:
+    text: str
+    tokens: int
+    future: asyncio.Future
+    enqueued_at: float
+
+
+@dataclass
+class _Group:
+    items: List[_Pending] = field(default_factory=list)
+    tokens: int = 0
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+@dataclass
+class BatcherStats:
+    """Counters for batch sizes and queueing delay."""
+    batches: int = 0
+    items: int = 0
+    max_batch_size: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    errors: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": (self.items / self.batches) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "avg_wait_ms": (self.total_wait_ms / self.items) if self.items else 0.0,
+            "max_wait_ms": self.max_wait_ms,
+            "errors": self.errors,
+        }
+
+
+def _default_embed_fn(texts: List[str], model: Optional[str]) -> tuple[List[List[float]], float]:
+    from src.services.openai_service import get_embeddings
+    return get_embeddings(texts, model=model)
+
+
+class EmbeddingBatcher:
+    """Collects embed requests per model and flushes them as one batched call. Bound to one event loop."""
+
+    def __init__(
+        self,
+        window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        embed_fn: Optional[EmbedFn] = None,
+    ):
+        self.window_ms = window_ms if window_ms is not None else _env_number("EMBEDDING_BATCH_WINDOW_MS", DEFAULT_WINDOW_MS)
+        self.max_batch_size = int(max_batch_size or _env_number("EMBEDDING_BATCH_MAX_SIZE", DEFAULT_MAX_BATCH_SIZE))
+        self.max_batch_tokens = int(max_batch_tokens or _env_number("EMBEDDING_BATCH_MAX_TOKENS", DEFAULT_MAX_BATCH_TOKENS))
+        self._embed_fn = embed_fn or _default_embed_fn
+        self._groups: dict[Optional[str], _Group] = {}
+        self._inflight: set[asyncio.Task] = set()
+        self.stats = BatcherStats()
+
+    async def embed(self, text: str, model: Optional[str] = None) -> tuple[List[float], float]:
+        """Embed one text. Returns (vector, share of the batch cost)."""
+        loop = asyncio.get_running_loop()
+        tokens = estimate_tokens(text)
+        group = self._groups.get(model)
+        # Start a new batch first if this item would push the current one over the token limit
+        if group and group.items and group.tokens + tokens > self.max_batch_tokens:
+            self._flush(model)
+            group = None
+        if group is None:
+            group = self._groups[model] = _Group()
+        item = _Pending(text=text, tokens=tokens, future=loop.create_future(), enqueued_at=time.perf_counter())
+        group.items.append(item)
+        group.tokens += tokens
+        if len(group.items) >= self.max_batch_size or group.tokens >= self.max_batch_tokens:
+            self._flush(model)
+        elif group.timer is None:
+            group.timer = loop.call_later(self.window_ms / 1000.0, self._flush, model)
+        return await item.future
+
+    async def embed_many(self, texts: List[str], model: Optional[str] = None) -> tuple[List[List[float]], float]:
+        """Embed several texts through the batcher. Returns (vectors in input order, total cost)."""
+        results = await asyncio.gather(*(self.embed(t, model) for t in texts))
+        return [v for v, _ in results], sum(c for _, c in results)
+
+    async def drain(self) -> None:
+        """Flush every pending group and wait for in-flight batches (shutdown, tests)."""
+        for model in list(self._groups):
+            self._flush(model)
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def _flush(self, model: Optional[str]) -> None:
+        group = self._groups.pop(model, None)
+        if group is None or not group.items:
+            return
+        if group.timer is not None:
+            group.timer.cancel()
+        task = asyncio.get_running_loop().create_task(self._run_batch(model, group.items))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, model: Optional[str], items: List[_Pending]) -> None:
+        now = time.perf_counter()
+        waits = [(now - it.enqueued_at) * 1000.0 for it in items]
+        st = self.stats
+        st.batches += 1
+        st.items += len(items)
+        st.max_batch_size = max(st.max_batch_size, len(items))
+        st.total_wait_ms += sum(waits)
+        st.max_wait_ms = max(st.max_wait_ms, max(waits))
+        metrics.EMBEDDING_BATCH_SIZE.observe(len(items))
+        for wait in waits:
+            metrics.EMBEDDING_BATCH_WAIT_SECONDS.observe(wait / 1000.0)
+        try:
+            vectors, cost = await asyncio.to_thread(self._embed_fn, [it.text for it in items], model)
+            if len(vectors) != len(items):
+                # Cannot tell which vector belongs to which text: fail the whole batch
+                raise RuntimeError(f"Embedding call returned {len(vectors)} vectors for {len(items)} texts")
+        except Exception as e:
+            st.errors += 1
+            metrics.EMBEDDING_BATCH_ERRORS.inc()
+            for it in items:
+                if not it.future.done():
+                    it.future.set_exception(e)
+            return
+        total_tokens = sum(it.tokens for it in items) or 1
+        for it, vec in zip(items, vectors):
+            if not it.future.done():
+                it.future.set_result((vec, cost * it.tokens / total_tokens))
+
+
+_batchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, EmbeddingBatcher]" = weakref.WeakKeyDictionary()
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Batcher for the running event loop (created on first use with env/default settings)."""
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = EmbeddingBatcher()
+    return batcher
+
+
+async def embed_text(text: str, model: Optional[str] = None) -> tuple[List[float], float]:
+    """Embed one text via the shared batcher for this loop. Returns (vector, cost_share)."""
+    return await get_embedding_batcher().embed(text, model)
@@ -0,0 +1,167 @@
+"""
+Persistent embedding cache: SQLite store keyed by (model, sha256(text)) with an in-memory LRU front.
+
+Vectors are stored as packed float32 blobs. Used by :func:`src.services.openai_service.get_embeddings`
+so only cache misses are sent to the embeddings API.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+DEFAULT_CACHE_NAME = "embedding_cache.db"
+DEFAULT_LRU_SIZE = 4096
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+"""
+
+
+def text_hash(text: str) -> str:
+    """sha256 hex digest of the UTF-8 text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vec = array("f")
+    vec.frombytes(blob)
+    return vec.tolist()
+
+
+class EmbeddingCache:
+    """Two-level cache: bounded in-memory LRU over a SQLite table. Thread-safe."""
+
+    def __init__(self, path: Optional[Path] = None, lru_size: int = DEFAULT_LRU_SIZE):
+        if path is None:
+            from src.utils.config import project_root
+            path = project_root() / DEFAULT_CACHE_NAME
+        self.path = Path(path)
+        self.lru_size = max(0, lru_size)
+        self._lru: "OrderedDict[tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: tuple[str, str], vector: List[float]) -> None:
+        if not self.lru_size:
+            return
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Return cached vectors in input order; None for misses."""
+        keys = [(model, text_hash(t)) for t in texts]
+        out: List[Optional[List[float]]] = [None] * len(keys)
+        with self._lock:
+            missing: dict[str, List[int]] = {}
+            for i, key in enumerate(keys):
+                vec = self._lru.get(key)
+                if vec is not None:
+                    self._lru.move_to_end(key)
+                    out[i] = vec
+                else:
+                    missing.setdefault(key[1], []).append(i)
+            if not missing:
+                return out
+            hashes = list(missing)
+            conn = self._db()
+            # Stay well under SQLITE_MAX_VARIABLE_NUMBER
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embedding_cache WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk],
+                ).fetchall()
+                for h, blob in rows:
+                    vec = _unpack(blob)
+                    self._remember((model, h), vec)
+                    for i in missing[h]:
+                        out[i] = vec
+        return out
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors for texts (same order). Existing entries are overwritten."""
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                h = text_hash(text)
+                blob = _pack(vector)
+                rows.append((model, h, len(vector), blob))
+                # Keep the LRU consistent with what a later disk read would return (float32)
+                self._remember((model, h), _unpack(blob))
+            if not rows:
+                return
+            conn = self._db()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+
+    def clear_memory(self) -> None:
+        """Drop the in-memory LRU (disk entries are kept)."""
+        with self._lock:
+            self._lru.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._lru.clear()
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    """Cache is on unless EMBEDDING_CACHE is set to 0/false/off."""
+    return (os.getenv("EMBEDDING_CACHE") or "1").strip().lower() not in ("0", "false", "off", "no")
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache. Path from EMBEDDING_CACHE_PATH (default: project root / embedding_cache.db)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                custom = (os.getenv("EMBEDDING_CACHE_PATH") or "").strip()
+                lru = int((os.getenv("EMBEDDING_CACHE_LRU_SIZE") or "").strip() or DEFAULT_LRU_SIZE)
+                _cache = EmbeddingCache(Path(custom) if custom else None, lru_size=lru)
+    return _cache
+
+
+def reset_embedding_cache() -> None:
+    """Close and forget the process-wide cache (tests, config changes)."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
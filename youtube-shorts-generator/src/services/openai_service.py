@@ -2,7 +2,8 @@
 OpenAI API: Chat Completions and embeddings with retry and cost tracking.
 
 Uses /v1/chat/completions so projects with 'Model capabilities' but not 'Responses API' work.
-Public entry points: :func:`chat_completion`, :func:`get_embeddings`.
+Public entry points: :func:`chat_completion`, :func:`get_embeddings`, and
+:func:`get_embeddings_async`, which coalesces concurrent callers through the embedding batcher.
 """
 import os
 from typing import Optional, List, Any
@@ -14,7 +15,11 @@ def _client():
 
 
 # Import retry utility
+from src.utils import metrics
 from src.utils.retry import retry_decorator
+from src.utils.singleflight import single_flight, zero_cost
+from src.services.embedding_cache import cache_enabled, get_embedding_cache
+from src.services.response_cache import get_response_cache, make_key
 
 
 def _default_chat_model() -> str:
@@ -40,7 +45,8 @@ def _chat_completion_chat_api(
     client: Any, messages: List[dict], model: str, temperature: float
 ) -> tuple[str, float]:
     """Call Chat Completions API (/v1/chat/completions); return (content, cost)."""
-    r = client.chat.completions.create(model=model, messages=messages, temperature=temperature)
+    with metrics.provider_call("openai", model):
+        r = client.chat.completions.create(model=model, messages=messages, temperature=temperature)
     content = (r.choices[0].message.content or "").strip()
     in_tokens = r.usage.prompt_tokens if r.usage else 0
     out_tokens = r.usage.completion_tokens if r.usage else 0
@@ -53,11 +59,14 @@ def _chat_completion_chat_api(
     return content, cost
 
 
+@single_flight(shared_result=zero_cost)
 @retry_decorator(max_retries=3, base_delay=1.0, max_delay=60.0)
 def chat_completion(
     messages: List[dict],
     model: Optional[str] = None,
     temperature: float = 0.7,
+    cache_ttl: Optional[float] = None,
+    cache_sample_k: int = 0,
 ) -> tuple[str, float]:
     """Call OpenAI Chat Completions API and return response text plus estimated cost.
 
@@ -69,6 +78,10 @@ def chat_completion(
         messages: List of message dicts with "role" and "content" (OpenAI format).
         model: Model name (e.g. "gpt-4.1"). If None or empty, uses default/fallback chain.
         temperature: Sampling temperature in [0, 2]. Default 0.7.
+        cache_ttl: Opt-in response cache. If set, a cached response for the same
+            (model, messages, temperature) younger than cache_ttl seconds is returned at zero cost.
+        cache_sample_k: With cache_ttl, keep up to K responses per prompt and return a random
+            one once K fresh responses exist (keeps repeated prompts diverse). 0 = newest only.
 
     Returns:
         Tuple of (response_content, estimated_cost_usd). content is stripped text.
@@ -81,11 +94,20 @@ def chat_completion(
     fallbacks = _fallback_chat_models()
     # Try preferred first, then each fallback (skip if already preferred)
     to_try = [preferred] + [m for m in fallbacks if m != preferred]
+    cache = get_response_cache() if cache_ttl else None
+    key = make_key(preferred, messages, temperature) if cache else ""
+    if cache:
+        cached = cache.get(key, ttl=cache_ttl, sample_k=cache_sample_k)
+        if cached is not None:
+            return cached, 0.0
     client = _client()
     last_err = None
     for m in to_try:
         try:
-            return _chat_completion_chat_api(client, messages, m, temperature)
+            content, cost = _chat_completion_chat_api(client, messages, m, temperature)
+            if cache and content:
+                cache.put(key, content, sample_k=cache_sample_k)
+            return content, cost
         except Exception as e:
             last_err = e
             if _is_model_access_error(e):
@@ -109,13 +131,16 @@ def _fallback_embedding_models() -> List[str]:
     return ["text-embedding-ada-002"]
 
 
+@single_flight(shared_result=zero_cost)
 @retry_decorator(max_retries=3, base_delay=1.0, max_delay=60.0)
 def get_embeddings(texts: List[str], model: Optional[str] = None) -> tuple[List[List[float]], float]:
     """Compute embeddings for a list of texts and return vectors plus estimated cost.
 
     Uses the default embedding model (or OPENAI_EMBEDDING_MODEL); on 403/model access
     errors, tries fallback models (OPENAI_FALLBACK_EMBEDDING_MODEL or built-in list).
-    Retries on transient errors (up to 3 attempts with backoff).
+    Retries on transient errors (up to 3 attempts with backoff). Vectors are served from
+    the local embedding cache when present; only misses are sent to the API
+    (set EMBEDDING_CACHE=0 to disable).
 
     Args:
         texts: List of strings to embed. Order of returned vectors matches order of texts.
@@ -124,7 +149,7 @@ def get_embeddings(texts: List[str], model: Optional[str] = None) -> tuple[List[
 
     Returns:
         Tuple of (list of embedding vectors, estimated_cost_usd). Each vector is a
-        list of floats; length depends on the model.
+        list of floats; length depends on the model. Cost covers cache misses only.
 
     Raises:
         Exception: Re-raised from OpenAI client on non–model-access errors after retries.
@@ -133,15 +158,25 @@ def get_embeddings(texts: List[str], model: Optional[str] = None) -> tuple[List[
     preferred = (model or "").strip() or _default_embedding_model()
     fallbacks = _fallback_embedding_models()
     to_try = [preferred] + [m for m in fallbacks if m != preferred]
-    client = _client()
+    cache = get_embedding_cache() if cache_enabled() else None
+    client = None
     last_err = None
     for emb_model in to_try:
+        # All vectors in one result come from the same model; look up the cache per model tried.
+        vectors = cache.get_many(emb_model, texts) if cache else [None] * len(texts)
+        misses = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if not misses:
+            return vectors, 0.0
         try:
-            r = client.embeddings.create(input=texts, model=emb_model)
-            vectors = [e.embedding for e in r.data]
-            total_tokens = r.usage.total_tokens if r.usage else (sum(len(t.split()) * 4 for t in texts))
+            client = client or _client()
+            with metrics.provider_call("openai", emb_model):
+                r = client.embeddings.create(input=misses, model=emb_model)
+            fetched = dict(zip(misses, (e.embedding for e in r.data)))
+            total_tokens = r.usage.total_tokens if r.usage else (sum(len(t.split()) * 4 for t in misses))
             cost = total_tokens * 0.00000002  # ~$0.02/1M
-            return vectors, cost
+            if cache:
+                cache.put_many(emb_model, list(fetched), list(fetched.values()))
+            return [v if v is not None else fetched[t] for t, v in zip(texts, vectors)], cost
         except Exception as e:
             last_err = e
             if _is_model_access_error(e):
@@ -150,3 +185,13 @@ def get_embeddings(texts: List[str], model: Optional[str] = None) -> tuple[List[
     if last_err is not None:
         raise last_err
     raise RuntimeError("No embedding model available")
+
+
+async def get_embeddings_async(texts: List[str], model: Optional[str] = None) -> tuple[List[List[float]], float]:
+    """Async :func:`get_embeddings` through this event loop's embedding batcher: texts from concurrent
+    callers (e.g. several executions) within the batch window share one ``embeddings.create`` call.
+    Returns (vectors in input order, this caller's share of the batch cost)."""
+    from src.services.embedding_batcher import get_embedding_batcher
+    if not texts:
+        return [], 0.0
+    return await get_embedding_batcher().embed_many(texts, model)
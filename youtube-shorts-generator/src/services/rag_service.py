@@ -1,47 +1,197 @@
 """
 RAG: ChromaDB (local), topic research, embeddings storage, similarity search.
+
+The Chroma client and collection handles are opened once per process (per store path) and reused;
+opening a PersistentClient reloads the on-disk indexes, so it must not happen per call.
+Store path: CHROMA_DB_PATH env, else ``paths.chroma_db`` in config.yaml, else ``chroma_db/`` in project root.
 """
-from typing import List, Optional, Tuple
+import asyncio
 import os
+import threading
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+DEFAULT_CHROMA_DIR = "chroma_db"
+DEFAULT_COLLECTION = "topics"
+# Used when the client does not report its own limit
+FALLBACK_MAX_BATCH = 5000
+
+SearchResult = List[Tuple[str, float, Optional[dict]]]
+
+_lock = threading.Lock()
+_clients: dict[str, Any] = {}
+_collections: dict[tuple[str, str], Any] = {}
+_default_path: Optional[Path] = None
+
 
-def _chroma_client():
+def chroma_path() -> Path:
+    """Resolved Chroma store directory (absolute; relative config values are under project root).
+
+    Resolved once per process; :func:`reset_clients` forgets it.
+    """
+    global _default_path
+    if _default_path is None:
+        from src.utils.config import get_settings, project_root
+        custom = (os.getenv("CHROMA_DB_PATH") or "").strip()
+        if custom:
+            p = Path(custom)
+            _default_path = p if p.is_absolute() else project_root() / p
+        else:
+            _default_path = get_settings().chroma_db
+    return _default_path
+
+
+def _new_client(path: Path):
     import chromadb
     from chromadb.config import Settings
-    return chromadb.PersistentClient(path="./chroma_db", settings=Settings(anonymized_telemetry=False))
+    return chromadb.PersistentClient(path=str(path), settings=Settings(anonymized_telemetry=False))
+
+
+def _chroma_client(path: Optional[Path] = None):
+    """Process-wide PersistentClient for path (default :func:`chroma_path`)."""
+    key = str(path or chroma_path())
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _new_client(Path(key))
+    return client
 
 
-def get_or_create_collection(name: str = "topics"):
-    """Get or create a Chroma collection for topics/embeddings."""
-    client = _chroma_client()
-    return client.get_or_create_collection(name=name, metadata={"description": "Topic embeddings"})
+def get_or_create_collection(name: str = DEFAULT_COLLECTION, path: Optional[Path] = None):
+    """Get or create a Chroma collection for topics/embeddings (handle cached per store and name)."""
+    store = str(path or chroma_path())
+    coll = _collections.get((store, name))
+    if coll is None:
+        client = _chroma_client(Path(store))
+        with _lock:
+            coll = _collections.get((store, name))
+            if coll is None:
+                coll = _collections[(store, name)] = client.get_or_create_collection(
+                    name=name, metadata={"description": "Topic embeddings"}
+                )
+    return coll
 
 
-def add_embeddings(ids: List[str], embeddings: List[List[float]], metadatas: Optional[List[dict]] = None) -> None:
-    """Store embeddings in Chroma."""
-    coll = get_or_create_collection()
-    coll.add(ids=ids, embeddings=embeddings, metadatas=metadatas or [])
+def reset_clients() -> None:
+    """Forget cached clients, collections and the resolved store path (tests, path changes)."""
+    global _default_path
+    with _lock:
+        _default_path = None
+        _collections.clear()
+        _clients.clear()
+
+
+def _max_batch(client: Any) -> int:
+    try:
+        size = client.get_max_batch_size()
+        return int(size) if size else FALLBACK_MAX_BATCH
+    except Exception:
+        return FALLBACK_MAX_BATCH
+
+
+def add_embeddings(
+    ids: List[str],
+    embeddings: List[List[float]],
+    metadatas: Optional[List[dict]] = None,
+    collection_name: str = DEFAULT_COLLECTION,
+) -> None:
+    """Store many embeddings in Chroma, chunked to the client's max batch size."""
+    if not ids:
+        return
+    coll = get_or_create_collection(collection_name)
+    step = _max_batch(_chroma_client())
+    for start in range(0, len(ids), step):
+        end = start + step
+        coll.add(
+            ids=ids[start:end],
+            embeddings=embeddings[start:end],
+            metadatas=metadatas[start:end] if metadatas else None,
+        )
+
+
+def similarity_search_many(
+    query_embeddings: List[List[float]],
+    n_results: int = 5,
+    collection_name: str = DEFAULT_COLLECTION,
+) -> List[SearchResult]:
+    """One Chroma query for many vectors. Returns, per query, a list of (id, distance, metadata)."""
+    if not query_embeddings:
+        return []
+    coll = get_or_create_collection(collection_name)
+    r = coll.query(query_embeddings=query_embeddings, n_results=n_results, include=["metadatas", "distances"])
+    all_ids = r.get("ids") or []
+    all_dists = r.get("distances") or []
+    all_metas = r.get("metadatas") or []
+    out: List[SearchResult] = []
+    for i in range(len(query_embeddings)):
+        ids = all_ids[i] if i < len(all_ids) else []
+        dists = all_dists[i] if i < len(all_dists) else []
+        metas = all_metas[i] if i < len(all_metas) and all_metas[i] is not None else [None] * len(ids)
+        out.append(list(zip(ids, dists, metas)))
+    return out
 
 
 def similarity_search(
     query_embedding: List[float],
     n_results: int = 5,
-    collection_name: str = "topics",
-) -> List[Tuple[str, float, Optional[dict]]]:
+    collection_name: str = DEFAULT_COLLECTION,
+) -> SearchResult:
     """Return list of (id, distance, metadata). Lower distance = more similar."""
-    client = _chroma_client()
-    coll = client.get_or_create_collection(name=collection_name)
-    r = coll.query(query_embeddings=[query_embedding], n_results=n_results, include=["metadatas"])
-    ids = r["ids"][0] if r["ids"] else []
-    dists = r["distances"][0] if r.get("distances") else []
-    metas = (r.get("metadatas") or [[]])[0] if r.get("metadatas") else []
-    return list(zip(ids, dists, metas))
+    return similarity_search_many([query_embedding], n_results=n_results, collection_name=collection_name)[0]
+
+
+def _as_topics(results: SearchResult) -> List[dict]:
+    return [{"id": rid, "distance": d, "metadata": m} for rid, d, m in results]
+
+
+def query_topics_many(query_texts: List[str], n: int = 5) -> List[List[dict]]:
+    """Topic ideas for several queries: one embeddings call and one Chroma query for all of them."""
+    from src.services.openai_service import get_embeddings
+    if not query_texts:
+        return []
+    embs, _ = get_embeddings(query_texts)
+    if not embs:
+        return [[] for _ in query_texts]
+    return [_as_topics(r) for r in similarity_search_many(embs, n_results=n)]
 
 
 def query_topics(query_text: str, n: int = 5) -> List[dict]:
     """Get topic ideas similar to query. Uses OpenAI embeddings + Chroma. Returns list of {id, score, metadata}."""
-    from src.services.openai_service import get_embeddings
-    emb, _ = get_embeddings([query_text])
-    if not emb:
+    return query_topics_many([query_text], n=n)[0]
+
+
+# --- Async wrappers (Chroma calls run in a worker thread; embeddings go through the batcher) ---
+
+async def add_embeddings_async(
+    ids: List[str],
+    embeddings: List[List[float]],
+    metadatas: Optional[List[dict]] = None,
+    collection_name: str = DEFAULT_COLLECTION,
+) -> None:
+    await asyncio.to_thread(add_embeddings, ids, embeddings, metadatas, collection_name)
+
+
+async def similarity_search_async(
+    query_embedding: List[float],
+    n_results: int = 5,
+    collection_name: str = DEFAULT_COLLECTION,
+) -> SearchResult:
+    return await asyncio.to_thread(similarity_search, query_embedding, n_results, collection_name)
+
+
+async def query_topics_many_async(query_texts: List[str], n: int = 5) -> List[List[dict]]:
+    """Async :func:`query_topics_many`; embeddings go through the batcher, so concurrent callers
+    share embedding requests, and the Chroma query runs in a worker thread."""
+    from src.services.openai_service import get_embeddings_async
+    if not query_texts:
         return []
-    results = similarity_search(emb[0], n_results=n)
-    return [{"id": rid, "distance": d, "metadata": m} for rid, d, m in results]
+    embs, _ = await get_embeddings_async(query_texts)
+    results = await asyncio.to_thread(similarity_search_many, embs, n, DEFAULT_COLLECTION)
+    return [_as_topics(r) for r in results]
+
+
+async def query_topics_async(query_text: str, n: int = 5) -> List[dict]:
+    """Async :func:`query_topics`; concurrent callers share embedding requests via the batcher."""
+    return (await query_topics_many_async([query_text], n=n))[0]
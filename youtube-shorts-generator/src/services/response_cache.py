@@ -0,0 +1,142 @@
+"""
+Opt-in local cache for chat completion responses, keyed by a hash of (model, messages, temperature).
+
+Entries are stored in SQLite with their creation time; freshness is decided per lookup (caller TTL).
+With ``sample_k`` > 0 up to K responses are kept per key and a random fresh one is returned once K exist,
+so repeated prompts keep some diversity. Total size is bounded by evicting the oldest rows.
+"""
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+DEFAULT_CACHE_NAME = "response_cache.db"
+DEFAULT_MAX_ENTRIES = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS response_cache (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cache_key TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_response_cache_key ON response_cache(cache_key, created_at);
+"""
+
+
+def make_key(model: str, messages: List[dict], temperature: float) -> str:
+    """Stable sha256 over model, messages and temperature."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response store with TTL-on-read and size-bounded eviction. Thread-safe."""
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if path is None:
+            from src.utils.config import project_root
+            path = project_root() / DEFAULT_CACHE_NAME
+        self.path = Path(path)
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, ttl: float, sample_k: int = 0, now: Optional[float] = None) -> Optional[str]:
+        """Return a fresh cached response or None.
+
+        sample_k <= 1: newest fresh entry. sample_k > 1: a random fresh entry, but only once
+        sample_k fresh entries exist (until then None, so the caller fetches and stores another).
+        """
+        now = time.time() if now is None else now
+        want = max(1, sample_k)
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT content FROM response_cache WHERE cache_key = ? AND created_at >= ? "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                (key, now - ttl, want),
+            ).fetchall()
+        if len(rows) < want:
+            return None
+        return rows[0][0] if want == 1 else random.choice(rows)[0]
+
+    def put(self, key: str, content: str, sample_k: int = 0, now: Optional[float] = None) -> None:
+        """Store a response; keep at most max(1, sample_k) per key and max_entries overall."""
+        now = time.time() if now is None else now
+        keep = max(1, sample_k)
+        with self._lock:
+            conn = self._db()
+            conn.execute(
+                "INSERT INTO response_cache (cache_key, content, created_at) VALUES (?, ?, ?)",
+                (key, content, now),
+            )
+            conn.execute(
+                "DELETE FROM response_cache WHERE cache_key = ? AND id NOT IN "
+                "(SELECT id FROM response_cache WHERE cache_key = ? ORDER BY created_at DESC, id DESC LIMIT ?)",
+                (key, key, keep),
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM response_cache WHERE id IN "
+                    "(SELECT id FROM response_cache ORDER BY created_at ASC, id ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._db()
+            conn.execute("DELETE FROM response_cache")
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache. OPENAI_RESPONSE_CACHE_PATH / OPENAI_RESPONSE_CACHE_MAX_ENTRIES override defaults."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                custom = (os.getenv("OPENAI_RESPONSE_CACHE_PATH") or "").strip()
+                max_entries = int((os.getenv("OPENAI_RESPONSE_CACHE_MAX_ENTRIES") or "").strip() or DEFAULT_MAX_ENTRIES)
+                _cache = ResponseCache(Path(custom) if custom else None, max_entries=max_entries)
+    return _cache
+
+
+def reset_response_cache() -> None:
+    """Close and forget the process-wide cache (tests, config changes)."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
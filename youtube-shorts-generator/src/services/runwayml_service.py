@@ -6,10 +6,10 @@ import os
 from pathlib import Path
 from typing import Optional
 
-import requests
-
-from runwayml import RunwayML, TaskFailedError, TaskTimeoutError
+from src.utils import metrics
+from src.utils.singleflight import single_flight, zero_cost
 
+RUNWAY_MODEL = "gen4.5"
 COST_PER_SEC = 0.05
 DEFAULT_WAIT_TIMEOUT_SEC = 600
 
@@ -22,6 +22,7 @@ def _get_api_key() -> str:
     return key
 
 
+@single_flight(shared_result=zero_cost)
 def generate_video(
     prompt: str,
     output_path: Optional[Path] = None,
@@ -33,41 +34,46 @@ def generate_video(
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
+    import requests
+    from runwayml import RunwayML, TaskFailedError, TaskTimeoutError
+
     api_key = _get_api_key()
     duration_int = max(2, min(10, int(round(duration_sec))))
     prompt_text = (prompt or "scene").strip()[:1000]
 
     client = RunwayML(api_key=api_key)
 
-    # Text-to-video: use text_to_video.create (SDK exposes this endpoint). Vertical Shorts: 720:1280.
-    created = client.text_to_video.create(
-        model="gen4.5",
-        prompt_text=prompt_text,
-        ratio="720:1280",
-        duration=duration_int,
-    )
+    # Timed as one request: create, wait for the task, download the result
+    with metrics.provider_call("runwayml", RUNWAY_MODEL):
+        # Text-to-video: use text_to_video.create (SDK exposes this endpoint). Vertical Shorts: 720:1280.
+        created = client.text_to_video.create(
+            model=RUNWAY_MODEL,
+            prompt_text=prompt_text,
+            ratio="720:1280",
+            duration=duration_int,
+        )
 
-    try:
-        task = created.wait_for_task_output(timeout=DEFAULT_WAIT_TIMEOUT_SEC)
-    except TaskFailedError as e:
-        details = e.task_details
-        failure_msg = getattr(details, "failure", None) or "Task failed"
-        failure_code = getattr(details, "failure_code", None) or getattr(details, "failureCode", None)
-        msg = f"Runway task failed: {failure_msg}"
-        if failure_code:
-            msg += f" (code: {failure_code})"
-        raise RuntimeError(msg) from e
-    except TaskTimeoutError as e:
-        raise RuntimeError("Runway task timed out waiting for video output") from e
+        try:
+            task = created.wait_for_task_output(timeout=DEFAULT_WAIT_TIMEOUT_SEC)
+        except TaskFailedError as e:
+            details = e.task_details
+            failure_msg = getattr(details, "failure", None) or "Task failed"
+            failure_code = getattr(details, "failure_code", None) or getattr(details, "failureCode", None)
+            msg = f"Runway task failed: {failure_msg}"
+            if failure_code:
+                msg += f" (code: {failure_code})"
+            raise RuntimeError(msg) from e
+        except TaskTimeoutError as e:
+            raise RuntimeError("Runway task timed out waiting for video output") from e
 
-    # task.output is List[str] of ephemeral URLs (Succeeded)
-    if not task.output:
-        raise RuntimeError("Runway task succeeded but returned no output URL")
-    video_url = task.output[0]
+        # task.output is List[str] of ephemeral URLs (Succeeded)
+        if not task.output:
+            raise RuntimeError("Runway task succeeded but returned no output URL")
+        video_url = task.output[0]
 
-    down = requests.get(video_url, timeout=120)
-    down.raise_for_status()
-    output_path.write_bytes(down.content)
+        down = requests.get(video_url, timeout=120)
+        down.raise_for_status()
+        output_path.write_bytes(down.content)
 
     cost = duration_int * COST_PER_SEC
     return output_path, cost
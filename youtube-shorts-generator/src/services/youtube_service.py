@@ -44,5 +44,7 @@ def upload_video(
     body = {"snippet": {"title": title, "description": description, "tags": tags or []}, "status": {"privacyStatus": privacy}}
     media = MediaFileUpload(str(file_path), mimetype="video/mp4", resumable=True)
     request = service.videos().insert(part="snippet,status", body=body, media_body=media)
-    response = request.execute()
+    from src.utils import metrics
+    with metrics.provider_call("youtube", "videos.insert"):
+        response = request.execute()
     return response["id"]
@@ -1,6 +1,14 @@
 """
 Configuration management: load .env and config.yaml, validate required keys and settings.
+
+``get_settings()`` returns a cached, validated :class:`Settings` for hot paths (API requests,
+pipeline runs). It re-reads config.yaml only when the file's mtime changes (checked at most every
+CONFIG_RELOAD_CHECK_SEC) or after ``invalidate_settings()`` (e.g. PUT /api/config).
 """
+import logging
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Optional
 
@@ -21,6 +29,12 @@ REQUIRED_ENV_KEYS = [
 # Default config path relative to project root
 DEFAULT_CONFIG_NAME = "config.yaml"
 DEFAULT_ENV_NAME = ".env"
+DEFAULT_DB_NAME = "youtube_shorts.db"
+
+# How often get_settings() may stat config.yaml to detect edits
+CONFIG_RELOAD_CHECK_SEC = 1.0
+
+logger = logging.getLogger(__name__)
 
 
 def _project_root() -> Path:
@@ -31,6 +45,11 @@ def _project_root() -> Path:
     return here.parent if here.name == "src" else Path.cwd()
 
 
+def project_root() -> Path:
+    """Project root for modules resolving default file locations (caches, baselines) against it."""
+    return _project_root()
+
+
 def load_env(env_path: Optional[Path] = None) -> None:
     """Load .env from path or project root. Idempotent."""
     root = _project_root()
@@ -39,13 +58,19 @@ def load_env(env_path: Optional[Path] = None) -> None:
         load_dotenv(path)
 
 
-def load_config(config_path: Optional[Path] = None) -> dict[str, Any]:
-    """Load config.yaml; return dict. Uses config.example.yaml if config.yaml missing."""
+def _config_file(config_path: Optional[Path] = None) -> Path:
+    """config_path, else config.yaml in project root, else config.example.yaml if that exists."""
     root = _project_root()
     path = config_path or root / DEFAULT_CONFIG_NAME
     if not path.exists():
         fallback = root / "config.example.yaml"
         path = fallback if fallback.exists() else path
+    return path
+
+
+def load_config(config_path: Optional[Path] = None) -> dict[str, Any]:
+    """Load config.yaml; return dict. Uses config.example.yaml if config.yaml missing."""
+    path = _config_file(config_path)
     if not path.exists():
         return {}
     with open(path) as f:
@@ -94,3 +119,83 @@ def get_config(
         errors.extend([f"Missing or empty env: {k}" for k in missing_env])
     errors.extend(validate_config(config))
     return config, errors
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Validated config snapshot. ``data`` is the raw mapping (treat as read-only); paths are absolute."""
+    data: dict[str, Any]
+    errors: tuple[str, ...]
+    source: Optional[Path]
+    database_path: Path
+    output_dir: Path
+    temp_dir: Path
+    chroma_db: Path
+    traces_dir: Path
+    logs_dir: Path
+
+    def section(self, name: str) -> dict[str, Any]:
+        """A top-level config section, or {} if missing."""
+        return self.data.get(name) or {}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], source: Optional[Path] = None) -> "Settings":
+        root = _project_root()
+        paths = data.get("paths") or {}
+
+        def resolve(key: str, default: str) -> Path:
+            p = Path(paths.get(key) or default)
+            return p if p.is_absolute() else root / p
+
+        return cls(
+            data=data,
+            errors=tuple(validate_config(data)),
+            source=source,
+            database_path=resolve("database", DEFAULT_DB_NAME),
+            output_dir=resolve("output_dir", "output_videos"),
+            temp_dir=resolve("temp_dir", "tmp"),
+            chroma_db=resolve("chroma_db", "chroma_db"),
+            traces_dir=resolve("traces_dir", "traces"),
+            logs_dir=resolve("logs_dir", "logs"),
+        )
+
+
+_settings: Optional[Settings] = None
+_settings_stamp: Optional[tuple] = None
+_settings_checked = 0.0
+_settings_lock = threading.Lock()
+
+
+def _stamp(path: Path) -> tuple:
+    try:
+        return (str(path), path.stat().st_mtime_ns)
+    except OSError:
+        return (str(path), None)
+
+
+def get_settings() -> Settings:
+    """Cached Settings; reloaded when config.yaml changes (mtime, checked at most every
+    CONFIG_RELOAD_CHECK_SEC) or after invalidate_settings()."""
+    global _settings, _settings_stamp, _settings_checked
+    now = time.monotonic()
+    current = _settings
+    if current is not None and now - _settings_checked < CONFIG_RELOAD_CHECK_SEC:
+        return current
+    with _settings_lock:
+        path = _config_file()
+        stamp = _stamp(path)
+        if _settings is None or stamp != _settings_stamp:
+            settings = Settings.from_dict(load_config(path), source=path if path.exists() else None)
+            for err in settings.errors:
+                logger.warning("Config %s: %s", path, err)
+            _settings, _settings_stamp = settings, stamp
+        _settings_checked = now
+        return _settings
+
+
+def invalidate_settings() -> None:
+    """Drop the cached Settings; the next get_settings() re-reads config.yaml."""
+    global _settings, _settings_stamp
+    with _settings_lock:
+        _settings = None
+        _settings_stamp = None
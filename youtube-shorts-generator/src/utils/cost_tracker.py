@@ -1,5 +1,6 @@
 """
 Cost tracking: log API costs to database and optional in-memory tally.
+Cost rows go through the write-behind buffer (src/database/write_buffer.py).
 """
 from pathlib import Path
 from typing import Optional
@@ -10,16 +11,47 @@ def _repo():
     return repository
 
 
+def _write_buffer():
+    from src.database import write_buffer
+    return write_buffer
+
+
 def log_cost(
     execution_id: int,
     component: str,
     cost: float,
     db_path: Optional[Path] = None,
 ) -> None:
-    """Log a single cost entry to the costs table."""
-    _repo().insert_cost(execution_id=execution_id, component=component, cost=cost, db_path=db_path)
+    """Log a single cost entry to the costs table (batched; visible to get_execution_cost_total at once)."""
+    _write_buffer().log_cost(execution_id, component, cost, db_path=db_path)
+    from src.utils import metrics
+    metrics.COST_USD.inc(cost, component=component)
 
 
 def get_execution_cost_total(execution_id: int, db_path: Optional[Path] = None) -> float:
     """Sum costs for an execution from the database."""
     return _repo().get_execution_cost_total(execution_id=execution_id, db_path=db_path)
+
+
+def monthly_budget_status(
+    month: Optional[str] = None,
+    db_path: Optional[Path] = None,
+    config: Optional[dict] = None,
+) -> dict:
+    """Spend for month (``YYYY-MM``, default current UTC month) against ``cost.monthly_alert``.
+
+    Reads daily rollups, so the cost is O(days in month) regardless of history size.
+    """
+    import datetime
+    if config is None:
+        from src.utils.config import get_settings
+        config = get_settings().data
+    month = month or datetime.datetime.utcnow().strftime("%Y-%m")
+    spent = _repo().get_month_cost(month, db_path=db_path)
+    limit = (config.get("cost") or {}).get("monthly_alert")
+    return {
+        "month": month,
+        "spent": round(spent, 6),
+        "monthly_alert": limit,
+        "exceeded": limit is not None and spent >= float(limit),
+    }
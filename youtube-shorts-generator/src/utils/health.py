@@ -1,19 +1,30 @@
 """
 MVP health checks: API keys, disk, system resources, DB, API connectivity, YouTube OAuth.
 Returns a structure suitable for JSON output with pass/fail and optional details per check.
+
+Checks run concurrently, each in its own daemon thread, under one deadline (HEALTH_CHECK_TIMEOUT_SEC,
+default 5): a provider that hangs fails its check with a timeout instead of holding up the report
+(or process exit). A check whose previous run is still in flight is not started again: it reports
+that run's last result marked ``stale``, so hung checks never pile up threads. ``cached_checks`` serves the last report for HEALTH_CACHE_TTL_SEC (default 30);
+concurrent callers of an expired cache share one run.
 """
 import os
 import shutil
 import sqlite3
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Optional
 
 # Minimum required (MVP spec)
 MIN_DISK_GB = 10
 MIN_RAM_GB = 8
 MIN_CPU_CORES = 2
 
+DEFAULT_CHECK_TIMEOUT_SEC = 5.0
+DEFAULT_CACHE_TTL_SEC = 30.0
+
 
 def _project_root() -> Path:
     here = Path(__file__).resolve().parent
@@ -162,30 +173,139 @@ def check_youtube_channel_access(root: Path) -> dict[str, Any]:
         return {"pass": False, "detail": {"error": str(e)}}
 
 
-def run_all_checks(root: Path | None = None) -> dict[str, Any]:
+# Checks that decide "ok"; the rest (provider connectivity, YouTube) are reported only
+REQUIRED_CHECKS = ("api_keys", "disk_space", "system_resources", "database")
+
+CHECKS: dict[str, Callable[[Path], dict[str, Any]]] = {
+    "disk_space": check_disk_space,
+    "system_resources": check_system_resources,
+    "database": check_database,
+    "openai": check_openai_connectivity,
+    "elevenlabs": check_elevenlabs_connectivity,
+    "runwayml": check_runwayml,
+    "youtube_channel": check_youtube_channel_access,
+}
+
+
+def _timed(fn: Callable[[Path], dict[str, Any]], root: Path) -> dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        result = fn(root)
+    except Exception as e:
+        result = {"pass": False, "detail": {"error": str(e)}}
+    return {**result, "duration_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+# Per check name: the thread of its run still in flight, and the result of its last finished run
+_inflight: dict[str, threading.Thread] = {}
+_last_results: dict[str, dict[str, Any]] = {}
+_inflight_lock = threading.Lock()
+
+
+def _run_check(name: str, fn: Callable[[Path], dict[str, Any]], root: Path, results: dict[str, dict[str, Any]]) -> None:
+    result = _timed(fn, root)
+    results[name] = result
+    with _inflight_lock:
+        _last_results[name] = result
+        if _inflight.get(name) is threading.current_thread():
+            del _inflight[name]
+
+
+def _still_running(name: str, timeout: float) -> dict[str, Any]:
+    last = _last_results.get(name)
+    if last is not None:
+        return {**last, "stale": True}
+    return {
+        "pass": False,
+        "detail": {"error": "previous run still in progress", "timeout_sec": timeout},
+        "duration_ms": 0.0,
+        "stale": True,
+    }
+
+
+def _run_concurrently(
+    checks: dict[str, Callable[[Path], dict[str, Any]]], root: Path, timeout: float
+) -> dict[str, dict[str, Any]]:
+    results: dict[str, dict[str, Any]] = {}
+    threads = []
+    out = {}
+    with _inflight_lock:
+        for name, fn in checks.items():
+            previous = _inflight.get(name)
+            if previous is not None and previous.is_alive():
+                out[name] = _still_running(name, timeout)
+                continue
+            # Daemon threads: a check stuck in a network call is abandoned, never joined at exit
+            t = threading.Thread(target=_run_check, args=(name, fn, root, results), name=f"health-{name}", daemon=True)
+            _inflight[name] = t
+            t.start()
+            threads.append((name, t))
+    deadline = time.monotonic() + timeout
+    for name, t in threads:
+        t.join(max(0.0, deadline - time.monotonic()))
+    for name, _ in threads:
+        out[name] = results.get(name) or {
+            "pass": False,
+            "detail": {"error": f"timed out after {timeout:g}s", "timeout_sec": timeout},
+            "duration_ms": round(timeout * 1000, 1),
+        }
+    return {name: out[name] for name in checks}
+
+
+def run_all_checks(root: Path | None = None, timeout: Optional[float] = None) -> dict[str, Any]:
     """
-    Run all MVP health checks. Returns dict with "checks" (per-check pass/fail + detail)
+    Run all MVP health checks. Returns dict with "checks" (per-check pass/fail + detail + duration_ms)
     and "ok" (overall: True only if api_keys, disk_space, system_resources, database pass).
     API connectivity and YouTube are reported but do not force ok=False (so pre-config runs still report ok for infra).
     """
     root = root or _project_root()
+    if timeout is None:
+        timeout = float(os.getenv("HEALTH_CHECK_TIMEOUT_SEC") or DEFAULT_CHECK_TIMEOUT_SEC)
+    start = time.perf_counter()
     checks: dict[str, dict[str, Any]] = {}
-    checks["api_keys"] = check_api_keys(root)
-    checks["disk_space"] = check_disk_space(root)
-    checks["system_resources"] = check_system_resources(root)
-    checks["database"] = check_database(root)
-    checks["openai"] = check_openai_connectivity(root)
-    checks["elevenlabs"] = check_elevenlabs_connectivity(root)
-    checks["runwayml"] = check_runwayml(root)
-    checks["youtube_channel"] = check_youtube_channel_access(root)
-
-    required_ok = (
-        checks["api_keys"]["pass"]
-        and checks["disk_space"]["pass"]
-        and checks["system_resources"]["pass"]
-        and checks["database"]["pass"]
-    )
+    # First and alone: it loads .env, which the connectivity checks read
+    checks["api_keys"] = _timed(check_api_keys, root)
+    checks.update(_run_concurrently(CHECKS, root, timeout))
     return {
-        "ok": required_ok,
+        "ok": all(checks[name]["pass"] for name in REQUIRED_CHECKS),
         "checks": checks,
+        "checked_at": time.time(),
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
     }
+
+
+_cache: dict[str, dict[str, Any]] = {}
+_cache_lock = threading.Lock()
+_flight: Any = None
+
+
+def _single_flight() -> Any:
+    # Imported on first use: the CLI runs checks directly and should not pay for asyncio
+    global _flight
+    with _cache_lock:
+        if _flight is None:
+            from src.utils.singleflight import SingleFlight
+            _flight = SingleFlight()
+        return _flight
+
+
+def cached_checks(
+    root: Path | None = None,
+    fresh: bool = False,
+    ttl: Optional[float] = None,
+) -> dict[str, Any]:
+    """run_all_checks result reused for ttl seconds (fresh=True re-runs). Adds "cached" and "age_sec".
+    Blocking: call from a worker thread in async code."""
+    root = root or _project_root()
+    if ttl is None:
+        ttl = float(os.getenv("HEALTH_CACHE_TTL_SEC") or DEFAULT_CACHE_TTL_SEC)
+    key = str(root)
+    with _cache_lock:
+        report = _cache.get(key)
+    cached = True
+    if fresh or report is None or time.time() - report["checked_at"] >= ttl:
+        report, leader = _single_flight().call(key, run_all_checks, (root,), {})
+        cached = not leader
+        with _cache_lock:
+            _cache[key] = report
+    return {**report, "cached": cached, "age_sec": round(time.time() - report["checked_at"], 1)}
@@ -1,41 +1,210 @@
 """
 Structured JSON logging for pipeline and agents.
+
+Log calls never do I/O on the calling thread: structlog and stdlib records go to a ``QueueHandler``
+on the root logger, and a ``QueueListener`` thread formats and writes them to the console and a
+rotating JSONL file. Context bound with ``log_context(...)`` (the pipeline binds ``execution_id``
+and ``agent``) and the native thread id are captured when the record is created, so file lines
+can be matched to spans of the execution's trace (``src/utils/tracing.py``: same ``tid``).
+
+Hot paths (retries) log through ``Throttle``: at most one record per key per LOG_THROTTLE_SEC,
+and debug records are sampled at LOG_DEBUG_SAMPLE; the next emitted record carries ``suppressed``.
+
+Settings: LOG_LEVEL (default INFO), LOG_FORMAT (``json`` | ``console``), LOG_FILE (default
+``<paths.logs_dir>/shorts.jsonl``; ``off`` disables), LOG_MAX_BYTES (default 10 MB),
+LOG_BACKUP_COUNT (default 5), LOG_THROTTLE_SEC (default 1), LOG_DEBUG_SAMPLE (default 1.0).
 """
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
-from typing import Any, Optional
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, TextIO
 
 import structlog
 
-# Default: JSON to stdout for local dev; can be overridden
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+DEFAULT_THROTTLE_SEC = 1.0
+LOG_FILE_NAME = "shorts.jsonl"
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records unformatted, with the caller's bound context and thread id attached."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Runs on the calling thread: capture what the listener thread cannot see
+        record.bound = structlog.contextvars.get_contextvars()
+        record.tid = threading.get_native_id()
+        return record
+
+
+def _add_call_context(logger: Any, name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    record = event_dict.get("_record")
+    event_dict.pop("bound", None)  # copied by ExtraAdder for stdlib records; merged below
+    if record is not None:
+        for key, value in getattr(record, "bound", {}).items():
+            event_dict.setdefault(key, value)
+        event_dict.setdefault("tid", getattr(record, "tid", record.thread))
+        event_dict.setdefault("logger", record.name)
+        event_dict.setdefault("level", record.levelname.lower())
+    return event_dict
+
+
+def _formatter(renderer: Any) -> logging.Formatter:
+    pre_chain: List[Any] = [
+        structlog.stdlib.ExtraAdder(),
+        structlog.processors.TimeStamper(fmt="iso", utc=True),
+    ]
+    return structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=pre_chain,
+        processors=[
+            _add_call_context,
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            structlog.processors.UnicodeDecoder(),
+            renderer,
+        ],
+    )
+
+
+def _log_file() -> Optional[Path]:
+    value = (os.getenv("LOG_FILE") or "").strip()
+    if value.lower() in ("off", "0", "false", "none"):
+        return None
+    if value:
+        return Path(value)
+    from src.utils.config import get_settings
+    return get_settings().logs_dir / LOG_FILE_NAME
+
+
 def configure_logging(
-    level: str = "INFO",
-    json_console: bool = True,
+    level: Optional[str] = None,
+    json_console: Optional[bool] = None,
+    log_file: Optional[Path] = None,
+    stream: Optional[TextIO] = None,
 ) -> None:
-    """Configure structlog for JSON output to console."""
-    shared: list = [
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.UnicodeDecoder(),
-    ]
-    if json_console:
-        shared.append(structlog.processors.JSONRenderer())
-    else:
-        shared.append(structlog.dev.ConsoleRenderer())
+    """Install the queue handler on the root logger and start the writer thread (idempotent:
+    a second call replaces the previous sinks). log_file defaults to LOG_FILE; console output goes
+    to stream (default stdout)."""
+    global _listener, _queue_handler
+    level = level or os.getenv("LOG_LEVEL") or "INFO"
+    if json_console is None:
+        json_console = (os.getenv("LOG_FORMAT") or "json").strip().lower() != "console"
+    log_file = log_file or _log_file()
 
     structlog.configure(
-        processors=shared + [structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
+        processors=[
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.StackInfoRenderer(),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(file=sys.stdout),
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
     )
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, level.upper(), logging.INFO),
-    )
+
+    console = logging.StreamHandler(stream or sys.stdout)
+    console.setFormatter(_formatter(structlog.processors.JSONRenderer() if json_console else structlog.dev.ConsoleRenderer()))
+    sinks: List[logging.Handler] = [console]
+    if log_file is not None:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        rotating = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.getenv("LOG_MAX_BYTES") or DEFAULT_MAX_BYTES),
+            backupCount=int(os.getenv("LOG_BACKUP_COUNT") or DEFAULT_BACKUP_COUNT),
+            encoding="utf-8",
+        )
+        rotating.setFormatter(_formatter(structlog.processors.JSONRenderer()))
+        sinks.append(rotating)
+
+    with _lock:
+        _stop_locked()
+        handler = _ContextQueueHandler(queue.SimpleQueue())
+        listener = logging.handlers.QueueListener(handler.queue, *sinks, respect_handler_level=True)
+        listener.start()
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(getattr(logging, level.upper(), logging.INFO))
+        _queue_handler, _listener = handler, listener
+
+
+def _stop_locked() -> None:
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+    if _listener is not None:
+        # Writes out everything already queued, then joins the thread
+        _listener.stop()
+        for sink in _listener.handlers:
+            sink.close()
+    _listener = _queue_handler = None
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread (log calls then go to remaining handlers)."""
+    with _lock:
+        _stop_locked()
+
+
+atexit.register(shutdown_logging)
 
 
 def get_logger(name: Optional[str] = None):  # type: ignore
     """Return a structlog logger bound with optional name."""
     return structlog.get_logger(name)
+
+
+def log_context(**values: Any):
+    """Context manager binding values (e.g. execution_id, agent) to every record logged inside it,
+    including from threads started with asyncio.to_thread and the DB executors."""
+    return structlog.contextvars.bound_contextvars(**values)
+
+
+class Throttle:
+    """Per-key rate limit plus sampling for hot-path logging.
+
+    ``allow(key, level)`` returns None to drop the record, else the number of records dropped for
+    that key since the last one emitted (attach it as ``suppressed``).
+    """
+
+    def __init__(self, interval_sec: Optional[float] = None, debug_sample: Optional[float] = None):
+        self.interval_sec = interval_sec if interval_sec is not None else float(
+            os.getenv("LOG_THROTTLE_SEC") or DEFAULT_THROTTLE_SEC
+        )
+        self.debug_sample = debug_sample if debug_sample is not None else float(os.getenv("LOG_DEBUG_SAMPLE") or 1.0)
+        self._last: Dict[Hashable, float] = {}
+        self._dropped: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key: Hashable, level: int = logging.DEBUG) -> Optional[int]:
+        now = time.monotonic()
+        with self._lock:
+            sampled_out = level <= logging.DEBUG and random.random() >= self.debug_sample
+            if sampled_out or now - self._last.get(key, float("-inf")) < self.interval_sec:
+                self._dropped[key] = self._dropped.get(key, 0) + 1
+                return None
+            self._last[key] = now
+            return self._dropped.pop(key, 0)
+
+    def log(self, logger: logging.Logger, key: Hashable, level: int, msg: str, *args: Any) -> bool:
+        """Log through the throttle if the level is enabled; returns whether it was emitted."""
+        if not logger.isEnabledFor(level):
+            return False
+        suppressed = self.allow(key, level)
+        if suppressed is None:
+            return False
+        logger.log(level, msg, *args, extra={"suppressed": suppressed} if suppressed else None)
+        return True
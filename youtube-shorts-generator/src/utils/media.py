@@ -0,0 +1,113 @@
+"""
+Video renditions for the web preview: a low-bitrate MP4 and a poster JPEG derived from the master.
+
+Renditions are cached in ``.renditions/`` next to the master and named after the master's size and
+mtime, so a re-rendered master (e.g. a rerun replacing ``output_dir/<id>.mp4``) gets fresh renditions
+and the stale ones are removed. Each rendition is produced once: concurrent requests share one ffmpeg run.
+ffmpeg is taken from imageio-ffmpeg (installed with MoviePy), else from PATH.
+"""
+import logging
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.utils import tracing
+from src.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+RENDITION_MASTER = "master"
+RENDITION_PREVIEW = "preview"
+RENDITION_POSTER = "poster"
+RENDITIONS = (RENDITION_MASTER, RENDITION_PREVIEW, RENDITION_POSTER)
+MEDIA_TYPES = {RENDITION_MASTER: "video/mp4", RENDITION_PREVIEW: "video/mp4", RENDITION_POSTER: "image/jpeg"}
+
+PREVIEW_WIDTH = 540  # half of 1080x1920
+FFMPEG_TIMEOUT_SEC = 300
+
+_ARGS: Dict[str, List[str]] = {
+    RENDITION_PREVIEW: [
+        "-vf", f"scale={PREVIEW_WIDTH}:-2", "-c:v", "libx264", "-preset", "veryfast", "-crf", "30",
+        "-c:a", "aac", "-b:a", "64k", "-movflags", "+faststart", "-f", "mp4",
+    ],
+    RENDITION_POSTER: ["-frames:v", "1", "-vf", f"scale={PREVIEW_WIDTH}:-2", "-q:v", "4", "-f", "image2"],
+}
+_SUFFIX = {RENDITION_PREVIEW: ".mp4", RENDITION_POSTER: ".jpg"}
+
+_flight = SingleFlight()
+
+
+def ffmpeg_exe() -> Optional[str]:
+    """Path of an ffmpeg binary, or None."""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return shutil.which("ffmpeg")
+
+
+def file_tag(st: os.stat_result) -> str:
+    """Version tag of a file from its size and mtime (also the HTTP ETag value)."""
+    return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+
+def rendition_path(master: Path, rendition: str, st: Optional[os.stat_result] = None) -> Path:
+    """Cache path of a rendition for the current version of master."""
+    st = st or master.stat()
+    return master.parent / ".renditions" / f"{master.stem}.{file_tag(st)}.{rendition}{_SUFFIX[rendition]}"
+
+
+def _render(master: Path, rendition: str, out: Path) -> Path:
+    exe = ffmpeg_exe()
+    if exe is None:
+        raise RuntimeError("ffmpeg not found")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".part")
+    seek = ["-ss", "0.5"] if rendition == RENDITION_POSTER else []
+    cmd = [exe, "-y", "-loglevel", "error", *seek, "-i", str(master), *_ARGS[rendition], str(tmp)]
+    with tracing.span(f"ffmpeg {rendition}", "subprocess"):
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT_SEC)
+    if proc.returncode != 0 or not tmp.exists() or tmp.stat().st_size == 0:
+        if rendition == RENDITION_POSTER and seek:
+            # Clip shorter than the seek offset: take the first frame
+            cmd = [exe, "-y", "-loglevel", "error", "-i", str(master), *_ARGS[rendition], str(tmp)]
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT_SEC)
+        if proc.returncode != 0 or not tmp.exists() or tmp.stat().st_size == 0:
+            tmp.unlink(missing_ok=True)
+            raise RuntimeError(f"ffmpeg {rendition} failed: {proc.stderr.strip()[-500:]}")
+    os.replace(tmp, out)
+    # Drop renditions of earlier versions of this master
+    for old in out.parent.glob(f"{master.stem}.*.{rendition}{_SUFFIX[rendition]}"):
+        if old != out:
+            old.unlink(missing_ok=True)
+    return out
+
+
+def ensure_rendition(master: Path, rendition: str) -> Optional[Path]:
+    """Path of the requested rendition, rendering it on first use; None if it cannot be produced
+    (missing or empty master, ffmpeg unavailable or failing). Blocking: call from a worker thread."""
+    if rendition not in RENDITIONS:
+        raise ValueError(f"rendition must be one of {', '.join(RENDITIONS)}")
+    try:
+        st = master.stat()
+    except OSError:
+        return None
+    if st.st_size == 0:
+        return None
+    if rendition == RENDITION_MASTER:
+        return master
+    out = rendition_path(master, rendition, st)
+    if out.exists():
+        return out
+    try:
+        return _flight.do(str(out), _render, master, rendition, out)
+    except Exception as e:
+        logger.warning("Could not render %s for %s: %s", rendition, master, e)
+        return None
+
+
+def ensure_renditions(master: Path) -> Dict[str, Optional[Path]]:
+    """Render preview and poster for master (the pipeline calls this for output_dir/<id>.mp4)."""
+    return {r: ensure_rendition(master, r) for r in (RENDITION_PREVIEW, RENDITION_POSTER)}
@@ -0,0 +1,223 @@
+"""
+Process-local metrics rendered in the Prometheus text exposition format (``GET /metrics``).
+
+Counters and histograms keep one value per label combination. An update takes a short,
+per-metric lock around a dict update, so it is cheap enough to run on every provider call.
+Live values such as running/queued executions, queue depth and WebSocket subscribers come
+from collector callbacks that run at scrape time (``register_collector``). Each API worker
+has its own metrics, so scrape every worker (Prometheus adds a per-target ``instance`` label).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+LabelValues = Tuple[str, ...]
+# Collector result: (name, type, help, [(labels, value), ...])
+Sample = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic total per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Cumulative buckets, sum and count per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            row[i] += 1
+            row[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        row = self._values.get(self._key(labels))
+        return int(sum(row[:-1])) if row else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = self._header()
+        for key, row in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += n
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_num(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(row[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_num(cumulative)}")
+        return lines
+
+
+_metrics: List[_Metric] = []
+_collectors: List[Callable[[], Iterable[Sample]]] = []
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    metric = Counter(name, help, labelnames)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    metric = Histogram(name, help, labelnames, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(fn: Callable[[], Iterable[Sample]]) -> None:
+    """Add a scrape-time callback returning gauge samples (see Sample)."""
+    _collectors.append(fn)
+
+
+def _render_samples(samples: Iterable[Sample]) -> List[str]:
+    lines: List[str] = []
+    for name, kind, help, values in samples:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in values:
+            lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_num(value)}")
+    return lines
+
+
+def render(extra: Iterable[Sample] = ()) -> str:
+    """All metrics in Prometheus text format; extra are samples gathered by the caller (e.g. async reads)."""
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collect in list(_collectors):
+        lines.extend(_render_samples(collect()))
+    lines.extend(_render_samples(extra))
+    return "\n".join(lines) + "\n"
+
+
+# --- Application metrics ---
+
+STAGE_SECONDS = histogram(
+    "shorts_pipeline_stage_seconds", "Agent stage duration.", ("agent", "outcome")
+)
+EXECUTIONS_FINISHED = counter(
+    "shorts_executions_finished_total", "Executions that reached a final status.", ("status",)
+)
+PROVIDER_SECONDS = histogram(
+    "shorts_provider_request_seconds", "External provider call latency.", ("service", "model", "outcome")
+)
+PROVIDER_ERRORS = counter(
+    "shorts_provider_errors_total", "Failed external provider calls.", ("service", "model", "error")
+)
+RETRIES = counter(
+    "shorts_retries_total", "Retried calls after a transient error.", ("function", "reason")
+)
+RETRY_WAIT_SECONDS = counter(
+    "shorts_retry_wait_seconds_total", "Time spent backing off before retries (rate limits and transient errors).",
+    ("function", "reason"),
+)
+DB_SECONDS = histogram(
+    "shorts_db_operation_seconds", "SQLite operation latency on the DB threads.", ("operation", "kind"), DB_BUCKETS
+)
+COST_USD = counter("shorts_cost_usd_total", "Logged provider cost.", ("component",))
+HTTP_SECONDS = histogram(
+    "shorts_http_request_seconds", "API request latency.", ("method", "route", "status")
+)
+EMBEDDING_BATCH_SIZE = histogram(
+    "shorts_embedding_batch_size", "Texts per batched embeddings call.", buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+EMBEDDING_BATCH_WAIT_SECONDS = histogram(
+    "shorts_embedding_batch_wait_seconds", "Time a text waited in the embedding batcher before its batch was sent."
+)
+EMBEDDING_BATCH_ERRORS = counter("shorts_embedding_batch_errors_total", "Batched embeddings calls that failed.")
+
+
+@contextmanager
+def provider_call(service: str, model: Optional[str] = None) -> Iterator[None]:
+    """Time one provider request (also a trace span) and count it as an error if the block raises."""
+    from src.utils import tracing
+    start = time.perf_counter()
+    try:
+        with tracing.span(f"{service} {model}" if model else service, "provider"):
+            yield
+    except Exception as e:
+        PROVIDER_SECONDS.observe(time.perf_counter() - start, service=service, model=model or "", outcome="error")
+        PROVIDER_ERRORS.inc(service=service, model=model or "", error=type(e).__name__)
+        raise
+    PROVIDER_SECONDS.observe(time.perf_counter() - start, service=service, model=model or "", outcome="ok")
@@ -10,7 +10,12 @@ from functools import wraps
 from typing import Callable, TypeVar, Optional, Union, List, Type
 import logging
 
+from src.utils import metrics
+from src.utils import tracing
+from src.utils.logging import Throttle
+
 logger = logging.getLogger(__name__)
+_log_throttle = Throttle()
 
 T = TypeVar('T')
 
@@ -88,6 +93,30 @@ def is_transient_error(exception: Exception) -> bool:
     return False
 
 
+def _name(func: Callable) -> str:
+    return getattr(func, "__qualname__", getattr(func, "__name__", "call"))
+
+
+def _record_retry(func: Callable, exception: Exception, delay: float, attempt: int, max_retries: int) -> None:
+    """Count and log a retry and its backoff (rate-limit waits are reported with reason=rate_limit).
+    Logging is throttled per function and reason: a retry storm logs about once a second."""
+    rate_limited = is_rate_limit_error(exception)
+    reason = "rate_limit" if rate_limited else "transient"
+    name = _name(func)
+    metrics.RETRIES.inc(function=name, reason=reason)
+    metrics.RETRY_WAIT_SECONDS.inc(delay, function=name, reason=reason)
+    if rate_limited:
+        _log_throttle.log(
+            logger, (name, reason), logging.INFO,
+            "Rate limit hit in %s, waiting %.2fs before retry %d/%d", name, delay, attempt + 1, max_retries,
+        )
+    else:
+        _log_throttle.log(
+            logger, (name, reason), logging.DEBUG,
+            "Transient error in %s, retrying in %.2fs (attempt %d/%d): %s", name, delay, attempt + 1, max_retries, exception,
+        )
+
+
 def calculate_backoff(
     attempt: int,
     base_delay: float = 1.0,
@@ -154,7 +183,8 @@ async def async_retry(
     
     for attempt in range(max_retries):
         try:
-            return await func(*args, **kwargs)
+            with tracing.span(_name(func), "retry.attempt", attempt=attempt + 1):
+                return await func(*args, **kwargs)
         except Exception as e:
             last_exception = e
             
@@ -179,11 +209,10 @@ async def async_retry(
             # Special handling for rate limits - use longer delay
             if is_rate_limit_error(e):
                 delay = min(delay * 2, max_delay)
-                logger.info(f"Rate limit hit, waiting {delay:.2f}s before retry {attempt + 1}/{max_retries}")
-            else:
-                logger.debug(f"Transient error, retrying in {delay:.2f}s (attempt {attempt + 1}/{max_retries}): {e}")
+            _record_retry(func, e, delay, attempt, max_retries)
             
-            await asyncio.sleep(delay)
+            with tracing.span("backoff", "retry.backoff", function=_name(func), seconds=round(delay, 3)):
+                await asyncio.sleep(delay)
     
     # All retries exhausted
     raise last_exception
@@ -225,7 +254,8 @@ def sync_retry(
     
     for attempt in range(max_retries):
         try:
-            return func(*args, **kwargs)
+            with tracing.span(_name(func), "retry.attempt", attempt=attempt + 1):
+                return func(*args, **kwargs)
         except Exception as e:
             last_exception = e
             
@@ -250,11 +280,10 @@ def sync_retry(
             # Special handling for rate limits - use longer delay
             if is_rate_limit_error(e):
                 delay = min(delay * 2, max_delay)
-                logger.info(f"Rate limit hit, waiting {delay:.2f}s before retry {attempt + 1}/{max_retries}")
-            else:
-                logger.debug(f"Transient error, retrying in {delay:.2f}s (attempt {attempt + 1}/{max_retries}): {e}")
+            _record_retry(func, e, delay, attempt, max_retries)
             
-            time.sleep(delay)
+            with tracing.span("backoff", "retry.backoff", function=_name(func), seconds=round(delay, 3)):
+                time.sleep(delay)
     
     # All retries exhausted
     raise last_exception
@@ -282,13 +311,15 @@ def retry_decorator(
         if asyncio.iscoroutinefunction(func):
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
+                # Retry settings are passed positionally so the wrapped function's own
+                # positional args land in *args instead of colliding with them.
                 return await async_retry(
                     func,
-                    max_retries=max_retries,
-                    base_delay=base_delay,
-                    max_delay=max_delay,
-                    exponential_base=exponential_base,
-                    retry_on=retry_on,
+                    max_retries,
+                    base_delay,
+                    max_delay,
+                    exponential_base,
+                    retry_on,
                     *args,
                     **kwargs
                 )
@@ -296,13 +327,15 @@ def retry_decorator(
         else:
             @wraps(func)
             def sync_wrapper(*args, **kwargs):
+                # Retry settings are passed positionally so the wrapped function's own
+                # positional args land in *args instead of colliding with them.
                 return sync_retry(
                     func,
-                    max_retries=max_retries,
-                    base_delay=base_delay,
-                    max_delay=max_delay,
-                    exponential_base=exponential_base,
-                    retry_on=retry_on,
+                    max_retries,
+                    base_delay,
+                    max_delay,
+                    exponential_base,
+                    retry_on,
                     *args,
                     **kwargs
                 )
@@ -0,0 +1,180 @@
+"""
+Single-flight deduplication: concurrent identical calls share one in-flight execution.
+
+If a call with the same key is already running, later callers wait for its result (or exception)
+instead of issuing their own. Works for sync functions (threads) and async functions (tasks).
+For async callers, cancelling one waiter does not cancel the shared call; it is cancelled only
+when every waiter has gone away.
+"""
+import asyncio
+import inspect
+import json
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
+from typing import Any, Callable, Hashable, Optional
+
+
+@lru_cache(maxsize=256)
+def _signature(func: Callable) -> Optional[inspect.Signature]:
+    try:
+        return inspect.signature(func)
+    except (TypeError, ValueError):  # some builtins have no introspectable signature
+        return None
+
+
+def default_key(func: Callable, args: tuple, kwargs: dict) -> str:
+    """Normalized key: qualified name plus JSON of the bound arguments with defaults applied, so
+    f(x), f(query=x) and f(x, n=<default>) share a key (non-JSON values via str). Calls that do not
+    bind to the signature fall back to raw args and sorted kwargs."""
+    sig = _signature(func)
+    try:
+        if sig is None:
+            raise TypeError("no signature")
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        call: Any = dict(bound.arguments)
+    except TypeError:
+        call = [list(args), kwargs]
+    return json.dumps(
+        [func.__module__, func.__qualname__, call],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+@dataclass
+class _Call:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[BaseException] = None
+    shared: int = 0
+
+
+@dataclass
+class _AsyncCall:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Group of in-flight calls keyed by an arbitrary hashable key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._async_calls: dict[tuple[int, Hashable], _AsyncCall] = {}
+        self.deduplicated = 0
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls) + len(self._async_calls)
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) unless an identical call is in flight; then wait for and share its outcome."""
+        return self.call(key, fn, args, kwargs)[0]
+
+    async def do_async(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Async variant: await fn(*args, **kwargs), sharing one task between identical concurrent callers."""
+        return (await self.call_async(key, fn, args, kwargs))[0]
+
+    def call(self, key: Hashable, fn: Callable, args: tuple, kwargs: dict) -> tuple[Any, bool]:
+        """Like :meth:`do`; returns (result, leader) where leader is False for callers that shared a result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.shared += 1
+                self.deduplicated += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result, True
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def call_async(self, key: Hashable, fn: Callable, args: tuple, kwargs: dict) -> tuple[Any, bool]:
+        """Like :meth:`do_async`; returns (result, leader)."""
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        with self._lock:
+            call = self._async_calls.get(slot)
+            leader = call is None
+            if leader:
+                call = self._async_calls[slot] = _AsyncCall(task=loop.create_task(fn(*args, **kwargs)))
+                call.task.add_done_callback(lambda _t, c=call: self._forget_async(slot, c))
+            else:
+                self.deduplicated += 1
+            call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), leader
+        except asyncio.CancelledError:
+            # Cancel the shared call only if this was the last caller still waiting on it
+            with self._lock:
+                last = call.waiters == 1
+            if last and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            with self._lock:
+                call.waiters -= 1
+
+    def _forget_async(self, slot: tuple[int, Hashable], call: _AsyncCall) -> None:
+        with self._lock:
+            if self._async_calls.get(slot) is call:
+                del self._async_calls[slot]
+
+
+_default_group = SingleFlight()
+
+
+def single_flight(
+    key_fn: Optional[Callable[..., Hashable]] = None,
+    group: Optional[SingleFlight] = None,
+    shared_result: Optional[Callable[[Any], Any]] = None,
+):
+    """Decorator: deduplicate concurrent identical calls (sync or async).
+
+    key_fn(*args, **kwargs) returns the dedup key; default is a JSON normalization of the
+    function name and arguments. shared_result maps the result handed to callers that did not
+    run the call themselves (e.g. zero out a cost so it is only logged once).
+    Place above @retry_decorator so retries run once for all waiters.
+    """
+    flights = group or _default_group
+
+    def decorator(func: Callable) -> Callable:
+        def make_key(args: tuple, kwargs: dict) -> Hashable:
+            return key_fn(*args, **kwargs) if key_fn else default_key(func, args, kwargs)
+
+        def finish(outcome: tuple[Any, bool]) -> Any:
+            result, leader = outcome
+            return result if leader or shared_result is None else shared_result(result)
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return finish(await flights.call_async(make_key(args, kwargs), func, args, kwargs))
+            return async_wrapper
+
+        @wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            return finish(flights.call(make_key(args, kwargs), func, args, kwargs))
+        return sync_wrapper
+    return decorator
+
+
+def zero_cost(result: tuple) -> tuple:
+    """shared_result for services returning (value, cost_usd): only the leader pays."""
+    return (result[0], 0.0)
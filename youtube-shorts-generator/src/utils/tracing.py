@@ -0,0 +1,179 @@
+"""
+Per-execution span tracing exported as Chrome trace-event JSON (open in Perfetto or chrome://tracing).
+
+A sampled execution gets a ``Trace`` bound to a context variable for the duration of the run, so
+spans opened anywhere below it (agents, provider calls, retries and backoff sleeps, DB operations on
+the DB threads, ffmpeg/MoviePy work in worker threads) land in that execution's trace. Context
+variables follow ``await``, ``asyncio.to_thread`` and the async repository's executors.
+
+``span()`` returns a shared no-op object when the current run is not traced, so instrumentation
+costs one context-variable lookup when tracing is off. Finished traces are written to
+``paths.traces_dir`` (default ``traces/``) as ``<execution_id>.json``; the newest TRACE_KEEP
+(default 200) are kept.
+
+Settings: TRACE_SAMPLE_RATE (fraction of executions traced, 0..1, default 0 = off), TRACE_KEEP.
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+DEFAULT_KEEP = 200
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_active: Dict[int, "Trace"] = {}
+
+
+class Trace:
+    """Complete ("X") events of one execution; add() is thread-safe."""
+
+    def __init__(self, execution_id: int):
+        self.execution_id = execution_id
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._events: List[dict] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, cat: str, start: float, end: float, args: Dict[str, Any]) -> None:
+        """Record a span from perf_counter start/end on the calling thread."""
+        tid = threading.get_native_id()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self._t0) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+            if tid not in self._threads:
+                self._threads[tid] = threading.current_thread().name
+
+    def to_chrome(self) -> dict:
+        """Trace-event JSON object (thread names first, then spans by start time)."""
+        with self._lock:
+            events = sorted(self._events, key=lambda e: e["ts"])
+            threads = dict(self._threads)
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        return {
+            "traceEvents": meta + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"execution_id": self.execution_id, "started_at": self.started_at},
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "name", "cat", "args", "start")
+
+    def __init__(self, trace: Trace, name: str, cat: str, args: Dict[str, Any]):
+        self.trace, self.name, self.cat, self.args = trace, name, cat, args
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.trace.add(self.name, self.cat, self.start, time.perf_counter(), self.args)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, cat: str = "function", **args: Any):
+    """Context manager timing a block in the current execution's trace (no-op if untraced)."""
+    trace = _current.get()
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name, cat, args)
+
+
+def current() -> Optional[Trace]:
+    return _current.get()
+
+
+def sample_rate() -> float:
+    try:
+        return min(1.0, max(0.0, float(os.getenv("TRACE_SAMPLE_RATE") or 0)))
+    except ValueError:
+        return 0.0
+
+
+def _traces_dir() -> Path:
+    from src.utils.config import get_settings
+    return get_settings().traces_dir
+
+
+def trace_path(execution_id: int, directory: Optional[Path] = None) -> Path:
+    return (directory or _traces_dir()) / f"{execution_id}.json"
+
+
+def save(trace: Trace, directory: Optional[Path] = None) -> Path:
+    """Write the trace atomically and prune the oldest beyond TRACE_KEEP."""
+    path = trace_path(trace.execution_id, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".part")
+    tmp.write_text(json.dumps(trace.to_chrome(), separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+    keep = int(os.getenv("TRACE_KEEP") or DEFAULT_KEEP)
+    files = sorted(path.parent.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in files[keep:]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+@asynccontextmanager
+async def trace_execution(
+    execution_id: int,
+    directory: Optional[Path] = None,
+    force: bool = False,
+) -> AsyncIterator[Optional[Trace]]:
+    """Trace the enclosed run if sampled (or force); yields the Trace or None. Saved on exit."""
+    if not force and (sample_rate() <= 0 or random.random() >= sample_rate()):
+        yield None
+        return
+    trace = Trace(execution_id)
+    token = _current.set(trace)
+    _active[execution_id] = trace
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        _active.pop(execution_id, None)
+        await asyncio.to_thread(save, trace, directory)
+
+
+def load_trace(execution_id: int, directory: Optional[Path] = None) -> Optional[dict]:
+    """Trace JSON of an execution: a snapshot while it runs, else the saved file; None if untraced."""
+    trace = _active.get(execution_id)
+    if trace is not None:
+        return trace.to_chrome()
+    try:
+        return json.loads(trace_path(execution_id, directory).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
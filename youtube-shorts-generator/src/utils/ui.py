@@ -5,7 +5,6 @@ from typing import Any, Optional
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 from rich.text import Text
 from rich import box
 
@@ -142,8 +141,10 @@ def format_status_result(status_data: dict[str, Any]) -> None:
     console.print(table)
 
 
-def create_progress_tracker(total_steps: int) -> Progress:
+def create_progress_tracker(total_steps: int) -> "Progress":
     """Create a progress tracker for pipeline execution."""
+    # rich.progress is only needed here; keep it out of every other command's startup
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
     return Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -168,6 +169,97 @@ def print_pipeline_start() -> None:
     ))
 
 
+def format_stats_result(stats: dict[str, Any]) -> None:
+    """Format stats command output: monthly budget panel and per-bucket aggregates."""
+    budget = stats.get("budget", {})
+    limit = budget.get("monthly_alert")
+    color = "red" if budget.get("exceeded") else "green"
+    limit_str = f" of ${float(limit):.2f}" if limit is not None else ""
+    console.print(Panel(
+        Text(f"${budget.get('spent', 0):.2f}{limit_str} spent in {budget.get('month', '')}", style=color),
+        title="Monthly Budget",
+        border_style=color
+    ))
+
+    rows = stats.get("rows", [])
+    if not rows:
+        console.print("[yellow]No activity recorded yet.[/yellow]")
+        return
+    table = Table(title=f"Per {stats.get('granularity', 'day')}", box=box.ROUNDED, show_header=True, header_style="bold")
+    table.add_column("Bucket", style="cyan", no_wrap=True)
+    table.add_column("Metric")
+    table.add_column("Dimension")
+    table.add_column("Count", justify="right")
+    table.add_column("Total", justify="right")
+    for r in rows:
+        total = f"${r['total']:.4f}" if r["metric"] != "failed_stage" else "—"
+        table.add_row(r["bucket"], r["metric"], r["dimension"], str(r["count"]), total)
+    console.print(table)
+
+
+def format_maintenance_result(report: dict[str, Any]) -> None:
+    """Format db maintain / db vacuum output: rows purged/archived and space reclaimed."""
+    table = Table(title="Database Maintenance", box=box.ROUNDED, show_header=False)
+    table.add_column("Field", style="cyan", no_wrap=True)
+    table.add_column("Value", style="white")
+    table.add_row("Database", report.get("db_path", ""))
+    if "queue_deleted" in report:  # db vacuum reports sizes only
+        table.add_row("Queue messages deleted", str(report["queue_deleted"]))
+        table.add_row("Executions archived", str(report.get("executions_archived", 0)))
+    for f in report.get("archive_files", []):
+        table.add_row("Archive", f)
+    table.add_row("Size before", f"{report.get('bytes_before', 0) / 1024:.1f} KiB")
+    table.add_row("Size after", f"{report.get('bytes_after', 0) / 1024:.1f} KiB")
+    table.add_row("Reclaimed", f"[green]{report.get('reclaimed_bytes', 0) / 1024:.1f} KiB[/green]")
+    console.print(table)
+    if report.get("full_vacuum_needed"):
+        print_warning("Incremental vacuum is off for this database; run 'db vacuum' once with the API stopped")
+
+
+def format_migrate_result(result: dict[str, Any]) -> None:
+    """Format db migrate output: applied (or pending, for --dry-run) migrations."""
+    migrations = result.get("migrations", [])
+    if not migrations:
+        print_success(f"Schema is up to date (version {result.get('latest_version')})")
+        return
+    verb = "Pending" if result.get("dry_run") else "Applied"
+    table = Table(title=f"{verb} Migrations", box=box.ROUNDED, show_header=True, header_style="bold")
+    table.add_column("Version", justify="right", style="cyan")
+    table.add_column("Description")
+    for m in migrations:
+        table.add_row(str(m["version"]), m["description"])
+    console.print(table)
+
+
+def format_bench_result(report: dict[str, Any]) -> None:
+    """Format bench output: one row per metric with the baseline change, then skips and regressions."""
+    table = Table(title="Benchmarks", box=box.ROUNDED, show_header=True, header_style="bold")
+    table.add_column("Benchmark", style="cyan", no_wrap=True)
+    table.add_column("Metric")
+    table.add_column("Value", justify="right")
+    table.add_column("vs baseline", justify="right")
+    changes = {(r["benchmark"], r["metric"]): r["change"] for r in report.get("regressions", [])}
+    for bench, metrics in report.get("results", {}).items():
+        for metric, value in metrics.items():
+            change = changes.get((bench, metric))
+            change_str = f"[red]{change:+.0%}[/red]" if change is not None else ""
+            table.add_row(bench, metric, f"{value:,.2f}", change_str)
+    console.print(table)
+    for bench, reason in report.get("skipped", {}).items():
+        console.print(f"[yellow]Skipped {bench}: {reason}[/yellow]")
+    baseline = report.get("baseline")
+    if report.get("baseline_saved"):
+        console.print(f"[green]✓ Saved baseline to {baseline}[/green]")
+    elif report.get("comparison_skipped"):
+        console.print(f"[yellow]Not compared to {baseline}: {report['comparison_skipped']}[/yellow]")
+    elif not baseline:
+        console.print("[yellow]No baseline yet; run with --save-baseline to store one.[/yellow]")
+    elif report.get("regressions"):
+        console.print(f"[red]✗ {len(report['regressions'])} regression(s) against {baseline}[/red]")
+    else:
+        console.print(f"[green]✓ Within tolerance of {baseline}[/green]")
+
+
 def print_pipeline_complete(execution_id: int) -> None:
     """Print pipeline completion message."""
     console.print(Panel(
@@ -0,0 +1,86 @@
+"""
+Unit tests for the provider-calling agents in src.agents (research, script, tts, video, publishing).
+Run from repo root: pytest tests/test_agents.py -v
+"""
+import asyncio
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.agents.base_agent import BaseAgent, ExecutionContext
+from src.agents.publishing_agent import PublishingAgent
+from src.agents.research_agent import ResearchAgent
+from src.agents.script_agent import ScriptAgent
+from src.agents.tts_agent import TTSAgent
+from src.agents.video_agent import VideoAgent
+
+SLOW_SEC = 0.3
+
+
+def _slow(result):
+    def call(*args, **kwargs):
+        time.sleep(SLOW_SEC)
+        return result
+    return call
+
+
+def _context(tmp_path):
+    master = tmp_path / "final.mp4"
+    master.write_bytes(b"video")
+    return ExecutionContext(
+        execution_id=1,
+        current_stage="start",
+        data={"script": {"script": "Hello there.", "topic": "T"}, "composition": {"output_path": str(master)}},
+        work_dir=tmp_path / "work",
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "agent_cls, target, result",
+    [
+        (ResearchAgent, "src.agents.research_agent.chat_completion", ("a\nb", 0.0)),
+        (ScriptAgent, "src.agents.script_agent.chat_completion", ("Hi.", 0.0)),
+        (TTSAgent, "src.agents.tts_agent.text_to_speech", (Path("a.mp3"), 0.0)),
+        (VideoAgent, "src.agents.video_agent.generate_video", (Path("v.mp4"), 0.0)),
+        (PublishingAgent, "src.services.youtube_service.upload_video", "yt-1"),
+    ],
+)
+async def test_provider_calls_run_off_the_event_loop(tmp_path, agent_cls, target, result):
+    """A slow provider call runs in a worker thread: the event loop keeps running while execute() waits."""
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    agent: BaseAgent = agent_cls()
+    with patch(target, side_effect=_slow(result), create=True), \
+            patch.object(BaseAgent, "log_cost_async", AsyncMock()):
+        task = asyncio.create_task(ticker())
+        outcome = await agent.execute(_context(tmp_path))
+        task.cancel()
+    assert outcome.success, outcome.message
+    assert ticks >= 5  # ~30 ticks fit in SLOW_SEC; none if the loop was blocked
+
+
+@pytest.mark.asyncio
+async def test_tts_and_video_write_into_the_execution_work_dir(tmp_path):
+    """Generated audio and video go to the execution's own work_dir."""
+    ctx = _context(tmp_path)
+    with patch("src.agents.tts_agent.text_to_speech", return_value=(Path("a.mp3"), 0.0)) as tts, \
+            patch("src.agents.video_agent.generate_video", return_value=(Path("v.mp4"), 0.0)) as video, \
+            patch.object(BaseAgent, "log_cost_async", AsyncMock()):
+        await TTSAgent().execute(ctx)
+        await VideoAgent().execute(ctx)
+    assert tts.call_args[1]["output_path"] == tmp_path / "work" / "tts_output.mp3"
+    assert video.call_args[1]["output_path"] == tmp_path / "work" / "runway_output.mp4"
@@ -32,6 +32,20 @@ def test_health_returns_json(client):
     assert isinstance(data["checks"], dict)
 
 
+def test_health_live_is_cheap(client):
+    """GET /api/health/live answers without running the deep checks."""
+    with patch("src.api.app.cached_checks") as deep:
+        resp = client.get("/api/health/live")
+    assert resp.status_code == 200 and resp.json()["ok"] is True
+    deep.assert_not_called()
+
+
+def test_health_fresh_bypasses_cache(client):
+    with patch("src.api.app.cached_checks", return_value={"ok": True, "checks": {}}) as deep:
+        client.get("/api/health?fresh=1")
+    assert deep.call_args[0][1] is True
+
+
 def test_config_get_returns_json(client):
     """GET /api/config returns non-secret config."""
     resp = client.get("/api/config")
@@ -81,7 +95,303 @@ def test_history_returns_paginated(client):
     assert isinstance(data["total"], int)
 
 
+def test_history_total_is_counted_once_per_filter_set(client):
+    """Paging with the same filters reuses the cached total instead of running COUNT(*) per page."""
+    from src.api import app as app_module
+    app_module._history_totals.clear()
+    with patch.object(app_module.async_repository, "get_executions_count", return_value=7) as count:
+        first = client.get("/api/history?limit=2&status=completed").json()
+        second = client.get("/api/history?limit=2&offset=2&status=completed").json()
+        client.get("/api/history?limit=2&status=failed")
+    assert first["total"] == second["total"] == 7
+    assert count.call_count == 2  # one per filter set
+    app_module._history_totals.clear()
+
+
+def test_history_cursor_and_summary_fields(client):
+    """GET /api/history supports cursor paging, fields=summary and include_total=false."""
+    for _ in range(3):
+        client.post("/api/generate", json={"topic": "history cursor"})
+    first = client.get("/api/history?limit=2&fields=summary&include_total=false").json()
+    assert "total" not in first
+    assert len(first["executions"]) == 2
+    assert set(first["executions"][0]) <= {"id", "topic", "status", "current_stage", "cost_total", "start_time"}
+    assert first["next_cursor"] == first["executions"][-1]["id"]
+    second = client.get(f"/api/history?limit=2&cursor={first['next_cursor']}").json()
+    assert all(e["id"] < first["next_cursor"] for e in second["executions"])
+
+
+def test_stats_returns_rollups_and_budget(client):
+    """GET /api/stats returns aggregate rows and monthly budget status."""
+    resp = client.get("/api/stats?granularity=hour")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["granularity"] == "hour"
+    assert isinstance(data["rows"], list)
+    assert {"month", "spent", "monthly_alert", "exceeded"} <= set(data["budget"])
+    assert client.get("/api/stats?granularity=week").status_code == 422
+
+
+def test_websocket_receives_published_progress(client):
+    """Events published to the hub reach the socket; closing the stream closes the socket."""
+    from src.api import app as app_module
+    with client.websocket_connect("/ws/progress/424242") as ws:
+        event = {"agent": "tts", "step": "start", "percent": 10.0, "log": "Starting tts"}
+        ws.portal.call(app_module.progress_hub.publish, 424242, event)
+        assert ws.receive_json() == {**event, "seq": 1}
+        ws.portal.call(app_module.progress_hub.close, 424242)
+        assert ws.receive()["type"] == "websocket.close"
+    assert app_module.progress_hub.subscriber_count(424242) == 0
+
+
+def test_websocket_since_replays_logged_events(client):
+    """A late subscriber with ?since= first receives the logged events after that seq."""
+    from src.api import app as app_module
+    hub = app_module.progress_hub
+    for pct in (10, 20, 30):
+        hub.publish(424243, {"agent": "tts", "step": "progress", "percent": pct, "log": ""})
+    hub.close(424243)
+    with client.websocket_connect("/ws/progress/424243?since=1") as ws:
+        assert [ws.receive_json()["seq"] for _ in range(2)] == [2, 3]
+        assert ws.receive()["type"] == "websocket.close"
+
+
+def test_sse_replays_after_last_event_id(client):
+    """SSE stream honors Last-Event-ID and ends with an end event once the run finished."""
+    from src.api import app as app_module
+    hub = app_module.progress_hub
+    for pct in (10, 20):
+        hub.publish(424244, {"agent": "video", "step": "progress", "percent": pct, "log": ""})
+    hub.close(424244)
+    resp = client.get("/api/progress/424244/events", headers={"Last-Event-ID": "1"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert "id: 2\nevent: progress\n" in resp.text
+    assert "id: 1\n" not in resp.text
+    assert resp.text.endswith("event: end\ndata: {}\n\n")
+
+
+def test_status_long_poll_times_out_with_seq(client, tmp_path, monkeypatch):
+    """wait_for_change returns after the timeout when nothing changes, including the latest seq."""
+    from src.database.repository import create_execution
+    from src.api import app as app_module
+    db = tmp_path / "poll.db"
+    monkeypatch.setattr(app_module, "_db_path", lambda: db)
+    eid = create_execution(status="in_progress", db_path=db)
+    resp = client.get(f"/api/status/{eid}?wait_for_change=0.05")
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "in_progress"
+    assert resp.json()["seq"] == app_module.progress_hub.latest_seq(eid)
+
+
 def test_video_404_when_not_found(client):
     """GET /api/video/{id} returns 404 when video doesn't exist."""
     resp = client.get("/api/video/99999")
     assert resp.status_code == 404
+
+
+@pytest.fixture
+def video_execution(tmp_path, monkeypatch):
+    """Completed execution whose output is a small MP4-like file."""
+    from src.database.repository import create_execution, update_execution
+    from src.api import app as app_module
+    db = tmp_path / "video.db"
+    monkeypatch.setattr(app_module, "_db_path", lambda: db)
+    video = tmp_path / "final.mp4"
+    video.write_bytes(bytes(range(256)) * 40)
+    eid = create_execution(db_path=db)
+    update_execution(eid, status="completed", output_path=str(video), db_path=db)
+    return eid, video
+
+
+def test_video_range_and_conditional_get(client, video_execution):
+    """The master supports byte ranges and answers If-None-Match with 304."""
+    eid, video = video_execution
+    resp = client.get(f"/api/video/{eid}")
+    assert resp.status_code == 200 and resp.content == video.read_bytes()
+    etag = resp.headers["etag"]
+    part = client.get(f"/api/video/{eid}", headers={"Range": "bytes=0-99"})
+    assert part.status_code == 206
+    assert part.content == video.read_bytes()[:100]
+    assert client.get(f"/api/video/{eid}", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_video_preview_falls_back_to_master(client, video_execution):
+    """A preview that cannot be rendered (not a real video) is served as the master; poster is 404."""
+    eid, video = video_execution
+    resp = client.get(f"/api/video/{eid}?rendition=preview")
+    assert resp.status_code == 200 and resp.content == video.read_bytes()
+    assert client.get(f"/api/video/{eid}?rendition=poster").status_code == 404
+    assert client.get(f"/api/video/{eid}?rendition=gif").status_code == 422
+
+
+def test_generate_returns_429_when_saturated(client, monkeypatch):
+    """A full job runner rejects new executions with 429 and Retry-After."""
+    from src.api import app as app_module
+    from src.api.job_runner import JobRunner
+    runner = JobRunner(max_concurrent=1, max_queued=0)
+    monkeypatch.setattr(runner, "saturated", lambda: True)
+    monkeypatch.setattr(app_module, "job_runner", runner)
+    resp = client.post("/api/generate", json={"topic": "busy"})
+    assert resp.status_code == 429
+    assert int(resp.headers["retry-after"]) >= 1
+
+
+def test_metrics_exposes_prometheus_text(client, tmp_path, monkeypatch):
+    """GET /metrics serves HTTP, queue and runner metrics in the text exposition format."""
+    from src.api import app as app_module
+    from src.database.repository import enqueue
+    db = tmp_path / "metrics.db"
+    monkeypatch.setattr(app_module, "_db_path", lambda: db)
+    enqueue("research", "script", "topic", db_path=db)
+    client.get("/api/history")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'shorts_http_request_seconds_count{method="GET",route="/api/history",status="200"}' in resp.text
+    assert 'shorts_message_queue_depth{status="pending"} 1' in resp.text
+    assert "shorts_executions_running " in resp.text
+    assert "shorts_db_operation_seconds_bucket" in resp.text
+
+
+@pytest.fixture
+def batch_client(tmp_path, monkeypatch):
+    """App client with its own database and a fake pipeline that completes immediately."""
+    from src.api import app as app_module
+    from src.database import repository
+    db = tmp_path / "batch.db"
+    monkeypatch.setattr(app_module, "_db_path", lambda: db)
+    monkeypatch.setenv("LOG_FILE", str(tmp_path / "api.jsonl"))
+    ran = []
+
+    async def fake_pipeline(execution_id, topic, config_overrides):
+        ran.append((execution_id, topic))
+        repository.update_execution(execution_id, status="completed", topic=topic, cost_total=0.5, db_path=db)
+
+    async def fake_research(execution_id):
+        ran.append(("research", execution_id))
+        return ["idea A", "idea B"]
+
+    monkeypatch.setattr(app_module, "_run_pipeline", fake_pipeline)
+    monkeypatch.setattr(app_module, "_shared_research", fake_research)
+    with TestClient(app) as c:
+        yield c, ran
+
+
+def _wait_batch_done(c, batch_id):
+    import time
+    for _ in range(100):
+        data = c.get(f"/api/batch/{batch_id}").json()
+        if data["percent"] == 100.0:
+            return data
+        time.sleep(0.02)
+    raise AssertionError(data)
+
+
+def test_batch_with_topics_runs_each_item(batch_client):
+    """POST /api/generate/batch with topics runs one item per topic; GET /api/batch aggregates."""
+    c, ran = batch_client
+    resp = c.post("/api/generate/batch", json={"topics": ["cats", "dogs", "owls"], "concurrency": 2})
+    assert resp.status_code == 200
+    body = resp.json()
+    data = _wait_batch_done(c, body["batch_id"])
+    assert data["status"] == "completed"
+    assert data["counts"]["completed"] == 3 and data["total"] == 3
+    assert data["cost_total"] == pytest.approx(1.5)
+    assert [e["id"] for e in data["executions"]] == body["execution_ids"]
+    assert sorted(topic for _, topic in ran) == ["cats", "dogs", "owls"]
+
+
+def test_batch_count_shares_one_research_run(batch_client):
+    """Without topics, research runs once and its topics are shared round-robin."""
+    c, ran = batch_client
+    body = c.post("/api/generate/batch", json={"count": 3}).json()
+    data = _wait_batch_done(c, body["batch_id"])
+    assert [r for r in ran if r[0] == "research"] == [("research", body["execution_ids"][0])]
+    assert [e["topic"] for e in data["executions"]] == ["idea A", "idea B", "idea A"]
+    assert data["topics"] == ["idea A", "idea B"]
+
+
+def test_shutdown_fails_every_unfinished_batch_item(tmp_path, monkeypatch):
+    """Shutting down mid-batch marks the running, queued and never-submitted items failed."""
+    import asyncio
+    from src.api import app as app_module
+    from src.database import repository
+    db = tmp_path / "shutdown.db"
+    monkeypatch.setattr(app_module, "_db_path", lambda: db)
+    monkeypatch.setenv("LOG_FILE", str(tmp_path / "api.jsonl"))
+    monkeypatch.setenv("JOB_DRAIN_TIMEOUT_SEC", "0.05")
+
+    async def hanging_pipeline(execution_id, topic, config_overrides):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(app_module, "_run_pipeline", hanging_pipeline)
+    with TestClient(app) as c:
+        ids = c.post("/api/generate/batch", json={"topics": ["a", "b", "c"], "concurrency": 1}).json()["execution_ids"]
+    assert [repository.get_execution(eid, db_path=db)["status"] for eid in ids] == ["failed"] * 3
+    assert not app_module._batch_tasks
+
+
+def test_health_live_answers_while_an_agent_waits_on_its_provider(tmp_path, monkeypatch):
+    """/api/health/live stays fast while a running pipeline's agent is blocked in a slow provider call."""
+    import threading
+    import time
+    from src.agents.script_agent import ScriptAgent
+    from src.api import app as app_module
+    db = tmp_path / "live.db"
+    monkeypatch.setattr(app_module, "_db_path", lambda: db)
+    monkeypatch.setenv("LOG_FILE", str(tmp_path / "api.jsonl"))
+    in_call, release = threading.Event(), threading.Event()
+
+    def slow_chat_completion(*args, **kwargs):
+        in_call.set()
+        release.wait(5)
+        return "Hello.", 0.0
+
+    with patch("src.agents.registry.default_agents", return_value=[ScriptAgent]), \
+            patch("src.agents.script_agent.chat_completion", side_effect=slow_chat_completion):
+        with TestClient(app) as c:
+            assert c.post("/api/generate", json={"topic": "owls"}).status_code == 200
+            try:
+                assert in_call.wait(5)
+                start = time.monotonic()
+                resp = c.get("/api/health/live")
+                elapsed = time.monotonic() - start
+            finally:
+                release.set()
+    assert resp.status_code == 200
+    assert elapsed < 1.0
+
+
+def test_batch_validation_and_404(batch_client):
+    c, _ = batch_client
+    assert c.post("/api/generate/batch", json={}).status_code == 422
+    assert c.post("/api/generate/batch", json={"count": 500}).status_code == 422
+    assert c.post("/api/generate/batch", json={"count": 1, "concurrency": 0}).status_code == 422
+    assert c.post("/api/generate/batch", json={"count": 1, "concurrency": 10_000}).status_code == 422
+    assert c.post("/api/generate/batch", json={"count": 1, "concurrency": "many"}).status_code == 422
+    assert c.get("/api/batch/999999").status_code == 404
+
+
+def test_trace_404_then_served(client, tmp_path, monkeypatch):
+    """GET /api/executions/{id}/trace returns the saved trace, 404 when the run was not traced."""
+    from src.utils import tracing
+    monkeypatch.setattr(tracing, "_traces_dir", lambda: tmp_path)
+    assert client.get("/api/executions/424242/trace").status_code == 404
+    tracing.save(tracing.Trace(424242), directory=tmp_path)
+    resp = client.get("/api/executions/424242/trace")
+    assert resp.status_code == 200
+    assert resp.json()["otherData"]["execution_id"] == 424242
+
+
+def test_batch_concurrency_is_clamped_and_env_parsed_defensively(batch_client, monkeypatch):
+    """A concurrency above JOB_MAX_CONCURRENT is lowered to it; a malformed BATCH_CONCURRENCY falls back to 1."""
+    from src.api import app as app_module
+    c, _ = batch_client
+    monkeypatch.setattr(app_module.job_runner, "max_concurrent", 2)
+    body = c.post("/api/generate/batch", json={"count": 1, "concurrency": 40}).json()
+    assert _wait_batch_done(c, body["batch_id"])["concurrency"] == 2
+    monkeypatch.setenv("BATCH_CONCURRENCY", "lots")
+    resp = c.post("/api/generate/batch", json={"count": 1})
+    assert resp.status_code == 200
+    assert _wait_batch_done(c, resp.json()["batch_id"])["concurrency"] == 1
@@ -0,0 +1,114 @@
+"""
+Unit tests for src.database.async_repository (DB work off the event loop).
+Run from repo root: pytest tests/test_async_repository.py -v
+"""
+import asyncio
+import contextvars
+import threading
+from pathlib import Path
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.database import async_repository
+from src.database import models
+
+
+@pytest.fixture
+def db(tmp_path):
+    yield tmp_path / "async.db"
+    async_repository.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_writes_run_on_single_writer_thread(db):
+    """Every write runs on the same dedicated thread, never the event loop thread."""
+    names = await asyncio.gather(*(
+        async_repository.run_write(lambda: threading.current_thread().name) for _ in range(5)
+    ))
+    assert len(set(names)) == 1
+    assert names[0].startswith("db-writer")
+    assert names[0] != threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_writes_keep_submission_order(db):
+    """Writes submitted concurrently are applied in submission order."""
+    order = []
+    await asyncio.gather(*(async_repository.run_write(order.append, i) for i in range(20)))
+    assert order == list(range(20))
+
+
+@pytest.mark.asyncio
+async def test_context_vars_propagate(db):
+    """Context variables set in the caller are visible in the DB thread."""
+    var = contextvars.ContextVar("execution_id", default=None)
+    var.set(42)
+    assert await async_repository.run_read(var.get) == 42
+
+
+@pytest.mark.asyncio
+async def test_roundtrip_through_facade(db):
+    """create/update/insert_cost/get work end to end through the async wrappers."""
+    await async_repository.ensure_schema(db)
+    eid = await async_repository.create_execution(db_path=db)
+    await async_repository.update_execution(eid, status=models.STATUS_COMPLETED, topic="t", db_path=db)
+    await async_repository.insert_cost(eid, "script", 0.25, db_path=db)
+    row = await async_repository.get_execution(eid, db_path=db)
+    assert row["status"] == models.STATUS_COMPLETED
+    assert row["topic"] == "t"
+    assert await async_repository.get_execution_cost_total(eid, db_path=db) == pytest.approx(0.25)
+    assert await async_repository.get_executions_count(db_path=db) == 1
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_slow_write(db):
+    """A blocking write does not stall other coroutines."""
+    release = threading.Event()
+    write = asyncio.ensure_future(async_repository.run_write(release.wait, 2))
+    ticks = 0
+    for _ in range(5):
+        await asyncio.sleep(0.005)
+        ticks += 1
+    assert ticks == 5 and not write.done()
+    release.set()
+    assert await write is True
+
+
+@pytest.mark.asyncio
+async def test_reads_never_write_on_reader_threads(db, monkeypatch):
+    """Migrations and buffered-write flushes triggered by reads run on the writer thread."""
+    from src.database import repository, write_buffer
+    monkeypatch.setenv("DB_WRITE_BUFFER_INTERVAL_MS", "60000")
+    write_buffer.reset_write_buffer()
+    threads = []
+    migrate, write_batch = repository.run_migrations, repository.write_batch
+
+    def record(fn):
+        def wrapper(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return fn(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(repository, "run_migrations", record(migrate))
+    monkeypatch.setattr(repository, "write_batch", record(write_batch))
+    try:
+        assert await async_repository.get_execution(1, db_path=db) is None  # first use: migrates
+        eid = await async_repository.create_execution(db_path=db)
+        write_buffer.log_cost(eid, "tts", 0.5, db_path=db)
+        assert await async_repository.get_execution_cost_total(eid, db_path=db) == pytest.approx(0.5)
+    finally:
+        write_buffer.reset_write_buffer()
+        repository.close_connections()
+    assert len(threads) == 2
+    assert all(name.startswith("db-writer") for name in threads)
+
+
+def test_read_only_thread_refuses_migrations(tmp_path):
+    from src.database import repository
+    with repository.read_only(), pytest.raises(RuntimeError, match="not set up"):
+        repository.ensure_schema(tmp_path / "fresh.db")
@@ -0,0 +1,94 @@
+"""
+Unit tests for src.bench.suite (offline benchmark suite and baseline comparison).
+Run from repo root: pytest tests/test_bench.py -v
+"""
+from pathlib import Path
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.bench import BenchUnavailable
+from src.bench import suite
+
+
+def _report(**results):
+    return {"meta": {"quick": True}, "results": results}
+
+
+def test_compare_flags_only_drops_beyond_tolerance():
+    """Rates are higher-is-better: -30% regresses at 25% tolerance, -10% and gains do not."""
+    base = _report(repository={"insert_cost": 1000.0, "enqueue": 1000.0, "get_execution": 1000.0})
+    current = _report(repository={"insert_cost": 700.0, "enqueue": 900.0, "get_execution": 5000.0})
+    regressions = suite.compare(current, base, tolerance=0.25)
+    assert [(r["benchmark"], r["metric"]) for r in regressions] == [("repository", "insert_cost")]
+    assert regressions[0]["change"] == pytest.approx(-0.3)
+
+
+def test_compare_ms_metrics_are_lower_is_better():
+    base = _report(pipeline={"stage_overhead_ms": 1.0, "runs_per_sec": 100.0})
+    slower = _report(pipeline={"stage_overhead_ms": 1.5, "runs_per_sec": 100.0})
+    faster = _report(pipeline={"stage_overhead_ms": 0.5, "runs_per_sec": 100.0})
+    assert [r["metric"] for r in suite.compare(slower, base, tolerance=0.25)] == ["stage_overhead_ms"]
+    assert suite.compare(faster, base, tolerance=0.25) == []
+
+
+def test_compare_ignores_metrics_missing_from_baseline():
+    base = _report(embeddings={"top10_10000_qps": 100.0})
+    current = _report(embeddings={"top10_1000_qps": 1.0, "top10_10000_qps": 99.0}, api={"status_rps": 1.0})
+    assert suite.compare(current, base, tolerance=0.25) == []
+
+
+def test_run_suite_rejects_unknown_benchmark():
+    with pytest.raises(ValueError, match="nope"):
+        suite.run_suite(["nope"])
+
+
+def test_run_suite_quick_reports_metrics_and_skips(monkeypatch):
+    """Offline benchmarks produce positive numbers; a missing dependency is a skip, not a failure."""
+    from src.bench import embeddings
+
+    def unavailable(**kwargs):
+        raise BenchUnavailable("NumPy not installed")
+
+    monkeypatch.setattr(embeddings, "run", unavailable)
+    report = suite.run_suite(["repository", "pipeline", "embeddings"], quick=True)
+    assert set(report["results"]["repository"]) == {"insert_cost", "get_execution", "enqueue", "dequeue_next"}
+    assert report["results"]["pipeline"]["runs_per_sec"] > 0
+    assert report["skipped"] == {"embeddings": "NumPy not installed"}
+    assert report["meta"]["quick"] is True
+
+
+def test_run_and_compare_saves_then_gates_on_baseline(tmp_path):
+    path = tmp_path / "baseline.json"
+    first = suite.run_and_compare(["repository"], quick=True, baseline_path=path, update_baseline=True)
+    assert first["ok"] and first["baseline_saved"] and path.exists()
+
+    saved = suite.load_baseline(path)
+    saved["results"]["repository"]["insert_cost"] *= 1000  # make the current run look 99.9% slower
+    suite.save_baseline(saved, path)
+    # Wide tolerance so run-to-run noise in the other metrics cannot trip the gate
+    second = suite.run_and_compare(["repository"], quick=True, baseline_path=path, tolerance=0.9)
+    assert second["ok"] is False
+    assert [r["metric"] for r in second["regressions"]] == ["insert_cost"]
+
+
+def test_run_and_compare_without_baseline_is_ok(tmp_path):
+    report = suite.run_and_compare(["repository"], quick=True, baseline_path=tmp_path / "missing.json")
+    assert report["ok"] is True and report["baseline"] is None
+
+
+def test_run_and_compare_skips_baseline_with_other_quick_setting(tmp_path):
+    """A full-size baseline is not compared against a --quick run, even when its numbers look far better."""
+    path = tmp_path / "baseline.json"
+    baseline = suite.run_suite(["repository"], quick=True)
+    baseline["meta"]["quick"] = False
+    baseline["results"]["repository"] = {m: v * 1000 for m, v in baseline["results"]["repository"].items()}
+    suite.save_baseline(baseline, path)
+    report = suite.run_and_compare(["repository"], quick=True, baseline_path=path)
+    assert report["regressions"] == []
+    assert report["ok"] is True
+    assert "quick=False" in report["comparison_skipped"]
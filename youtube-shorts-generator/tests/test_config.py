@@ -127,3 +127,52 @@ def test_get_config_valid_env_and_config_returns_no_errors():
                 config, errors = get_config()
     assert config == valid_config
     assert errors == []
+
+
+@pytest.fixture
+def settings_file(tmp_path):
+    """Point get_settings at a temp config.yaml and reset its cache around the test."""
+    from src.utils import config as config_mod
+    cfg = tmp_path / "config.yaml"
+    cfg.write_text("paths:\n  database: first.db\ntimeouts:\n  research: 30\n")
+    config_mod.invalidate_settings()
+    with patch("src.utils.config._config_file", return_value=cfg), \
+            patch("src.utils.config.CONFIG_RELOAD_CHECK_SEC", 0):
+        yield cfg
+    config_mod.invalidate_settings()
+
+
+def test_get_settings_cached_until_file_changes(settings_file):
+    """get_settings parses the file once and reloads only after its mtime changes."""
+    from src.utils.config import get_settings
+    with patch("src.utils.config.load_config", wraps=load_config) as mock_load:
+        first = get_settings()
+        assert get_settings() is first
+        assert mock_load.call_count == 1
+        settings_file.write_text("paths:\n  database: /abs/second.db\n")
+        os.utime(settings_file, ns=(0, settings_file.stat().st_mtime_ns + 10**9))
+        second = get_settings()
+    assert mock_load.call_count == 2
+    assert first.database_path.name == "first.db" and first.database_path.is_absolute()
+    assert second.database_path == Path("/abs/second.db")
+
+
+def test_get_settings_validates_once_and_invalidate_reloads(settings_file):
+    """Settings carry validate_config errors; invalidate_settings forces a re-read."""
+    from src.utils.config import get_settings, invalidate_settings
+    settings_file.write_text("timeouts:\n  research: -1\n")
+    invalidate_settings()
+    s = get_settings()
+    assert s.errors == ("timeouts.research must be a positive number",)
+    assert s.section("timeouts") == {"research": -1}
+    invalidate_settings()
+    assert get_settings() is not s
+
+
+def test_get_settings_skips_stat_within_check_interval(settings_file):
+    """Within CONFIG_RELOAD_CHECK_SEC the cached object is returned without touching the file."""
+    from src.utils.config import get_settings
+    first = get_settings()
+    with patch("src.utils.config.CONFIG_RELOAD_CHECK_SEC", 3600), \
+            patch("src.utils.config._stamp", side_effect=AssertionError("stat on hot path")):
+        assert get_settings() is first
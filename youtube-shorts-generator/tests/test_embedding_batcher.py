@@ -0,0 +1,117 @@
+"""
+Unit tests for src.services.embedding_batcher (EmbeddingBatcher).
+Run from repo root: pytest tests/test_embedding_batcher.py -v
+"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.services.embedding_batcher import EmbeddingBatcher
+from src.utils import metrics
+
+
+class RecordingEmbed:
+    """Fake embed function: vector is [len(text)], cost 1.0 per call."""
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, texts, model):
+        self.calls.append((list(texts), model))
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return [[float(len(t))] for t in texts], 1.0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced_into_one_call():
+    """Concurrent embed() calls within the window produce one upstream call."""
+    fake = RecordingEmbed()
+    batcher = EmbeddingBatcher(window_ms=20, max_batch_size=100, embed_fn=fake)
+    results = await asyncio.gather(*(batcher.embed(t) for t in ["a", "bb", "ccc"]))
+    assert len(fake.calls) == 1
+    assert fake.calls[0][0] == ["a", "bb", "ccc"]
+    assert [v for v, _ in results] == [[1.0], [2.0], [3.0]]
+    assert sum(c for _, c in results) == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_flushes_early():
+    """Reaching max_batch_size flushes without waiting for the window."""
+    fake = RecordingEmbed()
+    batcher = EmbeddingBatcher(window_ms=10_000, max_batch_size=2, embed_fn=fake)
+    vectors, _ = await asyncio.wait_for(batcher.embed_many(["a", "b", "c", "d"]), timeout=2)
+    assert vectors == [[1.0], [1.0], [1.0], [1.0]]
+    assert [len(c[0]) for c in fake.calls] == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_token_limit_splits_batches():
+    """A text that would exceed max_batch_tokens starts a new batch."""
+    fake = RecordingEmbed()
+    batcher = EmbeddingBatcher(window_ms=5, max_batch_size=100, max_batch_tokens=10, embed_fn=fake)
+    await batcher.embed_many(["x" * 20, "y" * 20])
+    assert len(fake.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_models_are_batched_separately():
+    """Requests for different models never share a call."""
+    fake = RecordingEmbed()
+    batcher = EmbeddingBatcher(window_ms=5, embed_fn=fake)
+    await asyncio.gather(batcher.embed("a", "m1"), batcher.embed("b", "m2"))
+    assert sorted(m for _, m in fake.calls) == ["m1", "m2"]
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_caller():
+    """An upstream failure is raised in every waiting caller."""
+    batcher = EmbeddingBatcher(window_ms=5, embed_fn=RecordingEmbed(fail=True))
+    results = await asyncio.gather(batcher.embed("a"), batcher.embed("b"), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert batcher.stats.errors == 1
+
+
+@pytest.mark.asyncio
+async def test_stats_track_batch_size_and_wait():
+    """stats reports batches, items and wait times."""
+    batcher = EmbeddingBatcher(window_ms=5, embed_fn=RecordingEmbed())
+    await batcher.embed_many(["a", "b", "c"])
+    stats = batcher.stats.as_dict()
+    assert stats["batches"] == 1
+    assert stats["items"] == 3
+    assert stats["avg_batch_size"] == 3.0
+    assert stats["max_wait_ms"] >= 0.0
+
+
+@pytest.mark.asyncio
+async def test_vector_count_mismatch_fails_every_caller():
+    """Fewer vectors than texts fails the whole batch instead of leaving callers waiting."""
+    errors_before = metrics.EMBEDDING_BATCH_ERRORS.value()
+    batcher = EmbeddingBatcher(window_ms=5, embed_fn=lambda texts, model: ([[1.0]], 1.0))
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.embed("a"), batcher.embed("b"), batcher.embed("c"), return_exceptions=True),
+        timeout=2,
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert batcher.stats.errors == 1
+    assert metrics.EMBEDDING_BATCH_ERRORS.value() == errors_before + 1
+
+
+@pytest.mark.asyncio
+async def test_batches_are_exported_as_metrics():
+    """Batch sizes and queueing delay appear on /metrics."""
+    before = metrics.EMBEDDING_BATCH_SIZE.count()
+    batcher = EmbeddingBatcher(window_ms=5, embed_fn=RecordingEmbed())
+    await batcher.embed_many(["a", "b"])
+    assert metrics.EMBEDDING_BATCH_SIZE.count() == before + 1
+    text = metrics.render()
+    assert "shorts_embedding_batch_size_bucket" in text
+    assert "shorts_embedding_batch_wait_seconds_count" in text
@@ -0,0 +1,102 @@
+"""
+Unit tests for src.services.embedding_cache and cached get_embeddings.
+Run from repo root: pytest tests/test_embedding_cache.py -v
+"""
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.services.embedding_cache import EmbeddingCache, text_hash
+from src.services import openai_service
+
+
+def _fake_response(texts):
+    data = [SimpleNamespace(embedding=[float(len(t)), 0.5]) for t in texts]
+    return SimpleNamespace(data=data, usage=SimpleNamespace(total_tokens=10 * len(texts)))
+
+
+def test_text_hash_is_sha256_hex():
+    """text_hash returns a 64-char hex digest."""
+    h = text_hash("hello")
+    assert len(h) == 64
+    assert h == text_hash("hello")
+    assert h != text_hash("hello ")
+
+
+def test_get_many_returns_none_for_misses(tmp_path):
+    """get_many returns None for texts not in the cache, in input order."""
+    cache = EmbeddingCache(tmp_path / "emb.db")
+    cache.put_many("m", ["a"], [[1.0, 2.0]])
+    assert cache.get_many("m", ["b", "a"]) == [None, [1.0, 2.0]]
+    cache.close()
+
+
+def test_cache_is_keyed_by_model(tmp_path):
+    """Same text under a different model is a miss."""
+    cache = EmbeddingCache(tmp_path / "emb.db")
+    cache.put_many("m1", ["a"], [[1.0]])
+    assert cache.get_many("m2", ["a"]) == [None]
+    cache.close()
+
+
+def test_vectors_persist_as_float32(tmp_path):
+    """Vectors survive a new cache instance and are float32-rounded."""
+    path = tmp_path / "emb.db"
+    cache = EmbeddingCache(path)
+    cache.put_many("m", ["a"], [[0.1, 0.25]])
+    cache.close()
+    reopened = EmbeddingCache(path, lru_size=0)
+    vec = reopened.get_many("m", ["a"])[0]
+    assert vec is not None
+    assert vec[1] == 0.25
+    assert vec[0] == pytest.approx(0.1, rel=1e-6)
+    assert vec[0] != 0.1  # float32, not float64
+    reopened.close()
+
+
+def test_lru_front_is_bounded(tmp_path):
+    """In-memory LRU never holds more than lru_size entries."""
+    cache = EmbeddingCache(tmp_path / "emb.db", lru_size=2)
+    cache.put_many("m", ["a", "b", "c"], [[1.0], [2.0], [3.0]])
+    assert len(cache._lru) == 2
+    # Evicted entry still served from disk
+    assert cache.get_many("m", ["a"]) == [[1.0]]
+    cache.close()
+
+
+def test_get_embeddings_sends_only_misses(tmp_path):
+    """get_embeddings requests only uncached texts and returns vectors in input order."""
+    cache = EmbeddingCache(tmp_path / "emb.db")
+    cache.put_many("text-embedding-3-small", ["cached"], [[9.0, 9.0]])
+    client = MagicMock()
+    client.embeddings.create.side_effect = lambda input, model: _fake_response(input)
+    with patch.object(openai_service, "get_embedding_cache", return_value=cache), \
+            patch.object(openai_service, "_client", return_value=client), \
+            patch.dict("os.environ", {"OPENAI_EMBEDDING_MODEL": "text-embedding-3-small", "EMBEDDING_CACHE": "1"}):
+        vectors, cost = openai_service.get_embeddings(["new", "cached", "new", "xy"])
+    assert client.embeddings.create.call_count == 1
+    assert client.embeddings.create.call_args[1]["input"] == ["new", "xy"]
+    assert vectors == [[3.0, 0.5], [9.0, 9.0], [3.0, 0.5], [2.0, 0.5]]
+    assert cost > 0
+    cache.close()
+
+
+def test_get_embeddings_all_hits_skips_api(tmp_path):
+    """When every text is cached, no API call is made and cost is 0."""
+    cache = EmbeddingCache(tmp_path / "emb.db")
+    cache.put_many("text-embedding-3-small", ["a", "b"], [[1.0], [2.0]])
+    with patch.object(openai_service, "get_embedding_cache", return_value=cache), \
+            patch.object(openai_service, "_client") as mock_client, \
+            patch.dict("os.environ", {"OPENAI_EMBEDDING_MODEL": "text-embedding-3-small", "EMBEDDING_CACHE": "1"}):
+        vectors, cost = openai_service.get_embeddings(["b", "a"])
+    mock_client.assert_not_called()
+    assert vectors == [[2.0], [1.0]]
+    assert cost == 0.0
+    cache.close()
@@ -14,9 +14,11 @@ _ROOT = Path(__file__).resolve().parent.parent
 if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
+from src.utils import health
 from src.utils.health import (
     check_disk_space,
     check_runwayml,
+    cached_checks,
     run_all_checks,
     MIN_DISK_GB,
 )
@@ -74,3 +76,81 @@ def test_run_all_checks_returns_ok_and_checks():
         assert name in checks
         assert "pass" in checks[name]
         assert "detail" in checks[name]
+
+
+class HealthCalls(list):
+    """Names of the fast checks run; .release unblocks the hanging one."""
+
+
+@pytest.fixture
+def fake_checks(monkeypatch):
+    """Replace the checks with fast local ones plus one that hangs."""
+    release = __import__("threading").Event()
+    calls = HealthCalls()
+
+    def ok(root):
+        calls.append("ok")
+        return {"pass": True, "detail": {}}
+
+    def hang(root):
+        release.wait(10)
+        return {"pass": True, "detail": {}}
+
+    monkeypatch.setattr(health, "check_api_keys", ok)
+    monkeypatch.setattr(health, "CHECKS", {"disk_space": ok, "system_resources": ok, "database": ok, "openai": hang})
+    monkeypatch.setattr(health, "_cache", {})
+    monkeypatch.setattr(health, "_inflight", {})
+    monkeypatch.setattr(health, "_last_results", {})
+    calls.release = release
+    yield calls
+    release.set()
+    for t in __import__("threading").enumerate():
+        if t.name.startswith("health-"):
+            t.join(2)  # a finishing hung check records its result: keep it out of the next test
+
+
+def test_run_all_checks_times_out_slow_check(fake_checks):
+    """A hanging check fails with a timeout; the others still report and ok is unaffected."""
+    import time
+    start = time.monotonic()
+    result = run_all_checks(root=_ROOT, timeout=0.2)
+    assert time.monotonic() - start < 2
+    assert result["ok"] is True
+    assert result["checks"]["openai"]["pass"] is False
+    assert "timed out" in result["checks"]["openai"]["detail"]["error"]
+    assert "duration_ms" in result["checks"]["database"]
+
+
+def test_cached_checks_reuse_until_ttl_or_fresh(fake_checks, monkeypatch):
+    """A cached report is served without re-running checks; fresh=True or an expired ttl runs them again."""
+    monkeypatch.setenv("HEALTH_CHECK_TIMEOUT_SEC", "0.1")
+    first = cached_checks(root=_ROOT, ttl=60)
+    assert first["cached"] is False
+    n = len(fake_checks)
+    second = cached_checks(root=_ROOT, ttl=60)
+    assert second["cached"] is True and len(fake_checks) == n
+    assert second["checked_at"] == first["checked_at"]
+    third = cached_checks(root=_ROOT, ttl=60, fresh=True)
+    assert third["cached"] is False and len(fake_checks) == 2 * n
+    expired = cached_checks(root=_ROOT, ttl=0)
+    assert expired["cached"] is False and len(fake_checks) == 3 * n
+
+
+def test_hung_check_is_not_started_again_while_in_flight(fake_checks):
+    """While a check's previous run hangs, later runs report it stale instead of starting another thread."""
+    import threading
+    import time
+    first = run_all_checks(root=_ROOT, timeout=0.1)
+    assert "timed out" in first["checks"]["openai"]["detail"]["error"]
+    second = run_all_checks(root=_ROOT, timeout=0.1)
+    assert second["checks"]["openai"]["stale"] is True
+    assert second["checks"]["openai"]["pass"] is False
+    assert "stale" not in second["checks"]["database"]
+    assert sum(t.name == "health-openai" for t in threading.enumerate()) == 1
+    fake_checks.release.set()
+    deadline = time.monotonic() + 5
+    while health._inflight.get("openai") is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    third = run_all_checks(root=_ROOT, timeout=0.1)
+    assert third["checks"]["openai"]["pass"] is True
+    assert "stale" not in third["checks"]["openai"]
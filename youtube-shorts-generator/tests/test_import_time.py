@@ -0,0 +1,66 @@
+"""
+Startup import regression tests (``python -X importtime`` in a subprocess).
+Run from repo root: pytest tests/test_import_time.py -v
+
+``status`` and ``health`` must not import the pipeline's SDKs, and their own imports must stay under
+IMPORT_BUDGET_MS. Building a pipeline must not import any agent's heavy dependencies before it runs.
+"""
+import subprocess
+import sys
+from pathlib import Path
+from typing import Set, Tuple
+
+import pytest
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+# Generous against CI noise (measured ~50-80 ms); importing MoviePy or OpenAI alone costs more
+IMPORT_BUDGET_MS = 250
+HEAVY = {"moviepy", "runwayml", "chromadb", "openai", "elevenlabs", "fastapi", "numpy"}
+
+
+def _importtime(code: str) -> Tuple[float, Set[str]]:
+    """(ms spent importing after interpreter startup, top-level package names imported) for code."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=str(_ROOT), timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    total_us, packages, started = 0, set(), False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if started:
+            total_us += int(self_us)
+            packages.add(name.split(".")[0])
+        elif name == "site":  # everything before this is interpreter startup
+            started = True
+    return total_us / 1000.0, packages
+
+
+@pytest.mark.parametrize(
+    "command, code, forbidden",
+    [
+        ("status", "import src.cli.main; from src.database import repository; from src.utils import ui",
+         HEAVY | {"yaml", "dotenv", "asyncio", "structlog"}),
+        ("health", "import src.cli.main; from src.utils import config, health",
+         HEAVY | {"structlog"}),
+    ],
+)
+def test_cli_startup_imports_stay_light(command, code, forbidden):
+    ms, packages = _importtime(code)
+    assert not packages & forbidden, f"{command} imports {sorted(packages & forbidden)}"
+    assert ms < IMPORT_BUDGET_MS, f"{command} startup imports took {ms:.0f} ms"
+
+
+def test_building_pipeline_defers_agent_dependencies():
+    code = (
+        "from src.agents.registry import default_agents\n"
+        "from src.orchestration.pipeline import Pipeline\n"
+        "Pipeline(agents=default_agents())"
+    )
+    _, packages = _importtime(code)
+    assert not packages & (HEAVY - {"fastapi"})
+    assert "src" in packages
@@ -0,0 +1,99 @@
+"""
+Unit tests for src.api.job_runner (bounded concurrency, bounded queue, ETA, drain).
+Run from repo root: pytest tests/test_job_runner.py -v
+"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.api.job_runner import JobRunner, QueueFull
+
+
+def _job(gate: asyncio.Event, log: list, name: int):
+    async def run():
+        log.append(("start", name))
+        await gate.wait()
+        log.append(("end", name))
+    return run
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency_and_runs_fifo():
+    """Only max_concurrent jobs run; queued jobs start in submission order as slots free."""
+    runner = JobRunner(max_concurrent=2, max_queued=5)
+    gate, log = asyncio.Event(), []
+    positions = [runner.submit(i, _job(gate, log, i)) for i in range(4)]
+    assert positions == [0, 0, 1, 2]
+    await asyncio.sleep(0)
+    assert log == [("start", 0), ("start", 1)]
+    assert runner.stats()["running"] == 2 and runner.stats()["queued"] == 2
+    gate.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert [n for kind, n in log if kind == "start"] == [0, 1, 2, 3]
+    assert runner.stats()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_full_raises_with_retry_after():
+    runner = JobRunner(max_concurrent=1, max_queued=1)
+    gate = asyncio.Event()
+    runner.submit(1, _job(gate, [], 1))
+    runner.submit(2, _job(gate, [], 2))
+    assert runner.saturated()
+    with pytest.raises(QueueFull) as exc:
+        runner.submit(3, _job(gate, [], 3))
+    assert exc.value.retry_after >= 1
+    gate.set()
+    await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_position_and_eta_follow_queue():
+    """ETA of the n-th waiting job is n+1 mean durations with one busy slot (no history yet)."""
+    runner = JobRunner(max_concurrent=1, max_queued=5)
+    gate = asyncio.Event()
+    for i in range(3):
+        runner.submit(i, _job(gate, [], i))
+    await asyncio.sleep(0)
+    mean = runner.mean_duration()
+    assert runner.position(0) is None and runner.is_running(0)
+    assert runner.position(2) == 2
+    assert runner.eta(1) == pytest.approx(2 * mean, rel=0.01)
+    assert runner.eta(2) == pytest.approx(3 * mean, rel=0.01)
+    assert runner.eta(99) is None
+    gate.set()
+    await asyncio.sleep(0.01)
+    assert runner.mean_duration() < mean  # real durations replace the default estimate
+
+
+@pytest.mark.asyncio
+async def test_drain_finishes_running_and_drops_waiting():
+    runner = JobRunner(max_concurrent=1, max_queued=5)
+    gate, log = asyncio.Event(), []
+    runner.submit(1, _job(gate, log, 1))
+    runner.submit(2, _job(gate, log, 2))
+    await asyncio.sleep(0)
+    asyncio.get_running_loop().call_later(0.01, gate.set)
+    dropped, cancelled = await runner.drain(timeout=5)
+    assert dropped == [2] and cancelled == []
+    assert log == [("start", 1), ("end", 1)]
+    with pytest.raises(QueueFull):
+        runner.submit(3, _job(gate, log, 3))
+    runner.reopen()
+    runner.submit(3, _job(gate, log, 3))
+    await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_drain_cancels_after_timeout():
+    runner = JobRunner(max_concurrent=1, max_queued=0)
+    runner.submit(1, _job(asyncio.Event(), [], 1))
+    await asyncio.sleep(0)
+    assert await runner.drain(timeout=0.01) == ([], [1])
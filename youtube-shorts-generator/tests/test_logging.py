@@ -0,0 +1,83 @@
+"""
+Unit tests for src.utils.logging (queued JSONL logging with bound execution context).
+Run from repo root: pytest tests/test_logging.py -v
+"""
+import asyncio
+import io
+import json
+import logging
+
+import pytest
+import structlog
+
+import sys
+from pathlib import Path
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.utils.logging import Throttle, configure_logging, get_logger, log_context, shutdown_logging
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    root = logging.getLogger()
+    level = root.level
+    path = tmp_path / "logs" / "app.jsonl"
+    configure_logging(level="DEBUG", log_file=path, stream=io.StringIO())
+    yield path
+    shutdown_logging()
+    structlog.reset_defaults()
+    root.setLevel(level)
+
+
+def _lines(path: Path) -> list:
+    shutdown_logging()  # flush the writer thread
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_records_carry_bound_context_from_any_thread(log_file):
+    """stdlib and structlog records get execution_id/agent bound on the caller, even in worker threads."""
+    std = logging.getLogger("test.std")
+
+    async def run():
+        with log_context(execution_id=7, agent="tts"):
+            await asyncio.to_thread(std.info, "from %s", "thread")
+            get_logger("test.struct").info("structured", size=3)
+    asyncio.run(run())
+    std.warning("unbound")
+    lines = _lines(log_file)
+    by_event = {l["event"]: l for l in lines}
+    assert by_event["from thread"]["execution_id"] == 7
+    assert by_event["from thread"]["agent"] == "tts"
+    assert by_event["from thread"]["logger"] == "test.std"
+    assert by_event["structured"]["execution_id"] == 7 and by_event["structured"]["size"] == 3
+    assert by_event["structured"]["level"] == "info"
+    assert "execution_id" not in by_event["unbound"]
+    assert by_event["from thread"]["tid"] != by_event["structured"]["tid"]
+    assert "bound" not in by_event["from thread"]
+
+
+def test_exceptions_are_rendered(log_file):
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("test.exc").exception("failed")
+    (line,) = [l for l in _lines(log_file) if l["event"] == "failed"]
+    assert "ValueError: boom" in line["exception"]
+
+
+def test_throttle_limits_per_key_and_counts_suppressed():
+    t = Throttle(interval_sec=60, debug_sample=1.0)
+    assert t.allow("k") == 0
+    assert t.allow("k") is None
+    assert t.allow("k") is None
+    assert t.allow("other") == 0
+    t._last["k"] = float("-inf")
+    assert t.allow("k") == 2
+
+
+def test_throttle_samples_debug_only():
+    t = Throttle(interval_sec=0, debug_sample=0.0)
+    assert t.allow("k", logging.DEBUG) is None
+    assert t.allow("k", logging.INFO) == 1
@@ -0,0 +1,191 @@
+"""
+Unit tests for src.database.maintenance (queue purge, archival, incremental vacuum).
+Run from repo root: pytest tests/test_maintenance.py -v
+"""
+import datetime
+import gzip
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.database import maintenance, models, repository
+
+
+def _ago(**delta):
+    return (datetime.datetime.utcnow() - datetime.timedelta(**delta)).isoformat() + "Z"
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "maint.db"
+    repository.ensure_schema(path)
+    yield path
+    repository.close_connections()
+
+
+def _config(tmp_path, **overrides):
+    retention = {"archive_dir": str(tmp_path / "archive"), "batch_size": 2, **overrides}
+    return {"retention": retention}
+
+
+def test_purge_queue_deletes_old_completed_in_batches(db, tmp_path):
+    """Only completed messages older than the cutoff are removed."""
+    with repository._connection(db) as conn:
+        for i in range(5):
+            conn.execute(
+                "INSERT INTO message_queue (from_agent, to_agent, message_type, status, created_at, processed_at) "
+                "VALUES ('a', 'b', 't', ?, ?, ?)",
+                (models.QUEUE_COMPLETED, _ago(hours=48), _ago(hours=48)),
+            )
+        conn.execute(
+            "INSERT INTO message_queue (from_agent, to_agent, message_type, status, created_at, processed_at) "
+            "VALUES ('a', 'b', 't', ?, ?, ?)",
+            (models.QUEUE_COMPLETED, _ago(hours=1), _ago(hours=1)),
+        )
+        conn.commit()
+    repository.enqueue("a", "b", "t", db_path=db)
+    report = maintenance.run_maintenance(db, _config(tmp_path, executions_days=0))
+    assert report["queue_deleted"] == 5
+    with repository._connection(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM message_queue").fetchone()[0] == 2
+
+
+def test_archive_moves_old_finished_executions_to_monthly_gzip(db, tmp_path):
+    """Old finished executions and their costs land in per-month archives and leave the hot tables."""
+    old = repository.create_execution(start_time="2025-01-15T00:00:00Z", db_path=db)
+    repository.update_execution(old, status=models.STATUS_COMPLETED, db_path=db)
+    repository.insert_cost(old, "tts", 0.4, db_path=db)
+    running = repository.create_execution(start_time="2025-01-16T00:00:00Z", db_path=db)
+    recent = repository.create_execution(db_path=db)
+    repository.update_execution(recent, status=models.STATUS_COMPLETED, db_path=db)
+    report = maintenance.run_maintenance(db, _config(tmp_path, executions_days=30))
+    assert report["executions_archived"] == 1
+    archive = tmp_path / "archive" / "executions-2025-01.jsonl.gz"
+    with gzip.open(archive, "rt") as f:
+        records = [json.loads(line) for line in f]
+    assert records[0]["execution"]["id"] == old
+    assert records[0]["costs"][0]["component"] == "tts"
+    assert repository.get_execution(old, db_path=db) is None
+    assert repository.get_execution_cost_total(old, db_path=db) == 0.0
+    assert repository.get_execution(running, db_path=db) is not None  # not finished, kept
+    assert repository.get_execution(recent, db_path=db) is not None
+
+
+def test_vacuum_reclaims_space(db, tmp_path):
+    """After deleting many rows, the maintenance pass shrinks the file and reports it."""
+    with repository._connection(db) as conn:
+        conn.executemany(
+            "INSERT INTO message_queue (from_agent, to_agent, message_type, payload, status, created_at, processed_at) "
+            "VALUES ('a', 'b', 't', ?, ?, ?, ?)",
+            [("x" * 2000, models.QUEUE_COMPLETED, _ago(days=3), _ago(days=3)) for _ in range(500)],
+        )
+        conn.commit()
+    report = maintenance.run_maintenance(db, _config(tmp_path, batch_size=100, executions_days=0))
+    assert report["queue_deleted"] == 500
+    assert report["reclaimed_bytes"] > 500_000
+    assert report["bytes_after"] < report["bytes_before"]
+    conn = sqlite3.connect(str(db))
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == maintenance.AUTO_VACUUM_INCREMENTAL
+    conn.close()
+
+
+def test_thread_disabled_when_interval_zero():
+    """maintenance_interval_minutes: 0 disables the background task."""
+    assert maintenance.start_maintenance_thread(config={"retention": {"maintenance_interval_minutes": 0}}) is None
+
+
+def test_archive_removes_dependent_rows_and_undated_executions(db, tmp_path):
+    """Videos and embeddings leave with their execution; rows without start_time are aged by end_time or archived as undated."""
+    old = repository.create_execution(start_time="2025-02-01T00:00:00Z", db_path=db)
+    repository.update_execution(old, status=models.STATUS_COMPLETED, db_path=db)
+    video = repository.insert_video(old, title="Old", youtube_id="yt-old", db_path=db)
+    repository.insert_embedding(video, b"\x00" * 8, db_path=db)
+    with repository._connection(db) as conn:
+        conn.execute(
+            "INSERT INTO executions (status, start_time, end_time) VALUES (?, NULL, ?)",
+            (models.STATUS_FAILED, "2025-03-02T00:00:00Z"),
+        )
+        conn.execute("INSERT INTO executions (status, start_time, end_time) VALUES (?, NULL, NULL)", (models.STATUS_FAILED,))
+        conn.execute("INSERT INTO executions (status, start_time, end_time) VALUES (?, NULL, ?)", (models.STATUS_FAILED, _ago(days=1)))
+        conn.commit()
+    report = maintenance.run_maintenance(db, _config(tmp_path, executions_days=30))
+    assert report["executions_archived"] == 3
+    names = {Path(f).name for f in report["archive_files"]}
+    assert names == {"executions-2025-02.jsonl.gz", "executions-2025-03.jsonl.gz", maintenance.UNDATED_ARCHIVE}
+    with gzip.open(tmp_path / "archive" / "executions-2025-02.jsonl.gz", "rt") as f:
+        record = json.loads(f.readline())
+    assert record["videos"][0]["youtube_id"] == "yt-old"
+    with repository._connection(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM executions").fetchone()[0] == 1  # recent end_time, kept
+
+
+def _archived_ids(path):
+    with gzip.open(path, "rt") as f:
+        return [json.loads(line)["execution"]["id"] for line in f]
+
+
+def test_interrupted_archive_pass_neither_loses_nor_duplicates_rows(db, tmp_path):
+    """A crash before the deletes commit, after they commit, or after the append is settled by the next pass."""
+    ids = []
+    for day in (1, 2, 3):
+        eid = repository.create_execution(start_time=f"2025-01-0{day}T00:00:00Z", db_path=db)
+        repository.update_execution(eid, status=models.STATUS_COMPLETED, db_path=db)
+        ids.append(eid)
+    archive = tmp_path / "archive" / "executions-2025-01.jsonl.gz"
+    config = _config(tmp_path, executions_days=30, batch_size=10)
+
+    # Crash inside the delete transaction: the stage is written, the rows stay
+    with repository._connection(db) as conn:
+        conn.execute("CREATE TRIGGER crash BEFORE DELETE ON executions BEGIN SELECT RAISE(ABORT, 'crash'); END")
+        conn.commit()
+    with pytest.raises(sqlite3.IntegrityError):
+        maintenance.run_maintenance(db, config)
+    assert not archive.exists()
+    with repository._connection(db) as conn:
+        conn.execute("DROP TRIGGER crash")
+        conn.commit()
+
+    # Crash after the deletes commit, before the stage reaches the archive
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(maintenance, "_finish_staged", lambda stage: (_ for _ in ()).throw(OSError("crash")))
+        with pytest.raises(OSError):
+            maintenance.run_maintenance(db, config)
+    assert not archive.exists()
+    stages = list(archive.parent.glob(".*.staged"))
+    assert len(stages) == 1
+    leftover = stages[0].read_bytes()
+
+    report = maintenance.run_maintenance(db, config)
+    assert report["executions_archived"] == 0
+    assert _archived_ids(archive) == ids
+
+    # Crash after the append, before the stage was removed
+    stages[0].write_bytes(leftover)
+    maintenance.run_maintenance(db, config)
+    assert _archived_ids(archive) == ids
+    assert not list(archive.parent.glob(".*.staged"))
+
+
+def test_full_vacuum_only_runs_offline(tmp_path):
+    """A database without incremental auto_vacuum is not rebuilt by a maintenance pass, only by full_vacuum()."""
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE legacy (x)")  # tables exist before migrations: auto_vacuum stays off
+    conn.close()
+    repository.ensure_schema(path)
+    report = maintenance.run_maintenance(path, _config(tmp_path, executions_days=0))
+    assert report["full_vacuum_needed"] is True
+    assert report["vacuum_pages"] == 0
+    vacuumed = maintenance.full_vacuum(path)
+    assert vacuumed["auto_vacuum_incremental"] is True
+    assert maintenance.run_maintenance(path, _config(tmp_path, executions_days=0))["full_vacuum_needed"] is False
+    repository.close_connections()
@@ -0,0 +1,62 @@
+"""
+Unit tests for src.utils.media (cached preview/poster renditions).
+Run from repo root: pytest tests/test_media.py -v
+"""
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.utils import media
+
+needs_ffmpeg = pytest.mark.skipif(media.ffmpeg_exe() is None, reason="ffmpeg not available")
+
+
+def make_clip(path: Path, seconds: float = 1.0) -> Path:
+    """Tiny 1080x1920 test MP4 with audio."""
+    subprocess.run(
+        [media.ffmpeg_exe(), "-y", "-loglevel", "error",
+         "-f", "lavfi", "-i", f"testsrc=size=1080x1920:rate=24:duration={seconds}",
+         "-f", "lavfi", "-i", f"sine=duration={seconds}",
+         "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest", str(path)],
+        check=True,
+    )
+    return path
+
+
+@needs_ffmpeg
+def test_preview_and_poster_rendered_once(tmp_path):
+    """Renditions are rendered on first use, smaller than the master, and then served from cache."""
+    master = make_clip(tmp_path / "final.mp4")
+    preview = media.ensure_rendition(master, "preview")
+    poster = media.ensure_rendition(master, "poster")
+    assert preview.parent.name == ".renditions" and preview.suffix == ".mp4"
+    assert poster.read_bytes()[:2] == b"\xff\xd8"  # JPEG
+    assert preview.stat().st_size < master.stat().st_size
+    mtime = preview.stat().st_mtime_ns
+    assert media.ensure_rendition(master, "preview") == preview
+    assert preview.stat().st_mtime_ns == mtime
+
+
+@needs_ffmpeg
+def test_new_master_version_replaces_stale_renditions(tmp_path):
+    """Re-rendering the master changes the rendition name and removes the old file."""
+    master = make_clip(tmp_path / "final.mp4")
+    old = media.ensure_rendition(master, "poster")
+    make_clip(master, seconds=2.0)
+    new = media.ensure_rendition(master, "poster")
+    assert new != old and new.exists() and not old.exists()
+
+
+def test_missing_or_empty_master_has_no_renditions(tmp_path):
+    empty = tmp_path / "final.mp4"
+    empty.write_bytes(b"")
+    assert media.ensure_rendition(empty, "preview") is None
+    assert media.ensure_rendition(tmp_path / "missing.mp4", "master") is None
+    with pytest.raises(ValueError):
+        media.ensure_rendition(empty, "thumbnail")
@@ -0,0 +1,77 @@
+"""
+Unit tests for src.utils.metrics (Prometheus text exposition without a client library).
+Run from repo root: pytest tests/test_metrics.py -v
+"""
+import pytest
+
+import sys
+from pathlib import Path
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.utils import metrics
+from src.utils.retry import sync_retry
+
+
+def test_counter_renders_labels_and_totals():
+    c = metrics.Counter("t_requests_total", "Requests.", ("service",))
+    c.inc(service="openai")
+    c.inc(2.5, service='say "hi"')
+    lines = c.render()
+    assert lines[:2] == ["# HELP t_requests_total Requests.", "# TYPE t_requests_total counter"]
+    assert 't_requests_total{service="openai"} 1' in lines
+    assert 't_requests_total{service="say \\"hi\\""} 2.5' in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    h = metrics.Histogram("t_seconds", "Latency.", ("op",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.7, 3.0):
+        h.observe(v, op="x")
+    lines = h.render()
+    assert 't_seconds_bucket{op="x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{op="x",le="1"} 3' in lines
+    assert 't_seconds_bucket{op="x",le="+Inf"} 4' in lines
+    assert 't_seconds_count{op="x"} 4' in lines
+    assert 't_seconds_sum{op="x"} 4.25' in lines
+    assert h.count(op="x") == 4
+
+
+def test_provider_call_records_latency_and_errors():
+    before = metrics.PROVIDER_ERRORS.value(service="t-svc", model="m", error="ValueError")
+    with metrics.provider_call("t-svc", "m"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.provider_call("t-svc", "m"):
+            raise ValueError("boom")
+    assert metrics.PROVIDER_SECONDS.count(service="t-svc", model="m", outcome="ok") == 1
+    assert metrics.PROVIDER_SECONDS.count(service="t-svc", model="m", outcome="error") == 1
+    assert metrics.PROVIDER_ERRORS.value(service="t-svc", model="m", error="ValueError") == before + 1
+
+
+def test_retry_backoff_is_counted_by_reason(monkeypatch):
+    monkeypatch.setattr("src.utils.retry.time.sleep", lambda s: None)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise Exception("429 Too Many Requests")
+        return "ok"
+
+    name = flaky.__qualname__
+    before = metrics.RETRIES.value(function=name, reason="rate_limit")
+    assert sync_retry(flaky, 3, 0.01, 0.05) == "ok"
+    assert metrics.RETRIES.value(function=name, reason="rate_limit") == before + 1
+    assert metrics.RETRY_WAIT_SECONDS.value(function=name, reason="rate_limit") > 0
+
+
+def test_render_includes_collectors_and_extra_samples():
+    metrics.register_collector(lambda: [("t_live", "gauge", "Live.", [({}, 3)])])
+    try:
+        text = metrics.render([("t_depth", "gauge", "Depth.", [({"status": "pending"}, 2)])])
+    finally:
+        metrics._collectors.pop()
+    assert "# TYPE t_live gauge\nt_live 3\n" in text
+    assert 't_depth{status="pending"} 2' in text
+    assert "# TYPE shorts_pipeline_stage_seconds histogram" in text
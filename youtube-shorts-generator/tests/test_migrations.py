@@ -0,0 +1,83 @@
+"""
+Unit tests for src.database.migrations (numbered migrations gated by PRAGMA user_version).
+Run from repo root: pytest tests/test_migrations.py -v
+"""
+import sqlite3
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.database import migrations
+from src.database.migrations import LATEST_VERSION, Migration, run_migrations
+
+
+def _version(db):
+    conn = sqlite3.connect(str(db))
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_fresh_database_applies_all_in_order(tmp_path):
+    """A new database gets every migration once and ends at LATEST_VERSION."""
+    db = tmp_path / "m.db"
+    applied = run_migrations(db)
+    assert [m.version for m in applied] == list(range(1, LATEST_VERSION + 1))
+    assert _version(db) == LATEST_VERSION
+    assert run_migrations(db) == []
+
+
+def test_up_to_date_database_only_reads_pragma(tmp_path):
+    """At LATEST_VERSION no migration step runs."""
+    db = tmp_path / "m.db"
+    run_migrations(db)
+    with patch.object(migrations, "_statements", side_effect=AssertionError("should not run")):
+        assert run_migrations(db) == []
+
+
+def test_dry_run_lists_pending_without_applying(tmp_path):
+    """dry_run reports pending migrations and leaves the database untouched."""
+    db = tmp_path / "m.db"
+    assert [m.version for m in run_migrations(db, dry_run=True)] == list(range(1, LATEST_VERSION + 1))
+    assert not db.exists()
+    run_migrations(db)
+    assert run_migrations(db, dry_run=True) == []
+
+
+def test_pre_versioning_database_upgrades(tmp_path):
+    """A database created before user_version tracking (columns already present) upgrades cleanly."""
+    db = tmp_path / "legacy.db"
+    conn = sqlite3.connect(str(db))
+    conn.executescript(migrations.SCHEMA)
+    conn.execute("ALTER TABLE executions ADD COLUMN output_path TEXT")
+    conn.execute("ALTER TABLE executions ADD COLUMN topic TEXT")
+    conn.commit()
+    conn.close()
+    run_migrations(db)
+    assert _version(db) == LATEST_VERSION
+
+
+def test_failed_migration_rolls_back(tmp_path):
+    """A failing step leaves the database at the previous version with no partial changes."""
+    db = tmp_path / "m.db"
+    run_migrations(db)
+    broken = Migration(
+        LATEST_VERSION + 1,
+        "broken",
+        "CREATE TABLE half_done (x INTEGER); INSERT INTO no_such_table VALUES (1);",
+    )
+    with patch.object(migrations, "MIGRATIONS", migrations.MIGRATIONS + (broken,)), \
+            patch.object(migrations, "LATEST_VERSION", broken.version):
+        with pytest.raises(sqlite3.OperationalError):
+            run_migrations(db)
+    assert _version(db) == LATEST_VERSION
+    conn = sqlite3.connect(str(db))
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'half_done'").fetchone() is None
+    conn.close()
@@ -112,6 +112,65 @@ async def test_pipeline_run_passes_db_path_to_helpers(mock_repo, mock_save, mock
         assert call[1].get("db_path") == db
 
 
+@patch("src.orchestration.pipeline.create_execution")
+@patch("src.orchestration.pipeline.load_context")
+@patch("src.orchestration.pipeline.save_stage")
+@patch("src.orchestration.pipeline.repository")
+@pytest.mark.asyncio
+async def test_pipeline_renders_renditions_from_stored_copy(mock_repo, mock_save, mock_load, mock_create, tmp_path):
+    """Renditions are rendered for output_dir/<id>.mp4 (the file the API serves), not the tmp master."""
+    master = tmp_path / "final.mp4"
+    master.write_bytes(b"video")
+
+    class ComposingAgent(BaseAgent):
+        name = "composition"
+
+        async def execute(self, context: ExecutionContext) -> AgentResult:
+            return AgentResult(success=True, data={"output_path": str(master)})
+
+    mock_create.return_value = 7
+    mock_load.return_value = None
+    settings = MagicMock(output_dir=tmp_path / "out", temp_dir=tmp_path / "work")
+    with patch("src.utils.config.get_settings", return_value=settings), \
+            patch("src.utils.cost_tracker.get_execution_cost_total", return_value=0.0), \
+            patch("src.utils.media.ensure_renditions") as render:
+        await Pipeline(agents=[ComposingAgent]).run()
+    render.assert_called_once_with(tmp_path / "out" / "7.mp4")
+
+
+@patch("src.orchestration.pipeline.create_execution")
+@patch("src.orchestration.pipeline.load_context")
+@patch("src.orchestration.pipeline.save_stage")
+@patch("src.orchestration.pipeline.repository")
+@pytest.mark.asyncio
+async def test_concurrent_executions_use_separate_work_dirs(mock_repo, mock_save, mock_load, mock_create, tmp_path):
+    """Interleaved runs write intermediates under their own <temp_dir>/<id>/, removed when the run ends."""
+    import asyncio
+    seen = {}
+
+    class WritingAgent(BaseAgent):
+        name = "tts"
+
+        async def execute(self, context: ExecutionContext) -> AgentResult:
+            path = context.work_path("tts_output.mp3")
+            path.write_text(str(context.execution_id))
+            await asyncio.sleep(0.01)  # let the other run write its file
+            seen[context.execution_id] = (path, path.read_text())
+            return AgentResult(success=True, data={"audio_path": str(path)})
+
+    mock_load.return_value = None
+    settings = MagicMock(output_dir=tmp_path / "out", temp_dir=tmp_path / "work")
+    with patch("src.utils.config.get_settings", return_value=settings), \
+            patch("src.utils.cost_tracker.get_execution_cost_total", return_value=0.0):
+        await asyncio.gather(
+            Pipeline(agents=[WritingAgent]).run(execution_id=1),
+            Pipeline(agents=[WritingAgent]).run(execution_id=2),
+        )
+    assert seen[1] == (tmp_path / "work" / "1" / "tts_output.mp3", "1")
+    assert seen[2] == (tmp_path / "work" / "2" / "tts_output.mp3", "2")
+    assert not (tmp_path / "work" / "1").exists() and not (tmp_path / "work" / "2").exists()
+
+
 def test_pipeline_init_default_agents_and_queue():
     """Pipeline with no agents has empty list and MessageQueue."""
     pipeline = Pipeline()
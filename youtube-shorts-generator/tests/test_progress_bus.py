@@ -0,0 +1,87 @@
+"""
+Unit tests for src.api.progress_bus (cross-process progress transport).
+Run from repo root: pytest tests/test_progress_bus.py -v
+"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.api.progress_bus import LocalBus, SQLiteBus, create_bus
+from src.api.progress_hub import ProgressHub
+from src.database import repository
+
+
+def _ev(percent):
+    return {"agent": "tts", "step": "progress", "percent": percent, "log": ""}
+
+
+async def _wait_for(predicate, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_sqlite_bus_delivers_between_hubs(tmp_path):
+    """Events published by one worker's bus reach another worker's hub with the same seq, then close."""
+    db = tmp_path / "bus.db"
+    repository.ensure_schema(db)
+    hub_a, hub_b = ProgressHub(), ProgressHub()
+    bus_a, bus_b = SQLiteBus(hub_a, db_path=db, poll_ms=10), SQLiteBus(hub_b, db_path=db, poll_ms=10)
+    bus_a.start()
+    bus_b.start()
+    try:
+        sub = hub_b.subscribe(11)
+        bus_a.publish(11, _ev(10))
+        bus_a.publish(11, _ev(20))
+        bus_a.close(11)
+        events = await asyncio.wait_for(_collect(sub), 3)
+        assert [(e["seq"], e["percent"]) for e in events] == [(1, 10), (2, 20)]
+        assert hub_b.is_finished(11) and hub_b.latest_seq(11) == 2
+        assert hub_a.latest_seq(11) == 2  # own rows are not ingested twice
+        assert [e["seq"] for e in hub_a.replay(11)] == [1, 2]
+    finally:
+        bus_a.stop()
+        bus_b.stop()
+
+
+async def _collect(sub):
+    return [e async for e in sub]
+
+
+@pytest.mark.asyncio
+async def test_bus_only_forwards_events_after_start(tmp_path):
+    """A worker that starts later does not replay bus rows written before it started."""
+    db = tmp_path / "bus.db"
+    repository.ensure_schema(db)
+    hub_a, hub_b = ProgressHub(), ProgressHub()
+    bus_a = SQLiteBus(hub_a, db_path=db, poll_ms=10)
+    bus_a.publish(12, _ev(10))
+    await asyncio.sleep(0.1)  # let the write land
+    bus_b = SQLiteBus(hub_b, db_path=db, poll_ms=10)
+    bus_b.start()
+    try:
+        await asyncio.sleep(0.05)
+        bus_a.publish(12, _ev(20))
+        await _wait_for(lambda: hub_b.latest_seq(12) == 2)
+        assert [e["seq"] for e in hub_b.replay(12)] == [2]
+    finally:
+        bus_b.stop()
+
+
+def test_create_bus_selects_transport(tmp_path, monkeypatch):
+    hub = ProgressHub()
+    monkeypatch.delenv("PROGRESS_TRANSPORT", raising=False)
+    assert type(create_bus(hub)) is LocalBus
+    monkeypatch.setenv("PROGRESS_TRANSPORT", "sqlite")
+    assert isinstance(create_bus(hub, db_path=tmp_path / "x.db"), SQLiteBus)
+    with pytest.raises(ValueError):
+        create_bus(hub, transport="redis")
@@ -0,0 +1,176 @@
+"""
+Unit tests for src.api.progress_hub (bounded per-subscriber progress queues).
+Run from repo root: pytest tests/test_progress_hub.py -v
+"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.api.progress_hub import ProgressHub, Subscriber, send_events
+
+
+def _ev(agent, percent):
+    return {"agent": agent, "step": "progress", "percent": percent, "log": ""}
+
+
+async def _drain(sub):
+    return [e async for e in sub]
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_keeps_newest_events():
+    """A full drop_oldest queue discards the oldest events."""
+    sub = Subscriber(maxsize=3, policy="drop_oldest")
+    for i in range(5):
+        sub.offer(_ev("tts", i))
+    sub.close()
+    assert [e["percent"] for e in await _drain(sub)] == [2, 3, 4]
+    assert sub.dropped == 2
+
+
+@pytest.mark.asyncio
+async def test_coalesce_replaces_same_agent_in_place():
+    """A full coalesce queue replaces the queued event from the same agent."""
+    sub = Subscriber(maxsize=2, policy="coalesce")
+    sub.offer(_ev("script", 10))
+    sub.offer(_ev("tts", 20))
+    sub.offer(_ev("script", 30))
+    sub.offer(_ev("video", 40))  # no queued video event: drops the oldest
+    sub.close()
+    assert [(e["agent"], e["percent"]) for e in await _drain(sub)] == [("tts", 20), ("video", 40)]
+
+
+@pytest.mark.asyncio
+async def test_publish_never_waits_for_slow_sender():
+    """A stalled client does not slow publishing; fast clients still get every event."""
+    hub = ProgressHub(queue_size=4, policy="drop_oldest")
+    stalled = asyncio.Event()
+
+    class StalledSocket:
+        async def send_json(self, _):
+            await stalled.wait()
+
+    class FastSocket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_json(self, event):
+            self.sent.append(event)
+
+    slow_sub, fast_sub = hub.subscribe(1), hub.subscribe(1)
+    fast = FastSocket()
+    slow_task = asyncio.create_task(send_events(StalledSocket(), slow_sub))
+    fast_task = asyncio.create_task(send_events(fast, fast_sub))
+    for i in range(100):
+        hub.publish(1, _ev("tts", i))
+        await asyncio.sleep(0)
+    hub.close(1)
+    await asyncio.wait_for(fast_task, 1)
+    assert [e["percent"] for e in fast.sent] == list(range(100))
+    assert len(slow_sub) <= 4 and slow_sub.dropped > 0
+    slow_task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_and_close():
+    """close ends streams for an execution; unsubscribe removes one subscriber."""
+    hub = ProgressHub(queue_size=10)
+    a, b = hub.subscribe(7), hub.subscribe(7)
+    hub.unsubscribe(7, a)
+    assert hub.subscriber_count(7) == 1
+    hub.publish(7, _ev("quality", 50))
+    hub.close(7)
+    assert await _drain(b) == [{**_ev("quality", 50), "seq": 1}]
+    assert await a.get() is None
+    assert hub.subscriber_count(7) == 0
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        Subscriber(policy="block")
+
+
+@pytest.mark.asyncio
+async def test_events_numbered_and_replayed_since():
+    """publish numbers events per execution; subscribe(since=) replays the logged tail first."""
+    hub = ProgressHub(queue_size=10, log_size=3)
+    for i in range(5):
+        hub.publish(1, _ev("tts", i))
+    hub.publish(2, _ev("tts", 0))
+    assert hub.latest_seq(1) == 5 and hub.latest_seq(2) == 1
+    assert [e["seq"] for e in hub.replay(1)] == [3, 4, 5]  # ring buffer keeps the last 3
+    sub = hub.subscribe(1, since=3)
+    hub.publish(1, _ev("tts", 5))
+    hub.close(1)
+    assert [e["seq"] for e in await _drain(sub)] == [4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_subscribe_after_finish_replays_and_closes():
+    """Subscribing to a finished run yields the replay (preload first) and then ends."""
+    hub = ProgressHub(queue_size=10)
+    hub.publish(3, _ev("video", 10))
+    hub.publish(3, _ev("video", 20))
+    hub.close(3)
+    sub = hub.subscribe(3, since=0)
+    assert [e["seq"] for e in await _drain(sub)] == [1, 2]
+    assert hub.subscriber_count(3) == 0
+    late = hub.subscribe(3, since=0, preload=[{**_ev("video", 10), "seq": 1}])
+    assert [e["seq"] for e in await _drain(late)] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_wait_for_change_wakes_on_publish_and_times_out():
+    """wait_for_change returns the new seq after a publish, or the old one after the timeout."""
+    hub = ProgressHub()
+    assert await hub.wait_for_change(4, 0, timeout=0.01) == 0
+    waiter = asyncio.ensure_future(hub.wait_for_change(4, 0, timeout=5))
+    await asyncio.sleep(0)
+    hub.publish(4, _ev("tts", 1))
+    assert await asyncio.wait_for(waiter, 1) == 1
+    assert await hub.wait_for_change(4, 0, timeout=5) == 1  # already past since: no wait
+
+
+@pytest.mark.asyncio
+async def test_wait_for_change_on_unknown_run_creates_no_log():
+    """Long-polling a run with no events here leaves no log or waiter state behind."""
+    hub = ProgressHub()
+    assert await hub.wait_for_change(77, 0, timeout=0.01) == 0
+    assert not hub.has_log(77)
+    assert not hub._first_event and not hub._first_waiters
+
+
+def test_logs_of_finished_runs_are_evicted():
+    """Only log_executions logs are kept; the oldest finished runs go first."""
+    hub = ProgressHub(log_executions=2)
+    hub.publish(1, _ev("tts", 1))
+    hub.close(1)
+    hub.publish(2, _ev("tts", 1))
+    hub.publish(3, _ev("tts", 1))
+    assert not hub.has_log(1) and hub.has_log(2) and hub.has_log(3)
+
+
+def test_persist_hook_receives_numbered_events():
+    persisted = []
+    hub = ProgressHub(persist=lambda eid, event: persisted.append((eid, event["seq"])))
+    hub.publish(9, _ev("tts", 1))
+    hub.publish(9, _ev("tts", 2))
+    assert persisted == [(9, 1), (9, 2)]
+
+
+@pytest.mark.asyncio
+async def test_deliver_keeps_remote_seq_and_ignores_duplicates():
+    """deliver logs an event numbered elsewhere; replays at or below the latest seq are dropped."""
+    hub = ProgressHub()
+    sub = hub.subscribe(5)
+    assert hub.deliver(5, {**_ev("tts", 10), "seq": 3})
+    assert not hub.deliver(5, {**_ev("tts", 5), "seq": 2})
+    hub.close(5)
+    assert [e["seq"] for e in await _drain(sub)] == [3]
+    assert hub.latest_seq(5) == 3
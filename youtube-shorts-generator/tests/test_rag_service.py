@@ -0,0 +1,84 @@
+"""
+Unit tests for src.services.rag_service (cached Chroma handles, batched add/query).
+Run from repo root: pytest tests/test_rag_service.py -v
+"""
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.services import rag_service
+
+
+@pytest.fixture
+def fake_chroma(tmp_path, monkeypatch):
+    """Patch client construction with a MagicMock; store path under tmp_path."""
+    monkeypatch.setenv("CHROMA_DB_PATH", str(tmp_path / "chroma"))
+    rag_service.reset_clients()
+    client = MagicMock()
+    client.get_max_batch_size.return_value = 2
+    with patch.object(rag_service, "_new_client", return_value=client) as factory:
+        yield factory, client
+    rag_service.reset_clients()
+
+
+def test_chroma_path_from_env(fake_chroma, tmp_path):
+    """CHROMA_DB_PATH overrides the default store location."""
+    assert rag_service.chroma_path() == tmp_path / "chroma"
+
+
+def test_client_and_collection_are_opened_once(fake_chroma):
+    """Repeated calls reuse one client and one collection handle."""
+    factory, client = fake_chroma
+    client.get_or_create_collection.return_value.query.return_value = {"ids": [[]], "distances": [[]], "metadatas": [[]]}
+    rag_service.add_embeddings(["a"], [[0.1]])
+    rag_service.similarity_search([0.1])
+    rag_service.similarity_search([0.2])
+    assert factory.call_count == 1
+    assert client.get_or_create_collection.call_count == 1
+
+
+def test_add_embeddings_chunks_to_max_batch(fake_chroma):
+    """add_embeddings splits into chunks of the client's max batch size."""
+    _, client = fake_chroma
+    coll = client.get_or_create_collection.return_value
+    rag_service.add_embeddings(["a", "b", "c"], [[1.0], [2.0], [3.0]], metadatas=[{"i": 1}, {"i": 2}, {"i": 3}])
+    assert [c[1]["ids"] for c in coll.add.call_args_list] == [["a", "b"], ["c"]]
+    assert coll.add.call_args_list[1][1]["metadatas"] == [{"i": 3}]
+
+
+def test_similarity_search_many_single_query_call(fake_chroma):
+    """similarity_search_many sends all vectors in one query and splits results per vector."""
+    _, client = fake_chroma
+    coll = client.get_or_create_collection.return_value
+    coll.query.return_value = {
+        "ids": [["x"], ["y", "z"]],
+        "distances": [[0.1], [0.2, 0.3]],
+        "metadatas": [[{"t": "x"}], [None, {"t": "z"}]],
+    }
+    results = rag_service.similarity_search_many([[1.0], [2.0]], n_results=2)
+    assert coll.query.call_count == 1
+    assert results == [[("x", 0.1, {"t": "x"})], [("y", 0.2, None), ("z", 0.3, {"t": "z"})]]
+
+
+@pytest.mark.asyncio
+async def test_query_topics_async_uses_batcher(fake_chroma):
+    """query_topics_async embeds through the batcher and searches off the event loop."""
+    _, client = fake_chroma
+    coll = client.get_or_create_collection.return_value
+    coll.query.return_value = {"ids": [["t1"]], "distances": [[0.5]], "metadatas": [[{"title": "T"}]]}
+
+    from src.services.embedding_batcher import EmbeddingBatcher
+    embed_fn = MagicMock(return_value=([[0.3]], 0.0))
+    batcher = EmbeddingBatcher(window_ms=1, embed_fn=embed_fn)
+
+    with patch("src.services.embedding_batcher.get_embedding_batcher", return_value=batcher):
+        topics = await rag_service.query_topics_async("space")
+    assert topics == [{"id": "t1", "distance": 0.5, "metadata": {"title": "T"}}]
+    embed_fn.assert_called_once_with(["space"], None)
+    assert coll.query.call_args[1]["query_embeddings"] == [[0.3]]
@@ -0,0 +1,33 @@
+"""
+Unit tests for src.agents.registry (lazily imported pipeline stages).
+Run from repo root: pytest tests/test_registry.py -v
+"""
+import pytest
+
+import sys
+from pathlib import Path
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.agents import registry
+from src.agents.base_agent import BaseAgent
+
+
+def test_default_agents_in_pipeline_order():
+    assert [a.name for a in registry.default_agents()] == [
+        "research", "script", "uniqueness", "tts", "video", "composition", "quality", "publishing",
+    ]
+
+
+def test_resolve_imports_class_matching_stage_name():
+    ref = registry.get_agent("quality")
+    cls = ref.resolve()
+    assert issubclass(cls, BaseAgent) and cls.name == "quality"
+    assert ref.resolve() is cls
+    assert isinstance(ref(), cls)
+
+
+def test_unknown_stage_raises():
+    with pytest.raises(KeyError):
+        registry.get_agent("nope")
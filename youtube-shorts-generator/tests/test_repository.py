@@ -0,0 +1,189 @@
+"""
+Unit tests for src.database.repository (connection reuse, schema check, queue claim).
+Run from repo root: pytest tests/test_repository.py -v
+"""
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.database import repository
+from src.database import models
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "repo.db"
+    yield path
+    repository.close_connections()
+
+
+def test_connection_is_reused_within_thread(db):
+    """Same thread and path get the same connection object."""
+    assert repository._get_conn(db) is repository._get_conn(db)
+
+
+def test_connections_are_per_thread(db):
+    """Another thread gets its own connection for the same path."""
+    main_conn = repository._get_conn(db)
+    other = []
+    t = threading.Thread(target=lambda: other.append(repository._get_conn(db)))
+    t.start()
+    t.join()
+    assert other[0] is not main_conn
+
+
+def test_close_connections_from_another_thread_reopens(db):
+    """A worker thread whose connection was closed elsewhere opens a fresh one on its next query."""
+    eid = repository.create_execution(db_path=db)
+    ready, closed, done = threading.Event(), threading.Event(), []
+
+    def worker():
+        repository.get_execution(eid, db_path=db)
+        ready.set()
+        closed.wait(5)
+        done.append(repository.get_execution(eid, db_path=db))
+
+    t = threading.Thread(target=worker)
+    t.start()
+    ready.wait(5)
+    repository.close_connections()
+    closed.set()
+    t.join(5)
+    assert done and done[0]["id"] == eid
+
+
+def test_connection_pragmas(db):
+    """Connections use WAL, synchronous=NORMAL and a busy timeout."""
+    repository.ensure_schema(db)
+    conn = repository._get_conn(db)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == repository.BUSY_TIMEOUT_MS
+
+
+def test_schema_check_runs_once_per_path(db):
+    """ensure_schema runs migrations only on the first call for a path."""
+    with patch("src.database.repository.run_migrations") as mock_migrate:
+        repository.ensure_schema(db)
+        repository.ensure_schema(db)
+    assert mock_migrate.call_count == 1
+
+
+def test_execution_roundtrip(db):
+    """create/update/get execution and cost totals work on the reused connection."""
+    eid = repository.create_execution(db_path=db)
+    repository.update_execution(eid, status=models.STATUS_IN_PROGRESS, topic="t", db_path=db)
+    repository.insert_cost(eid, "script", 0.25, db_path=db)
+    repository.insert_cost(eid, "tts", 0.5, db_path=db)
+    row = repository.get_execution(eid, db_path=db)
+    assert row["status"] == models.STATUS_IN_PROGRESS
+    assert row["topic"] == "t"
+    assert repository.get_execution_cost_total(eid, db_path=db) == pytest.approx(0.75)
+    assert repository.get_executions_count(db_path=db) == 1
+
+
+def test_dequeue_claims_each_message_once(db):
+    """dequeue_next marks the message processing so it is not returned again."""
+    mid = repository.enqueue("a", "b", "t", payload="x", db_path=db)
+    first = repository.dequeue_next(db_path=db)
+    assert first["id"] == mid
+    assert repository.dequeue_next(db_path=db) is None
+    repository.mark_message_processed(mid, db_path=db)
+
+
+def test_failed_statement_rolls_back(db):
+    """An error inside a write leaves no open transaction on the shared connection."""
+    repository.ensure_schema(db)
+    with pytest.raises(Exception):
+        with repository._connection(db) as conn:
+            conn.execute("INSERT INTO costs (execution_id, component, cost, timestamp) VALUES (1, 'x', 1, 'now')")
+            conn.execute("INSERT INTO no_such_table VALUES (1)")
+    assert not repository._get_conn(db).in_transaction
+    assert repository.get_execution_cost_total(1, db_path=db) == 0.0
+
+
+def _seed(db, n=7):
+    ids = []
+    for i in range(n):
+        eid = repository.create_execution(start_time=f"2026-01-{i + 1:02d}T00:00:00Z", db_path=db)
+        status = models.STATUS_COMPLETED if i % 2 == 0 else models.STATUS_FAILED
+        repository.update_execution(eid, status=status, topic=f"topic_{i}%", cost_total=float(i), db_path=db)
+        ids.append(eid)
+    return ids
+
+
+def test_list_executions_keyset_pages(db):
+    """Cursor pages walk newest-first with no overlap and end with next_cursor None."""
+    ids = _seed(db)
+    seen, cursor = [], None
+    while True:
+        page, cursor = repository.list_executions(limit=3, before_id=cursor, db_path=db)
+        seen.extend(r["id"] for r in page)
+        if cursor is None:
+            break
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_list_executions_filters(db):
+    """status, topic prefix, date range and cost range narrow the page; count agrees."""
+    _seed(db)
+    page, _ = repository.list_executions(limit=10, status=models.STATUS_COMPLETED, db_path=db)
+    assert {r["status"] for r in page} == {models.STATUS_COMPLETED}
+    page, _ = repository.list_executions(limit=10, topic_prefix="topic_3%", db_path=db)
+    assert [r["topic"] for r in page] == ["topic_3%"]
+    page, _ = repository.list_executions(limit=10, topic_prefix="topic__", db_path=db)
+    assert page == []  # "_" is matched literally
+    filters = dict(since="2026-01-02", until="2026-01-05", min_cost=2.0, max_cost=3.0)
+    page, _ = repository.list_executions(limit=10, db_path=db, **filters)
+    assert sorted(r["cost_total"] for r in page) == [2.0, 3.0]
+    assert repository.get_executions_count(db_path=db, **filters) == 2
+
+
+def test_list_executions_columns(db):
+    """columns selects only the requested fields (plus id); unknown names are rejected."""
+    _seed(db, n=1)
+    page, _ = repository.list_executions(columns=models.EXECUTION_SUMMARY_COLUMNS, db_path=db)
+    assert set(page[0]) == set(models.EXECUTION_SUMMARY_COLUMNS)
+    with pytest.raises(ValueError):
+        repository.list_executions(columns=["id; DROP TABLE executions"], db_path=db)
+
+
+def test_status_filter_uses_index(db):
+    """Filtering by status walks idx_executions_status_id instead of scanning the table."""
+    repository.ensure_schema(db)
+    with repository._connection(db) as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM executions WHERE status = ? AND id < ? ORDER BY id DESC LIMIT 11",
+            (models.STATUS_COMPLETED, 100),
+        ).fetchall()
+    assert "idx_executions_status_id" in " ".join(str(tuple(r)) for r in plan)
+
+
+def test_progress_events_roundtrip(db):
+    """Persisted progress events come back in seq order after since; duplicates are ignored."""
+    events = [(5, {"agent": "tts", "percent": p, "seq": s}) for s, p in ((1, 10), (2, 20), (3, 30))]
+    repository.insert_progress_events(events, db_path=db)
+    repository.insert_progress_events(events[:1], db_path=db)
+    assert [e["seq"] for e in repository.get_progress_events(5, since=1, db_path=db)] == [2, 3]
+    assert repository.get_progress_events(6, db_path=db) == []
+
+
+def test_create_batch_and_get_batch(db):
+    """create_batch makes pending executions tied to the batch; get_batch returns them in order."""
+    batch_id, ids = repository.create_batch(3, concurrency=2, topics=["a", "b"], db_path=db)
+    assert len(ids) == 3
+    batch = repository.get_batch(batch_id, db_path=db)
+    assert batch["total"] == 3 and batch["concurrency"] == 2 and batch["topics"] == ["a", "b"]
+    assert [e["topic"] for e in batch["executions"]] == ["a", "b", "a"]
+    assert {e["status"] for e in batch["executions"]} == {models.STATUS_PENDING}
+    assert repository.get_execution(ids[0], db_path=db)["batch_id"] == batch_id
+    repository.set_batch_topics(batch_id, ["x"], db_path=db)
+    assert repository.get_batch(batch_id, db_path=db)["topics"] == ["x"]
+    assert repository.get_batch(batch_id + 1, db_path=db) is None
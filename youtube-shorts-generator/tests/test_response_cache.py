@@ -0,0 +1,92 @@
+"""
+Unit tests for src.services.response_cache and the chat_completion cache option.
+Run from repo root: pytest tests/test_response_cache.py -v
+"""
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.services.response_cache import ResponseCache, make_key
+from src.services import openai_service
+
+MESSAGES = [{"role": "user", "content": "List 5 topics"}]
+
+
+def _fake_client(text="topic A"):
+    client = MagicMock()
+    choice = SimpleNamespace(message=SimpleNamespace(content=text))
+    usage = SimpleNamespace(prompt_tokens=10, completion_tokens=20)
+    client.chat.completions.create.return_value = SimpleNamespace(choices=[choice], usage=usage)
+    return client
+
+
+def test_make_key_depends_on_model_messages_temperature():
+    """Key changes when model, messages or temperature change."""
+    base = make_key("m", MESSAGES, 0.7)
+    assert base == make_key("m", [dict(MESSAGES[0])], 0.7)
+    assert base != make_key("m2", MESSAGES, 0.7)
+    assert base != make_key("m", MESSAGES, 0.2)
+    assert base != make_key("m", [{"role": "user", "content": "other"}], 0.7)
+
+
+def test_get_respects_ttl(tmp_path):
+    """Entries older than ttl are not returned."""
+    cache = ResponseCache(tmp_path / "rc.db")
+    cache.put("k", "hello", now=1000.0)
+    assert cache.get("k", ttl=60, now=1030.0) == "hello"
+    assert cache.get("k", ttl=60, now=1100.0) is None
+    cache.close()
+
+
+def test_sample_k_requires_k_entries_then_samples(tmp_path):
+    """With sample_k, lookups miss until K fresh responses exist, then return one of them."""
+    cache = ResponseCache(tmp_path / "rc.db")
+    cache.put("k", "a", sample_k=2, now=1000.0)
+    assert cache.get("k", ttl=60, sample_k=2, now=1001.0) is None
+    cache.put("k", "b", sample_k=2, now=1001.0)
+    assert cache.get("k", ttl=60, sample_k=2, now=1002.0) in ("a", "b")
+    # Only the newest K are kept per key
+    cache.put("k", "c", sample_k=2, now=1002.0)
+    seen = {cache.get("k", ttl=60, sample_k=2, now=1003.0) for _ in range(30)}
+    assert seen <= {"b", "c"}
+    cache.close()
+
+
+def test_max_entries_evicts_oldest(tmp_path):
+    """Total rows stay at or below max_entries; oldest are evicted first."""
+    cache = ResponseCache(tmp_path / "rc.db", max_entries=2)
+    cache.put("k1", "one", now=1.0)
+    cache.put("k2", "two", now=2.0)
+    cache.put("k3", "three", now=3.0)
+    assert cache.get("k1", ttl=100, now=4.0) is None
+    assert cache.get("k3", ttl=100, now=4.0) == "three"
+    cache.close()
+
+
+def test_chat_completion_without_ttl_does_not_use_cache():
+    """Default chat_completion never touches the response cache."""
+    with patch.object(openai_service, "_client", return_value=_fake_client()), \
+            patch.object(openai_service, "get_response_cache") as mock_get_cache:
+        content, cost = openai_service.chat_completion(messages=MESSAGES, model="gpt-4o-mini")
+    mock_get_cache.assert_not_called()
+    assert content == "topic A"
+    assert cost > 0
+
+
+def test_chat_completion_cache_hit_is_free(tmp_path):
+    """Second call with cache_ttl returns cached content at zero cost without an API call."""
+    cache = ResponseCache(tmp_path / "rc.db")
+    client = _fake_client("cached topics")
+    with patch.object(openai_service, "_client", return_value=client), \
+            patch.object(openai_service, "get_response_cache", return_value=cache):
+        first = openai_service.chat_completion(messages=MESSAGES, model="gpt-4o-mini", cache_ttl=3600)
+        second = openai_service.chat_completion(messages=MESSAGES, model="gpt-4o-mini", cache_ttl=3600)
+    assert client.chat.completions.create.call_count == 1
+    assert first[0] == second[0] == "cached topics"
+    assert second[1] == 0.0
+    cache.close()
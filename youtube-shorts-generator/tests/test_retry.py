@@ -203,3 +203,13 @@ async def test_retry_decorator_async():
     result = await flaky_func()
     assert result == "success"
     assert call_count[0] == 2
+
+
+def test_retry_decorator_passes_positional_args():
+    """Decorated function can be called with positional arguments."""
+    @retry_decorator(max_retries=2, base_delay=0.01)
+    def add(a, b, c=0):
+        return a + b + c
+
+    assert add(1, 2) == 3
+    assert add(1, 2, c=3) == 6
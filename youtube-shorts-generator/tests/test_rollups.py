@@ -0,0 +1,120 @@
+"""
+Unit tests for src.database.rollups (incremental cost / status aggregates).
+Run from repo root: pytest tests/test_rollups.py -v
+"""
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.database import repository, models, rollups, write_buffer
+from src.database.migrations import run_migrations
+from src.utils.cost_tracker import monthly_budget_status
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "rollups.db"
+    yield path
+    write_buffer.reset_write_buffer()
+    repository.close_connections()
+
+
+def _by_dim(rows, metric):
+    return {r["dimension"]: (r["count"], r["total"]) for r in rows if r["metric"] == metric}
+
+
+def test_costs_roll_up_per_component_hour_and_day(db):
+    """insert_cost and buffered costs update hourly and daily buckets."""
+    repository.insert_cost(1, "tts", 0.5, timestamp="2026-03-01T10:15:00Z", db_path=db)
+    repository.insert_cost(1, "tts", 0.25, timestamp="2026-03-01T11:05:00Z", db_path=db)
+    repository.write_batch([(2, "video", 2.0, "2026-03-01T11:30:00Z")], {}, db_path=db)
+    day = _by_dim(repository.get_rollups("day", db_path=db), rollups.METRIC_COST)
+    assert day == {"tts": (2, pytest.approx(0.75)), "video": (1, pytest.approx(2.0))}
+    hours = repository.get_rollups("hour", metric=rollups.METRIC_COST, since="2026-03-01T11:00", db_path=db)
+    assert {(r["bucket"], r["dimension"]) for r in hours} == {("2026-03-01T11", "tts"), ("2026-03-01T11", "video")}
+
+
+def test_status_transitions_and_failed_stage(db):
+    """Executions are counted under their current status; failures record the stage they failed at."""
+    ok = repository.create_execution(db_path=db)
+    repository.update_execution(ok, status=models.STATUS_IN_PROGRESS, db_path=db)
+    repository.update_execution(ok, status=models.STATUS_IN_PROGRESS, topic="same status", db_path=db)
+    repository.update_execution(ok, status=models.STATUS_COMPLETED, cost_total=3.5, db_path=db)
+    bad = repository.create_execution(db_path=db)
+    repository.update_execution(bad, current_stage="tts", db_path=db)
+    repository.update_execution(bad, status=models.STATUS_FAILED, db_path=db)
+    rows = repository.get_rollups("day", db_path=db)
+    execs = _by_dim(rows, rollups.METRIC_EXECUTIONS)
+    assert models.STATUS_PENDING not in execs and models.STATUS_IN_PROGRESS not in execs
+    assert execs[models.STATUS_COMPLETED] == (1, pytest.approx(3.5))
+    assert execs[models.STATUS_FAILED] == (1, 0.0)
+    assert _by_dim(rows, rollups.METRIC_FAILED_STAGE) == {"tts": (1, 0.0)}
+
+
+def test_backfill_on_existing_database(db):
+    """A database created before rollups gets its aggregates built once on migration."""
+    conn = sqlite3.connect(str(db))
+    conn.executescript(
+        """CREATE TABLE executions (id INTEGER PRIMARY KEY AUTOINCREMENT, status TEXT NOT NULL, start_time TEXT,
+               end_time TEXT, current_stage TEXT, error_message TEXT, cost_total REAL);
+           CREATE TABLE costs (id INTEGER PRIMARY KEY AUTOINCREMENT, execution_id INTEGER NOT NULL,
+               component TEXT NOT NULL, cost REAL NOT NULL, timestamp TEXT NOT NULL);
+           INSERT INTO executions (status, start_time, current_stage) VALUES ('failed', '2026-02-03T09:00:00Z', 'video');
+           INSERT INTO costs (execution_id, component, cost, timestamp) VALUES (1, 'script', 0.1, '2026-02-03T09:01:00Z');"""
+    )
+    conn.commit()
+    conn.close()
+    run_migrations(db)
+    run_migrations(db)  # second run must not double count
+    rows = repository.get_rollups("day", db_path=db)
+    assert _by_dim(rows, rollups.METRIC_COST) == {"script": (1, pytest.approx(0.1))}
+    assert _by_dim(rows, rollups.METRIC_FAILED_STAGE) == {"video": (1, 0.0)}
+
+
+def test_backfill_matches_live_recording(db):
+    """For the same history, rollups kept live equal rollups rebuilt from the rows by backfill."""
+    done = repository.create_execution(start_time="2026-03-01T10:00:00Z", db_path=db)
+    repository.insert_cost(done, "script", 0.2, timestamp="2026-03-01T10:01:00Z", db_path=db)
+    repository.update_execution(done, status=models.STATUS_IN_PROGRESS, db_path=db)
+    repository.update_execution(done, status=models.STATUS_COMPLETED, cost_total=0.2, end_time="2026-03-02T00:30:00Z", db_path=db)
+    repository.update_execution(done, cost_total=0.3, db_path=db)
+    failed = repository.create_execution(start_time="2026-03-01T11:00:00Z", db_path=db)
+    repository.update_execution(failed, status=models.STATUS_IN_PROGRESS, current_stage="video", db_path=db)
+    repository.update_execution(failed, status=models.STATUS_FAILED, db_path=db)
+    retried = repository.create_execution(start_time="2026-03-01T12:00:00Z", db_path=db)
+    repository.update_execution(retried, status=models.STATUS_FAILED, current_stage="tts", db_path=db)
+    repository.update_execution(retried, status=models.STATUS_IN_PROGRESS, db_path=db)
+    repository.create_execution(start_time="2026-03-03T08:00:00Z", db_path=db)
+    repository.create_batch(2, 1, ["a", "b"], db_path=db)
+
+    def snapshot():
+        return {g: repository.get_rollups(g, db_path=db) for g in rollups.GRANULARITIES}
+
+    live = snapshot()
+    with repository._connection(db) as conn:
+        conn.execute("DELETE FROM rollups")
+        rollups.backfill(conn)
+        conn.commit()
+    assert snapshot() == live
+    day = _by_dim(repository.get_rollups("day", since="2026-03-01", until="2026-03-02", db_path=db), rollups.METRIC_EXECUTIONS)
+    assert day == {
+        models.STATUS_COMPLETED: (1, pytest.approx(0.3)),
+        models.STATUS_FAILED: (1, 0.0),
+        models.STATUS_IN_PROGRESS: (1, 0.0),
+    }
+
+
+def test_monthly_budget_status(db):
+    """Monthly spend is summed from daily buckets and compared to cost.monthly_alert."""
+    repository.insert_cost(1, "video", 100.0, timestamp="2026-04-02T00:00:00Z", db_path=db)
+    repository.insert_cost(1, "video", 60.0, timestamp="2026-04-30T23:00:00Z", db_path=db)
+    repository.insert_cost(1, "video", 500.0, timestamp="2026-05-01T00:00:00Z", db_path=db)
+    status = monthly_budget_status("2026-04", db_path=db, config={"cost": {"monthly_alert": 150}})
+    assert status["spent"] == pytest.approx(160.0)
+    assert status["exceeded"] is True
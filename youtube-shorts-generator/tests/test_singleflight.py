@@ -0,0 +1,214 @@
+"""
+Unit tests for src.utils.singleflight (SingleFlight, single_flight decorator).
+Run from repo root: pytest tests/test_singleflight.py -v
+"""
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.utils.singleflight import SingleFlight, default_key, single_flight, zero_cost
+
+
+def test_sync_identical_calls_share_one_execution():
+    """Concurrent threads with the same key run fn once and all get its result."""
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow(x):
+        calls.append(x)
+        release.wait(2)
+        return x * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", slow, 21))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while flights.deduplicated < 4:
+        time.sleep(0.005)
+    release.set()
+    for t in threads:
+        t.join(2)
+    assert calls == [21]
+    assert results == [42] * 5
+
+
+def test_sync_error_propagates_to_waiters():
+    """An exception in the shared call is raised in every caller."""
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def boom():
+        release.wait(2)
+        raise ValueError("bad")
+
+    errors = []
+
+    def run():
+        try:
+            flights.do("k", boom)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for t in threads:
+        t.start()
+    while flights.deduplicated < 2:
+        time.sleep(0.005)
+    release.set()
+    for t in threads:
+        t.join(2)
+    assert len(errors) == 3
+
+
+def test_sync_sequential_calls_are_not_deduplicated():
+    """Once a call finishes, the next identical call runs again."""
+    flights = SingleFlight()
+    counter = []
+    flights.do("k", lambda: counter.append(1))
+    flights.do("k", lambda: counter.append(1))
+    assert len(counter) == 2
+    assert flights.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_async_identical_calls_share_one_task():
+    """Concurrent awaits with the same key share one coroutine execution."""
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch(x):
+        calls.append(x)
+        await asyncio.sleep(0.02)
+        return x + 1
+
+    results = await asyncio.gather(*(flights.do_async("k", fetch, 1) for _ in range(4)))
+    assert results == [2, 2, 2, 2]
+    assert calls == [1]
+    assert flights.deduplicated == 3
+
+
+@pytest.mark.asyncio
+async def test_async_cancelling_one_waiter_keeps_shared_call():
+    """Cancelling one waiter does not cancel the call other waiters depend on."""
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.ensure_future(flights.do_async("k", fetch))
+    second = asyncio.ensure_future(flights.do_async("k", fetch))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "done"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_async_cancelling_last_waiter_cancels_call():
+    """When every waiter is cancelled, the shared task is cancelled too."""
+    flights = SingleFlight()
+    started = asyncio.Event()
+    finished = []
+
+    async def fetch():
+        started.set()
+        await asyncio.sleep(1)
+        finished.append(True)
+
+    waiter = asyncio.ensure_future(flights.do_async("k", fetch))
+    await started.wait()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0)
+    assert flights.in_flight() == 0
+    assert finished == []
+
+
+def test_decorator_zero_cost_for_followers():
+    """With shared_result=zero_cost, only the caller that ran the request reports its cost."""
+    group = SingleFlight()
+    release = threading.Event()
+
+    @single_flight(group=group, shared_result=zero_cost)
+    def provider(prompt):
+        release.wait(2)
+        return f"video:{prompt}", 0.5
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(provider("same"))) for _ in range(3)]
+    for t in threads:
+        t.start()
+    while group.deduplicated < 2:
+        time.sleep(0.005)
+    release.set()
+    for t in threads:
+        t.join(2)
+    assert sorted(c for _, c in results) == [0.0, 0.0, 0.5]
+    assert {v for v, _ in results} == {"video:same"}
+
+
+def test_decorator_different_args_are_independent():
+    """Different arguments produce different keys and separate executions."""
+    group = SingleFlight()
+    calls = []
+
+    @single_flight(group=group)
+    def f(x, y=0):
+        calls.append((x, y))
+        return x + y
+
+    assert f(1) == 1
+    assert f(1, y=2) == 3
+    assert calls == [(1, 0), (1, 2)]
+
+
+def test_default_key_normalizes_positional_keyword_and_defaults():
+    """Positional, keyword and defaulted spellings of one call share a key; other values do not."""
+    def f(query, n=5, **extra):
+        return query
+
+    key = default_key(f, ("space",), {})
+    assert default_key(f, (), {"query": "space"}) == key
+    assert default_key(f, ("space", 5), {}) == key
+    assert default_key(f, (), {"n": 5, "query": "space"}) == key
+    assert default_key(f, ("space",), {"n": 6}) != key
+    assert default_key(f, ("space",), {"lang": "en"}) != key
+    assert default_key(f, ("a", 1, 2), {}) != default_key(f, ("a", 1), {})  # unbindable: raw args
+
+
+@pytest.mark.asyncio
+async def test_agent_style_chat_completion_calls_share_one_upstream_request():
+    """Two identical chat_completion calls made the way agents make them (asyncio.to_thread on the
+    API loop) overlap in worker threads, so only one reaches the provider."""
+    from unittest.mock import patch
+    from src.services import openai_service
+    upstream = []
+    entered = threading.Event()
+
+    def slow_chat_api(client, messages, model, temperature):
+        upstream.append(model)
+        entered.set()
+        time.sleep(0.2)
+        return "ideas", 0.01
+
+    messages = [{"role": "user", "content": "List 5 topics"}]
+    with patch.object(openai_service, "_client"), \
+            patch.object(openai_service, "_chat_completion_chat_api", side_effect=slow_chat_api):
+        first = asyncio.create_task(asyncio.to_thread(openai_service.chat_completion, messages))
+        await asyncio.to_thread(entered.wait, 2)
+        second = await asyncio.to_thread(openai_service.chat_completion, messages=messages)
+        results = [await first, second]
+    assert len(upstream) == 1
+    assert sorted(cost for _, cost in results) == [0.0, 0.01]
+    assert {content for content, _ in results} == {"ideas"}
@@ -80,20 +80,16 @@ def test_load_context_passes_db_path(mock_repo):
     mock_repo.get_execution.assert_called_once_with(1, db_path=db)
 
 
-@patch("src.orchestration.state_manager.repository")
-def test_save_stage_calls_update_execution(mock_repo):
-    """save_stage calls repository.update_execution with execution_id and current_stage."""
+@patch("src.orchestration.state_manager.write_buffer")
+def test_save_stage_goes_through_write_buffer(mock_wb):
+    """save_stage hands execution_id and stage to the write buffer."""
     state_manager.save_stage(execution_id=7, stage="quality")
-    mock_repo.update_execution.assert_called_once_with(
-        7, current_stage="quality", db_path=None
-    )
+    mock_wb.save_stage.assert_called_once_with(7, "quality", db_path=None)
 
 
-@patch("src.orchestration.state_manager.repository")
-def test_save_stage_passes_db_path(mock_repo):
-    """save_stage passes db_path to update_execution."""
+@patch("src.orchestration.state_manager.write_buffer")
+def test_save_stage_passes_db_path(mock_wb):
+    """save_stage passes db_path to the write buffer."""
     db = Path("/tmp/state.db")
     state_manager.save_stage(3, "publish", db_path=db)
-    mock_repo.update_execution.assert_called_once_with(
-        3, current_stage="publish", db_path=db
-    )
+    mock_wb.save_stage.assert_called_once_with(3, "publish", db_path=db)
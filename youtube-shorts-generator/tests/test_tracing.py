@@ -0,0 +1,91 @@
+"""
+Unit tests for src.utils.tracing (per-execution Chrome trace export).
+Run from repo root: pytest tests/test_tracing.py -v
+"""
+import asyncio
+import json
+
+import pytest
+
+import sys
+from pathlib import Path
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.utils import tracing
+from src.agents.base_agent import BaseAgent, ExecutionContext, AgentResult
+from src.database.repository import create_execution
+from src.orchestration.pipeline import Pipeline
+
+
+def test_span_is_noop_without_trace():
+    """Outside a traced run span() returns the shared no-op object."""
+    assert tracing.current() is None
+    assert tracing.span("x") is tracing._NOOP
+    with tracing.span("x", "cat", a=1):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_trace_execution_not_sampled_by_default(tmp_path, monkeypatch):
+    monkeypatch.delenv("TRACE_SAMPLE_RATE", raising=False)
+    async with tracing.trace_execution(1, directory=tmp_path) as trace:
+        assert trace is None
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_spans_follow_context_into_threads_and_are_saved(tmp_path):
+    """Spans opened on the loop and in worker threads land in one Chrome trace file."""
+    def blocking():
+        with tracing.span("work", "thread"):
+            pass
+
+    async with tracing.trace_execution(7, directory=tmp_path, force=True) as trace:
+        with tracing.span("outer", "test", step=1):
+            await asyncio.to_thread(blocking)
+        with pytest.raises(ValueError):
+            with tracing.span("bad"):
+                raise ValueError("x")
+        live = tracing.load_trace(7, directory=tmp_path)
+        assert {e["name"] for e in live["traceEvents"] if e["ph"] == "X"} == {"outer", "work", "bad"}
+    assert tracing.current() is None
+    data = json.loads((tmp_path / "7.json").read_text())
+    spans = {e["name"]: e for e in data["traceEvents"] if e["ph"] == "X"}
+    assert spans["outer"]["args"] == {"step": 1}
+    assert spans["work"]["tid"] != spans["outer"]["tid"]
+    assert spans["outer"]["ts"] <= spans["work"]["ts"]
+    assert spans["work"]["ts"] + spans["work"]["dur"] <= spans["outer"]["ts"] + spans["outer"]["dur"] + 1
+    assert spans["bad"]["args"]["error"] == "ValueError"
+    assert any(e["ph"] == "M" and e["name"] == "thread_name" for e in data["traceEvents"])
+    assert data["otherData"]["execution_id"] == 7
+    assert tracing.load_trace(7, directory=tmp_path) == data
+
+
+def test_save_prunes_beyond_keep(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRACE_KEEP", "2")
+    for eid in (1, 2, 3):
+        tracing.save(tracing.Trace(eid), directory=tmp_path)
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+class _StubAgent(BaseAgent):
+    name = "stub"
+
+    async def execute(self, context: ExecutionContext) -> AgentResult:
+        return AgentResult(success=True)
+
+
+@pytest.mark.asyncio
+async def test_sampled_pipeline_records_stage_and_db_spans(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRACE_SAMPLE_RATE", "1")
+    monkeypatch.setattr(tracing, "_traces_dir", lambda: tmp_path / "traces")
+    db = tmp_path / "t.db"
+    eid = create_execution(db_path=db)
+    await Pipeline(agents=[_StubAgent], db_path=db).run(execution_id=eid)
+    data = tracing.load_trace(eid)
+    cats = {(e["name"], e["cat"]) for e in data["traceEvents"] if e["ph"] == "X"}
+    assert ("pipeline", "pipeline") in cats
+    assert ("stub", "agent") in cats
+    assert ("update_execution", "db.write") in cats
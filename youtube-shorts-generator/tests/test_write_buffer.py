@@ -0,0 +1,112 @@
+"""
+Unit tests for src.database.write_buffer (batched cost and stage writes).
+Run from repo root: pytest tests/test_write_buffer.py -v
+"""
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import sys
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from src.database import repository, write_buffer
+from src.database.write_buffer import WriteBuffer
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "wb.db"
+    repository.ensure_schema(path)
+    yield path
+    write_buffer.reset_write_buffer()
+    repository.close_connections()
+
+
+def _cost_rows(db):
+    with repository._connection(db) as conn:
+        return conn.execute("SELECT COUNT(*) FROM costs").fetchone()[0]
+
+
+def test_writes_are_deferred_until_flush(db):
+    """Costs and stages stay pending until flush, then land in one batch."""
+    buf = WriteBuffer(interval_ms=60_000, max_batch=1000)
+    eid = repository.create_execution(db_path=db)
+    buf.add_cost(eid, "script", 0.1, db_path=db)
+    buf.add_cost(eid, "tts", 0.2, db_path=db)
+    buf.set_stage(eid, "script", db_path=db)
+    buf.set_stage(eid, "tts", db_path=db)
+    assert buf.pending() == 3  # stage updates for one execution coalesce
+    assert _cost_rows(db) == 0
+    assert buf.flush() == 3
+    assert buf.flushes == 1
+    assert _cost_rows(db) == 2
+    assert repository.get_execution(eid, db_path=db)["current_stage"] == "tts"
+    buf.close()
+
+
+def test_flush_uses_one_transaction(db):
+    """A flush commits all pending rows through a single write_batch call."""
+    buf = WriteBuffer(interval_ms=60_000, max_batch=1000)
+    for i in range(50):
+        buf.add_cost(1, "openai", 0.01, db_path=db)
+    with patch.object(repository, "write_batch", wraps=repository.write_batch) as wb:
+        buf.flush()
+    assert wb.call_count == 1
+    assert _cost_rows(db) == 50
+    buf.close()
+
+
+def test_background_flush_on_max_batch(db):
+    """Reaching max_batch wakes the flusher without waiting for the interval."""
+    buf = WriteBuffer(interval_ms=60_000, max_batch=5)
+    for _ in range(5):
+        buf.add_cost(1, "openai", 0.01, db_path=db)
+    deadline = time.monotonic() + 2
+    while buf.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert buf.pending() == 0
+    assert _cost_rows(db) == 5
+    buf.close()
+
+
+def test_readers_see_own_writes(db):
+    """Repository reads flush the process buffer first (read-your-writes)."""
+    eid = repository.create_execution(db_path=db)
+    with patch.dict("os.environ", {"DB_WRITE_BUFFER_INTERVAL_MS": "60000"}):
+        write_buffer.reset_write_buffer()
+        write_buffer.log_cost(eid, "video", 1.5, db_path=db)
+        write_buffer.save_stage(eid, "video", db_path=db)
+    assert write_buffer.get_write_buffer().pending() == 2
+    assert repository.get_execution_cost_total(eid, db_path=db) == pytest.approx(1.5)
+    assert repository.get_execution(eid, db_path=db)["current_stage"] == "video"
+
+
+def test_close_flushes_pending(db):
+    """close() (used at exit) writes everything still buffered."""
+    buf = WriteBuffer(interval_ms=60_000, max_batch=1000)
+    buf.add_cost(1, "tts", 0.3, db_path=db)
+    buf.close()
+    assert _cost_rows(db) == 1
+
+
+def test_failed_flush_requeues(db):
+    """If the batch transaction fails, the rows stay pending for the next flush."""
+    buf = WriteBuffer(interval_ms=60_000, max_batch=1000)
+    buf.add_cost(1, "tts", 0.3, db_path=db)
+    with patch.object(repository, "write_batch", side_effect=RuntimeError("disk")):
+        with pytest.raises(RuntimeError):
+            buf.flush()
+    assert buf.pending() == 1
+    assert buf.flush() == 1
+    buf.close()
+
+
+def test_disabled_writes_through(db):
+    """DB_WRITE_BUFFER=0 inserts immediately."""
+    with patch.dict("os.environ", {"DB_WRITE_BUFFER": "0"}):
+        write_buffer.log_cost(1, "script", 0.2, db_path=db)
+    assert _cost_rows(db) == 1